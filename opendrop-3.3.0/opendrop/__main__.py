@@ -27,9 +27,8 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import os
 import sys
-from opendrop.app import OpendropApplication
-from opendrop.appfw import Injector
 
 
 def main(*argv) -> int:
@@ -37,8 +36,25 @@ def main(*argv) -> int:
     import multiprocessing
     multiprocessing.freeze_support()
 
+    if len(argv) > 1 and argv[1] == 'batch':
+        # Headless mode, avoid importing anything GTK related.
+        from opendrop.analysis.batch import main as batch_main
+        return batch_main(argv[2:])
+
+    if len(argv) > 1 and argv[1] == 'benchmark-startup':
+        from opendrop.startup_benchmark import main as benchmark_main
+        return benchmark_main(argv[2:])
+
+    from opendrop.app import OpendropApplication
+    from opendrop.appfw import Injector
+
     injector = Injector()
     app = injector.create_object(OpendropApplication)
+
+    if os.environ.get('OPENDROP_STARTUP_BENCHMARK'):
+        from opendrop.startup_benchmark import report_first_window
+        report_first_window(app)
+
     return app.run(argv)
 
 
@@ -0,0 +1,5 @@
+from .worker import *
+from .scheduler import *
+from .cache import *
+from .pendant import *
+from .conan import *
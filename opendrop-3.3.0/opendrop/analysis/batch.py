@@ -0,0 +1,279 @@
+"""Headless batch analysis, run with `python -m opendrop batch ift|conan ...`.
+
+This module must not import GTK or matplotlib (directly or indirectly), so that batch runs work on machines
+without a display.
+"""
+
+import argparse
+import ast
+import concurrent.futures
+import configparser
+import csv
+import glob
+import math
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence, TextIO
+
+import cv2
+
+from opendrop.geometry import Line2, Rect2
+
+from .cache import ResultCache, default_cache_dir
+from .conan import analyse_contact_angle
+from .pendant import analyse_pendant
+
+
+IFT_TIMELINE_HEADER = (
+    'Time [s]',
+    'IFT [N/m]',
+    'Volume [m3]',
+    'Surface [m2]',
+    'Radius [m]',
+    'Worth.',
+    'Bond',
+    'Rotation [deg.]',
+    'Apex x [px]',
+    'Apex y [px]',
+    'Needle width [px]',
+    'Image',
+)
+
+CONAN_TIMELINE_HEADER = (
+    'Time [s]',
+    'Left CA [deg.]',
+    'Right CA [deg.]',
+    'Left Pt x [px]',
+    'Left Pt y [px]',
+    'Right Pt x [px]',
+    'Right Pt y [px]',
+    'Image',
+)
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m opendrop batch',
+        description="Analyse images without the graphical interface.",
+    )
+    parser.add_argument(
+        'experiment',
+        choices=('ift', 'conan'),
+        help="Type of analysis to perform.",
+    )
+    parser.add_argument(
+        'images',
+        nargs='+',
+        help="Image files or glob patterns, images are analysed in lexicographic order of their paths.",
+    )
+    parser.add_argument(
+        '-p', '--params',
+        required=True,
+        type=Path,
+        help="Parameter file, in the same INI format as the 'params.ini' files saved by OpenDrop.",
+    )
+    parser.add_argument(
+        '-o', '--output',
+        default='-',
+        help="Where to write the timeline CSV, defaults to stdout.",
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help="Number of worker processes, defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const=default_cache_dir(),
+        default=None,
+        metavar='DIR',
+        help="Reuse results of images that were analysed before with the same feature parameters, and save new "
+             "results. DIR defaults to the cache used by the graphical interface.",
+    )
+    parser.add_argument(
+        '--frame-interval',
+        type=float,
+        default=1.0,
+        help="Time between consecutive images in seconds (default: %(default)s).",
+    )
+
+    args = parser.parse_args(argv)
+
+    image_paths = _expand_image_paths(args.images)
+    if not image_paths:
+        parser.error("no images found")
+
+    params_config = configparser.ConfigParser()
+    if not params_config.read(args.params):
+        parser.error("could not read parameter file '{}'".format(args.params))
+
+    try:
+        if args.experiment == 'ift':
+            task = _analyse_ift_image
+            task_kwargs = _read_ift_params(params_config)
+            header = IFT_TIMELINE_HEADER
+        else:
+            task = _analyse_conan_image
+            task_kwargs = _read_conan_params(params_config)
+            header = CONAN_TIMELINE_HEADER
+    except (KeyError, ValueError, SyntaxError) as e:
+        parser.error("invalid parameter file: {}".format(e))
+
+    if args.cache is not None:
+        task_kwargs = dict(task_kwargs, cache=ResultCache(args.cache))
+
+    if args.output == '-':
+        return _run(task, task_kwargs, image_paths, args.frame_interval, args.jobs, header, sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as out_file:
+            return _run(task, task_kwargs, image_paths, args.frame_interval, args.jobs, header, out_file)
+
+
+def _run(
+        task: Callable,
+        task_kwargs: Mapping[str, Any],
+        image_paths: Sequence[str],
+        frame_interval: float,
+        jobs: Optional[int],
+        header: Sequence[str],
+        out_file: TextIO,
+) -> int:
+    writer = csv.writer(out_file)
+    writer.writerow(header)
+    out_file.flush()
+
+    num_failed = 0
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(task, image_path, i * frame_interval, **task_kwargs): image_path
+            for i, image_path in enumerate(image_paths)
+        }
+
+        try:
+            # Write rows as soon as each image is done, rows can be sorted by the time column afterwards.
+            for fut in concurrent.futures.as_completed(futures):
+                try:
+                    row = fut.result()
+                except Exception as e:
+                    num_failed += 1
+                    print("{}: {}".format(futures[fut], e), file=sys.stderr)
+                    continue
+
+                writer.writerow(row)
+                out_file.flush()
+        except KeyboardInterrupt:
+            for fut in futures:
+                fut.cancel()
+            raise
+
+    if num_failed:
+        print("{} of {} images failed".format(num_failed, len(image_paths)), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def _expand_image_paths(patterns: Sequence[str]) -> Sequence[str]:
+    paths = set()
+
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.exists(pattern):
+            matches = [pattern]
+
+        paths.update(p for p in matches if not os.path.isdir(p))
+
+    return sorted(paths)
+
+
+def _read_ift_params(config: configparser.ConfigParser) -> Mapping[str, Any]:
+    feature = config['Feature']
+    physical = config['Physical'] if config.has_section('Physical') else {}
+
+    return {
+        'drop_region': _parse_rect(feature['drop_region']),
+        'needle_region': _parse_rect(feature['needle_region']),
+        'thresh1': float(feature.get('thresh1', 80.0)),
+        'thresh2': float(feature.get('thresh2', 160.0)),
+        'drop_density': float(physical.get('drop_density', math.nan)),
+        'continuous_density': float(physical.get('continuous_density', math.nan)),
+        'needle_diameter': float(physical.get('needle_diameter', math.nan)),
+        'gravity': float(physical.get('gravity', 9.81)),
+    }
+
+
+def _read_conan_params(config: configparser.ConfigParser) -> Mapping[str, Any]:
+    feature = config['Feature']
+
+    baseline = ast.literal_eval(feature['baseline'])
+    roi = feature.get('roi')
+
+    return {
+        'baseline': Line2(baseline[:2], baseline[2:]),
+        'inverted': feature.getboolean('inverted', False),
+        'roi': _parse_rect(roi) if roi else None,
+        'thresh': float(feature.get('thresh', 0.5)),
+    }
+
+
+def _parse_rect(text: str) -> Rect2[int]:
+    # Regions are saved as (left, top, right, bottom) tuples.
+    x0, y0, x1, y1 = ast.literal_eval(text)
+    return Rect2(x0, y0, x1, y1)
+
+
+def _read_image(image_path: str):
+    # Load in grayscale to save memory, like LocalStorageAcquirer.
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError("Failed to load image")
+
+    return image
+
+
+def _analyse_ift_image(image_path: str, timestamp: float, **params) -> Sequence[str]:
+    image = _read_image(image_path)
+    result = analyse_pendant(image, **params)
+
+    fit = result.fit
+    quantities = result.quantities
+
+    # Keep rotation angle between -90 to 90 degrees.
+    rotation = (fit.rotation + math.pi/2) % math.pi - math.pi/2
+
+    return (
+        format(timestamp, '.3f'),
+        format(quantities.interfacial_tension, '.3g'),
+        format(quantities.volume, '.3g'),
+        format(quantities.surface_area, '.3g'),
+        format(quantities.apex_radius, '.1f'),
+        format(quantities.worthington, '.3g'),
+        format(fit.bond, '.3g'),
+        format(math.degrees(rotation), '.3g'),
+        format(fit.apex_x, '.1f'),
+        format(fit.apex_y, '.1f'),
+        format(result.needle_diameter, '.1f') if result.needle_diameter is not None else '',
+        image_path,
+    )
+
+
+def _analyse_conan_image(image_path: str, timestamp: float, **params) -> Sequence[str]:
+    image = _read_image(image_path)
+    result = analyse_contact_angle(image, **params)
+
+    fit = result.fit
+
+    return (
+        format(timestamp, '.3f'),
+        format(math.degrees(fit.left_angle), '.1f') if fit.left_angle is not None else '',
+        format(math.degrees(fit.right_angle), '.1f') if fit.right_angle is not None else '',
+        format(fit.left_contact.x, '.1f') if fit.left_contact is not None else '',
+        format(fit.left_contact.y, '.1f') if fit.left_contact is not None else '',
+        format(fit.right_contact.x, '.1f') if fit.right_contact is not None else '',
+        format(fit.right_contact.y, '.1f') if fit.right_contact is not None else '',
+        image_path,
+    )
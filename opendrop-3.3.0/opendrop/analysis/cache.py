@@ -0,0 +1,188 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from opendrop.metadata import __version__
+
+
+__all__ = ('ResultCache', 'default_cache_dir', 'default_cache_enabled')
+
+
+def default_cache_dir() -> str:
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+
+    return os.path.join(base, 'opendrop', 'results')
+
+
+def default_cache_enabled() -> bool:
+    """Whether the graphical interface should cache results, users can opt out by setting the OPENDROP_RESULT_CACHE
+    environment variable to 0."""
+    return os.environ.get('OPENDROP_RESULT_CACHE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class ResultCache:
+    """An on-disk cache of analysis results, addressed by a hash of the input image and the parameters that the
+    result depends on.
+
+    Entries are written atomically, so a cache directory can be shared between worker processes. The cache is
+    picklable and cheap to pass to worker tasks. Unreadable entries are treated as misses.
+
+    The cache is kept within `max_bytes` and `max_entries` by deleting the least recently used entries (by
+    modification time, which get() updates on a hit). Checking the size means listing the whole directory, so
+    put() only does it every PRUNE_INTERVAL seconds, shared between processes through a marker file. If `enabled` is
+    false, nothing is looked up or saved.
+    """
+
+    DEFAULT_MAX_BYTES = 512 * 2**20
+    DEFAULT_MAX_ENTRIES = 20000
+
+    PRUNE_INTERVAL = 60.0
+
+    # Pruning deletes entries until the cache is this fraction of its limits, so it isn't needed again right away.
+    PRUNE_TARGET = 0.8
+
+    _PRUNE_MARKER = '.last-prune'
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            *,
+            max_bytes: int = DEFAULT_MAX_BYTES,
+            max_entries: int = DEFAULT_MAX_ENTRIES,
+            enabled: bool = True,
+    ) -> None:
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+    def key(self, kind: str, image: np.ndarray, *params: Any) -> str:
+        h = hashlib.blake2b(digest_size=20)
+
+        # Results computed by a different version of OpenDrop may differ, don't share them.
+        h.update(repr((kind, __version__, image.shape, image.dtype.str, params)).encode())
+        h.update(np.ascontiguousarray(image).data)
+
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt, partially written (if not written by put()), or written by an incompatible version. Unpickling
+            # garbage can raise almost anything.
+            return None
+
+        try:
+            # Mark as recently used.
+            os.utime(path)
+        except OSError:
+            pass
+
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # The cache is only an optimization, failing to write to it should not fail the analysis.
+            return
+
+        try:
+            self._maybe_prune()
+        except OSError:
+            pass
+
+    def _maybe_prune(self) -> None:
+        marker = os.path.join(self.directory, self._PRUNE_MARKER)
+
+        try:
+            if time.time() - os.stat(marker).st_mtime < self.PRUNE_INTERVAL:
+                return
+        except FileNotFoundError:
+            pass
+
+        # Touch the marker first, so other processes don't prune at the same time.
+        with open(marker, 'a'):
+            pass
+        os.utime(marker)
+
+        self.prune()
+
+    def prune(self) -> None:
+        """Delete the least recently used entries until the cache is within its limits."""
+        entries = []
+        total_bytes = 0
+
+        for subdir in os.scandir(self.directory):
+            if not subdir.is_dir():
+                continue
+
+            for entry in os.scandir(subdir.path):
+                if not entry.name.endswith('.pickle'):
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Deleted by another process.
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes and len(entries) <= self.max_entries:
+            return
+
+        target_bytes = self.max_bytes * self.PRUNE_TARGET
+        target_entries = self.max_entries * self.PRUNE_TARGET
+        num_entries = len(entries)
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= target_bytes and num_entries <= target_entries:
+                break
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+            total_bytes -= size
+            num_entries -= 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.pickle')
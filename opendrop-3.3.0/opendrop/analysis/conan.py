@@ -0,0 +1,79 @@
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from opendrop.features import extract_contact_angle_features
+from opendrop.fit import ContactAngleFitResult, contact_angle_fit
+from opendrop.geometry import Line2, Rect2
+
+from .cache import ResultCache
+from .worker import AnalysisStage, CancelToken
+
+
+__all__ = ('ContactAngleAnalysisResult', 'analyse_contact_angle')
+
+
+class ContactAngleAnalysisResult(NamedTuple):
+    drop_points: np.ndarray
+    fit: ContactAngleFitResult
+
+
+def analyse_contact_angle(
+        image: np.ndarray,
+        baseline: Optional[Line2],
+        inverted: bool,
+        *,
+        roi: Optional[Rect2[int]] = None,
+        thresh: float = 0.5,
+        status: Optional[Callable[..., None]] = None,
+        cancel: Optional[CancelToken] = None,
+        cache: Optional[ResultCache] = None,
+) -> ContactAngleAnalysisResult:
+    """Extract the drop profile and fit contact angles in one go, so the whole analysis of an image can run in a
+    single worker task.
+
+    If `status` is given, it is called with each stage reached, and FITTING is reported with the extracted drop
+    points so they can be shown before the fit finishes.
+
+    If `cancel` is given, it is checked between stages and raises TaskCancelled once the task has been cancelled.
+
+    If `cache` is given, results are looked up in and saved to it.
+    """
+    if cancel is not None:
+        cancel.check()
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key('conan', image, baseline, inverted, roi, thresh)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    if status is not None:
+        status(AnalysisStage.EXTRACTING_FEATURES)
+
+    features = extract_contact_angle_features(
+        image,
+        baseline,
+        inverted,
+        roi=roi,
+        thresh=thresh,
+    )
+
+    if cancel is not None:
+        cancel.check()
+
+    if status is not None:
+        status(AnalysisStage.FITTING, features.drop_points)
+
+    fit = contact_angle_fit(features.drop_points, baseline)
+
+    result = ContactAngleAnalysisResult(
+        drop_points=features.drop_points,
+        fit=fit,
+    )
+
+    if cache is not None:
+        cache.put(cache_key, result)
+
+    return result
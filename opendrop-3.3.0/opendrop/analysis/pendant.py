@@ -0,0 +1,175 @@
+import math
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from opendrop.features import extract_pendant_features
+from opendrop.fit import YoungLaplaceFitResult, young_laplace_fit
+from opendrop.geometry import Rect2
+
+from .cache import ResultCache
+from .worker import AnalysisStage, CancelToken
+
+
+__all__ = ('PendantQuantities', 'PendantAnalysisResult', 'analyse_pendant', 'calculate_pendant_quantities')
+
+
+# Math constants.
+PI = math.pi
+NAN = math.nan
+
+
+class PendantQuantities(NamedTuple):
+    """Physical quantities in SI units."""
+
+    interfacial_tension: float
+    volume: float
+    surface_area: float
+    apex_radius: float
+    worthington: float
+
+
+class PendantAnalysisResult(NamedTuple):
+    drop_points: np.ndarray
+    needle_diameter: Optional[float]
+
+    fit: YoungLaplaceFitResult
+    quantities: PendantQuantities
+
+
+def analyse_pendant(
+        image: np.ndarray,
+        drop_region: Optional[Rect2[int]],
+        needle_region: Optional[Rect2[int]],
+        *,
+        thresh1: float,
+        thresh2: float,
+        drop_density: float,
+        continuous_density: float,
+        needle_diameter: float,
+        gravity: float,
+        status: Optional[Callable[..., None]] = None,
+        cancel: Optional[CancelToken] = None,
+        cache: Optional[ResultCache] = None,
+) -> PendantAnalysisResult:
+    """Extract features, fit a Young-Laplace profile and calculate physical quantities in one go, so the whole
+    analysis of an image can run in a single worker task.
+
+    If `status` is given, it is called with each stage reached, and FITTING is reported with the extracted
+    `(drop_points, needle_diameter)` so they can be shown before the fit finishes.
+
+    If `cancel` is given, it is checked between stages and during the fit, and raises TaskCancelled once the task
+    has been cancelled.
+
+    If `cache` is given, the extracted features and fit are looked up in and saved to it. They only depend on the
+    image and the feature parameters, so physical quantities are recalculated from a cached fit when only the
+    physical parameters have changed.
+    """
+    if cancel is not None:
+        cancel.check()
+
+    cache_key = None
+    cached = None
+    if cache is not None:
+        cache_key = cache.key('pendant', image, drop_region, needle_region, thresh1, thresh2)
+        cached = cache.get(cache_key)
+
+    if cached is not None:
+        drop_points, needle_diameter_px, fit = cached
+    else:
+        drop_points, needle_diameter_px, fit = _extract_and_fit(
+            image,
+            drop_region,
+            needle_region,
+            thresh1=thresh1,
+            thresh2=thresh2,
+            status=status,
+            cancel=cancel,
+        )
+
+        if cache is not None:
+            cache.put(cache_key, (drop_points, needle_diameter_px, fit))
+
+    quantities = calculate_pendant_quantities(
+        fit,
+        needle_diameter_px=needle_diameter_px,
+        drop_density=drop_density,
+        continuous_density=continuous_density,
+        needle_diameter=needle_diameter,
+        gravity=gravity,
+    )
+
+    return PendantAnalysisResult(
+        drop_points=drop_points,
+        needle_diameter=needle_diameter_px,
+        fit=fit,
+        quantities=quantities,
+    )
+
+
+def _extract_and_fit(
+        image: np.ndarray,
+        drop_region: Optional[Rect2[int]],
+        needle_region: Optional[Rect2[int]],
+        *,
+        thresh1: float,
+        thresh2: float,
+        status: Optional[Callable[..., None]],
+        cancel: Optional[CancelToken],
+) -> Tuple[np.ndarray, Optional[float], YoungLaplaceFitResult]:
+    if status is not None:
+        status(AnalysisStage.EXTRACTING_FEATURES)
+
+    features = extract_pendant_features(
+        image,
+        drop_region,
+        needle_region,
+        thresh1=thresh1,
+        thresh2=thresh2,
+    )
+
+    if cancel is not None:
+        cancel.check()
+
+    if status is not None:
+        status(AnalysisStage.FITTING, (features.drop_points, features.needle_diameter))
+
+    fit = young_laplace_fit(features.drop_points, callback=cancel)
+
+    return features.drop_points, features.needle_diameter, fit
+
+
+def calculate_pendant_quantities(
+        fit: YoungLaplaceFitResult,
+        needle_diameter_px: Optional[float],
+        *,
+        drop_density: float,
+        continuous_density: float,
+        needle_diameter: float,
+        gravity: float,
+) -> PendantQuantities:
+    if needle_diameter_px is None:
+        return PendantQuantities(
+            interfacial_tension=NAN,
+            volume=NAN,
+            surface_area=NAN,
+            apex_radius=NAN,
+            worthington=NAN,
+        )
+
+    px_size = needle_diameter/needle_diameter_px
+    delta_density = abs(drop_density - continuous_density)
+
+    radius = fit.radius * px_size
+    surface_area = fit.surface_area * px_size**2
+    volume = fit.volume * px_size**3
+    ift = delta_density * gravity * radius**2 / fit.bond
+    worthington = (delta_density * gravity * volume) / (PI * ift * needle_diameter)
+
+    return PendantQuantities(
+        interfacial_tension=ift,
+        volume=volume,
+        surface_area=surface_area,
+        apex_radius=radius,
+        worthington=worthington,
+    )
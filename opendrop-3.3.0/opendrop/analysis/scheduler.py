@@ -0,0 +1,212 @@
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Hashable, List, MutableMapping, Optional, Tuple
+
+from .worker import AnalysisStage, CancelFlags, CancelToken, StatusListener, worker_executor_kwargs
+
+
+__all__ = ('TaskPriority', 'TaskScheduler')
+
+
+class TaskPriority(IntEnum):
+    PREVIEW = 0
+    ANALYSIS = 1
+
+
+class _Entry:
+    def __init__(
+            self,
+            fn: Callable,
+            args: tuple,
+            kwargs: dict,
+            future: asyncio.Future,
+            key: Optional[Hashable],
+            cancellable: bool,
+    ) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.key = key
+        self.cancellable = cancellable
+
+        self.queued = True
+        self.purgeable = False
+        self.started = False
+        self.cancel_token = None  # type: Optional[CancelToken]
+
+
+class TaskScheduler:
+    """Runs tasks in a pool of worker processes, higher priority tasks are started first.
+
+    Only as many tasks as there are workers are handed to the pool at any time, the rest wait in a priority queue.
+    Tasks submitted with a `key` are coalesced: a new task replaces any task with the same key that has not started
+    yet, so only the latest request for e.g. a preview source is run. Tasks cancelled before they start are dropped
+    without ever reaching a worker. Cancelling a running task that was submitted as `cancellable` sets a flag that
+    the task polls, so it can stop early and free its worker.
+    """
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            *,
+            loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self._loop = loop or asyncio.get_event_loop()
+
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._status_listener = StatusListener(self._loop)
+        self._cancel_flags = CancelFlags(self._max_workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            **worker_executor_kwargs(self._status_listener, self._cancel_flags),
+        )
+
+        self._queue = []  # type: List[Tuple[int, int, _Entry]]
+        self._num_cancelled_queued = 0
+        self._counter = itertools.count()
+        self._pending_by_key = {}  # type: MutableMapping[Hashable, _Entry]
+        self._num_running = 0
+
+        self._destroyed = False
+
+    def submit(
+            self,
+            fn: Callable,
+            *args,
+            priority: TaskPriority = TaskPriority.ANALYSIS,
+            key: Optional[Hashable] = None,
+            on_status: Optional[Callable[[AnalysisStage, Any], Any]] = None,
+            cancellable: bool = False,
+            **kwargs
+    ) -> asyncio.Future:
+        """Schedule `fn(*args, **kwargs)` to run in a worker process and return a future for its result.
+
+        If `on_status` is given, `fn` is also passed a `status` keyword argument which it can call to report its
+        progress, `on_status` is then invoked on the event loop with each reported stage and the data reported with
+        it (None if there was none).
+
+        If `cancellable` is true, `fn` is also passed a `cancel` keyword argument, a CancelToken which `fn` should
+        check every so often. Cancelling the returned future while the task is running will then make the token
+        raise TaskCancelled in the worker.
+        """
+        if self._destroyed:
+            raise RuntimeError("Scheduler has been destroyed")
+
+        future = self._loop.create_future()
+
+        if on_status is not None:
+            reporter = self._status_listener.register(on_status)
+            kwargs['status'] = reporter
+            future.add_done_callback(lambda _: self._status_listener.unregister(reporter))
+
+        entry = _Entry(fn, args, kwargs, future, key, cancellable)
+        future.add_done_callback(lambda _: self._future_done(entry))
+
+        if key is not None:
+            superseded = self._pending_by_key.get(key)
+            if superseded is not None:
+                superseded.future.cancel()
+            self._pending_by_key[key] = entry
+
+        # heapq is a min-heap, so negate priority. The counter keeps tasks of equal priority in submission order.
+        heapq.heappush(self._queue, (-priority, next(self._counter), entry))
+        self._dispatch()
+
+        return future
+
+    def _dispatch(self) -> None:
+        while self._num_running < self._max_workers and self._queue:
+            _, _, entry = heapq.heappop(self._queue)
+            entry.queued = False
+            if entry.purgeable:
+                self._num_cancelled_queued -= 1
+
+            if entry.key is not None and self._pending_by_key.get(entry.key) is entry:
+                del self._pending_by_key[entry.key]
+
+            if entry.future.cancelled():
+                # Superseded or cancelled before it started, drop it.
+                continue
+
+            entry.started = True
+            self._num_running += 1
+
+            if entry.cancellable:
+                entry.cancel_token = self._cancel_flags.acquire()
+                entry.kwargs['cancel'] = entry.cancel_token
+
+            cfut = self._executor.submit(entry.fn, *entry.args, **entry.kwargs)
+            cfut.add_done_callback(
+                lambda cfut, entry=entry: self._loop.call_soon_threadsafe(self._task_done, entry, cfut)
+            )
+
+    def _future_done(self, entry: _Entry) -> None:
+        if not entry.future.cancelled():
+            return
+
+        if entry.started:
+            if entry.cancel_token is not None:
+                # Ask the running task to stop, its worker is released in _task_done() once it returns.
+                self._cancel_flags.cancel(entry.cancel_token)
+            return
+
+        if entry.key is not None and self._pending_by_key.get(entry.key) is entry:
+            del self._pending_by_key[entry.key]
+
+        if not entry.queued:
+            return
+
+        # Still queued, drop the arguments now so large images are not kept alive until the entry is popped.
+        entry.args = ()
+        entry.kwargs = {}
+
+        entry.purgeable = True
+        self._num_cancelled_queued += 1
+        if self._num_cancelled_queued > len(self._queue)//2:
+            self._purge_cancelled()
+
+    def _purge_cancelled(self) -> None:
+        for _, _, entry in self._queue:
+            if entry.future.cancelled():
+                entry.queued = False
+
+        self._queue = [item for item in self._queue if item[2].queued]
+        heapq.heapify(self._queue)
+        self._num_cancelled_queued = 0
+
+    def _task_done(self, entry: _Entry, cfut: concurrent.futures.Future) -> None:
+        self._num_running -= 1
+
+        if entry.cancel_token is not None:
+            self._cancel_flags.release(entry.cancel_token)
+            entry.cancel_token = None
+
+        if not entry.future.cancelled():
+            if cfut.cancelled():
+                entry.future.cancel()
+            elif cfut.exception() is not None:
+                entry.future.set_exception(cfut.exception())
+            else:
+                entry.future.set_result(cfut.result())
+
+        if not self._destroyed:
+            self._dispatch()
+
+    def destroy(self) -> None:
+        self._destroyed = True
+
+        for _, _, entry in self._queue:
+            entry.future.cancel()
+
+        self._queue.clear()
+        self._num_cancelled_queued = 0
+        self._pending_by_key.clear()
+
+        self._executor.shutdown()
+        self._status_listener.close()
@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import multiprocessing
+import threading
+from enum import Enum
+from typing import Any, Callable, List, Mapping, MutableMapping, Optional
+
+
+__all__ = ('AnalysisStage', 'StatusListener', 'StatusReporter', 'TaskCancelled', 'CancelToken', 'CancelFlags')
+
+
+class AnalysisStage(Enum):
+    EXTRACTING_FEATURES = 0
+    # Reported with the extracted features, so they can be shown while fitting.
+    FITTING = 1
+
+
+# Status queue and cancel flags installed in each worker process by worker_executor_kwargs().
+_worker_queue = None
+_worker_cancel_flags = None
+
+
+def _init_worker(queue, cancel_flags) -> None:
+    global _worker_queue, _worker_cancel_flags
+    _worker_queue = queue
+    _worker_cancel_flags = cancel_flags
+
+
+def worker_executor_kwargs(status_listener: 'StatusListener', cancel_flags: 'CancelFlags') -> Mapping[str, Any]:
+    """Keyword arguments for creating a ProcessPoolExecutor whose tasks can report their status to
+    `status_listener` and check for cancellation in `cancel_flags`."""
+    return {'initializer': _init_worker, 'initargs': (status_listener.queue, cancel_flags.array)}
+
+
+class StatusReporter:
+    """Picklable callable handed to worker-side tasks, reports the stage a task has reached (and optionally some
+    picklable data that goes with it) back to the StatusListener that created it."""
+
+    def __init__(self, task_id: int) -> None:
+        self.task_id = task_id
+
+    def __call__(self, stage: AnalysisStage, data: Any = None) -> None:
+        if _worker_queue is None:
+            return
+
+        _worker_queue.put((self.task_id, stage, data))
+
+
+class StatusListener:
+    """Receives status updates from worker processes and invokes the registered callbacks on `loop`.
+
+    Executors must be created with `**worker_executor_kwargs(listener, ...)` so that worker processes can report
+    back.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self._loop = loop or asyncio.get_event_loop()
+        self._queue = multiprocessing.SimpleQueue()
+
+        self._task_ids = itertools.count()
+        self._callbacks = {}  # type: MutableMapping[int, Callable[[AnalysisStage, Any], Any]]
+
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @property
+    def queue(self) -> multiprocessing.SimpleQueue:
+        return self._queue
+
+    def register(self, callback: Callable[[AnalysisStage, Any], Any]) -> StatusReporter:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+        task_id = next(self._task_ids)
+        self._callbacks[task_id] = callback
+
+        return StatusReporter(task_id)
+
+    def unregister(self, reporter: StatusReporter) -> None:
+        self._callbacks.pop(reporter.task_id, None)
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+
+            self._loop.call_soon_threadsafe(self._dispatch, *message)
+
+    def _dispatch(self, task_id: int, stage: AnalysisStage, data: Any) -> None:
+        callback = self._callbacks.get(task_id)
+        if callback is None:
+            # Task has already finished or was never registered.
+            return
+
+        callback(stage, data)
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        self._callbacks.clear()
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker task when it notices it has been cancelled."""
+
+
+class CancelToken:
+    """Picklable handle handed to worker-side tasks, lets a task check whether it has been cancelled.
+
+    Calling the token raises TaskCancelled if it has been cancelled, so it can be passed directly as a callback to
+    long running functions.
+    """
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+
+    def cancelled(self) -> bool:
+        if _worker_cancel_flags is None:
+            return False
+
+        return bool(_worker_cancel_flags[self.slot])
+
+    def check(self) -> None:
+        if self.cancelled():
+            raise TaskCancelled
+
+    def __call__(self, *_) -> None:
+        self.check()
+
+
+class CancelFlags:
+    """A fixed number of cancel flags in shared memory, one for each task that can run at the same time.
+
+    Executors must be created with `**worker_executor_kwargs(..., flags)` so that worker processes can see the flags.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._array = multiprocessing.RawArray('b', size)
+        self._free = list(range(size))  # type: List[int]
+
+    @property
+    def array(self):
+        return self._array
+
+    def acquire(self) -> CancelToken:
+        if not self._free:
+            raise RuntimeError("No free cancel flags")
+
+        slot = self._free.pop()
+        self._array[slot] = 0
+
+        return CancelToken(slot)
+
+    def cancel(self, token: CancelToken) -> None:
+        self._array[token.slot] = 1
+
+    def release(self, token: CancelToken) -> None:
+        self._array[token.slot] = 0
+        self._free.append(token.slot)
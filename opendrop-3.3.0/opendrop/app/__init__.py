@@ -33,5 +33,7 @@ Gtk.IconTheme.get_default().add_resource_path('/opendrop/assets/icons')
 asyncio.set_event_loop_policy(aioglib.GLibEventLoopPolicy())
 
 
-from . import main_menu, ift, conan, common
+# Only the main menu is needed to start, the experiment packages (and the components they register) are imported by
+# OpendropApplication when first opened.
+from . import main_menu
 from .app import OpendropApplication
@@ -28,6 +28,7 @@
 
 
 import asyncio
+import importlib
 from enum import Enum
 from typing import cast
 
@@ -94,6 +95,7 @@ class OpendropApplication(Gtk.Application):
 
         self._clear_current_window()
 
+        self._load_components('opendrop.app.ift')
         self._current_window = cast(Gtk.Window, self._cf.create('IFTExperiment'))
         self._current_window.show()
 
@@ -107,6 +109,7 @@ class OpendropApplication(Gtk.Application):
 
         self._clear_current_window()
 
+        self._load_components('opendrop.app.conan')
         self._current_window = cast(Gtk.Window, self._cf.create('ConanExperiment'))
         self._current_window.show()
 
@@ -114,6 +117,12 @@ class OpendropApplication(Gtk.Application):
 
         self.add_window(self._current_window)
 
+    @staticmethod
+    def _load_components(package: str) -> None:
+        # Components are registered when their modules are imported, which for an experiment (with its analysis and
+        # plotting dependencies) takes a while, so it's only done the first time the experiment is opened.
+        importlib.import_module(package)
+
     def _clear_current_window(self) -> None:
         if self._current_window is None: return
         self._current_window.destroy()
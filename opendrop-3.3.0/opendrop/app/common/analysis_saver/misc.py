@@ -33,8 +33,6 @@ from typing import Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
-from matplotlib.figure import Figure
-from matplotlib.ticker import MultipleLocator
 
 from opendrop.geometry import Line2, Rect2, Vector2
 
@@ -49,6 +47,10 @@ def simple_grapher(label_x: str, label_y: str, data_x: Sequence[float], data_y:
                    dpi: int = 300):
     # TODO: Handle when data_x/data_y is an empty sequence.
 
+    # Imported here since matplotlib is slow to import and only needed when saving.
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import MultipleLocator
+
     fig_size_in = INCHES_PER_CM * fig_size[0], INCHES_PER_CM * fig_size[1]
     fig = Figure(figsize=fig_size_in, dpi=dpi)
 
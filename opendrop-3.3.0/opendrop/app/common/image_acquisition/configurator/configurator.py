@@ -36,7 +36,10 @@ from opendrop.app.common.services.acquisition import (
     GenicamAcquirer,
     ImageAcquirer,
     LocalStorageAcquirer,
+    RecordingAcquirer,
+    SyntheticCameraAcquirer,
     USBCameraAcquirer,
+    VideoFileAcquirer,
 )
 from opendrop.appfw import ComponentFactory, Presenter, component, install
 
@@ -68,10 +71,16 @@ class ImageAcquisitionConfiguratorPresenter(Presenter[Gtk.Bin]):
             self.remove_configurator()
         elif isinstance(acquirer, LocalStorageAcquirer):
             self.load_local_storage_configurator()
+        elif isinstance(acquirer, VideoFileAcquirer):
+            self.load_video_file_configurator()
+        elif isinstance(acquirer, RecordingAcquirer):
+            self.load_recording_configurator()
         elif isinstance(acquirer, USBCameraAcquirer):
             self.load_usb_camera_configurator()
         elif isinstance(acquirer, GenicamAcquirer):
             self.load_genicam_configurator()
+        elif isinstance(acquirer, SyntheticCameraAcquirer):
+            self.load_synthetic_configurator()
         else:
             raise ValueError(
                 "No configurator available for acquirer '{}'"
@@ -98,6 +107,28 @@ class ImageAcquisitionConfiguratorPresenter(Presenter[Gtk.Bin]):
         self.configurator_component.view_rep.show()
         self.host.add(self.configurator_component.view_rep)
 
+    def load_video_file_configurator(self) -> None:
+        self.remove_configurator()
+
+        configurator = self.cf.create(
+            'ImageAcquisitionConfiguratorVideoFile',
+            acquirer=self._acquirer,
+            visible=True,
+        )
+
+        self.host.add(configurator)
+
+    def load_recording_configurator(self) -> None:
+        self.remove_configurator()
+
+        configurator = self.cf.create(
+            'ImageAcquisitionConfiguratorRecording',
+            acquirer=self._acquirer,
+            visible=True,
+        )
+
+        self.host.add(configurator)
+
     def load_usb_camera_configurator(self) -> None:
         self.remove_configurator()
 
@@ -120,6 +151,17 @@ class ImageAcquisitionConfiguratorPresenter(Presenter[Gtk.Bin]):
 
         self.host.add(configurator)
 
+    def load_synthetic_configurator(self) -> None:
+        self.remove_configurator()
+
+        configurator = self.cf.create(
+            'ImageAcquisitionConfiguratorSynthetic',
+            acquirer=self._acquirer,
+            visible=True,
+        )
+
+        self.host.add(configurator)
+
     def remove_configurator(self) -> None:
         if self.configurator_component is not None:
             self.configurator_component.destroy()
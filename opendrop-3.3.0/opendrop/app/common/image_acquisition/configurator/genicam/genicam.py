@@ -28,6 +28,7 @@ class ImageAcquisitionConfiguratorGenicamPresenter(Presenter):
             self.acquirer.bn_camera_id.on_changed.connect(self.acquirer_camera_id_changed),
             self.acquirer.bn_num_frames.on_changed.connect(self.acquirer_num_frames_changed),
             self.acquirer.bn_frame_interval.on_changed.connect(self.acquirer_frame_interval_changed),
+            self.acquirer.bn_keep_high_bit_depth.on_changed.connect(self.acquirer_keep_high_bit_depth_changed),
         ]
 
         self.acquirer_camera_id_changed()
@@ -45,6 +46,9 @@ class ImageAcquisitionConfiguratorGenicamPresenter(Presenter):
     def acquirer_frame_interval_changed(self) -> None:
         self.notify('frame-interval')
 
+    def acquirer_keep_high_bit_depth_changed(self) -> None:
+        self.notify('keep-high-bit-depth')
+
     def update_camera_buttons(self) -> None:
         camera_id = self.acquirer.bn_camera_id.get()
 
@@ -73,6 +77,14 @@ class ImageAcquisitionConfiguratorGenicamPresenter(Presenter):
     def frame_interval(self, interval: Optional[float]) -> None:
         self.acquirer.bn_frame_interval.set(interval)
 
+    @GObject.Property(type=bool, default=False, flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def keep_high_bit_depth(self) -> bool:
+        return self.acquirer.bn_keep_high_bit_depth.get()
+
+    @keep_high_bit_depth.setter
+    def keep_high_bit_depth(self, value: bool) -> None:
+        self.acquirer.bn_keep_high_bit_depth.set(value)
+
     @GObject.Property(type=bool, default=False, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
     def frame_interval_enabled(self) -> bool:
         return self.acquirer.bn_num_frames.get() != 1
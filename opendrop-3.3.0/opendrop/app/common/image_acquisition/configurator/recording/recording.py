@@ -0,0 +1,68 @@
+from gi.repository import Gtk, GObject
+
+from opendrop.appfw import Presenter, TemplateChild, component, install
+from opendrop.app.common.services.acquisition import RecordingAcquirer
+
+
+@component(
+    template_path='./recording.ui',
+)
+class ImageAcquisitionConfiguratorRecordingPresenter(Presenter):
+    file_chooser_button: TemplateChild[Gtk.FileChooserButton] = TemplateChild('file_chooser_button')
+
+    _error_text = ''
+
+    def after_view_init(self) -> None:
+        path = self.acquirer.bn_path.get()
+        if path is not None:
+            self.file_chooser_button.set_filename(str(path))
+
+        self.event_connections = [
+            self.acquirer.bn_images.on_changed.connect(self.acquirer_images_changed),
+        ]
+
+    def acquirer_images_changed(self) -> None:
+        self.notify('recording-description')
+
+    def file_chooser_button_file_set(self, *_) -> None:
+        filename = self.file_chooser_button.get_filename()
+        if filename is None: return
+
+        try:
+            self.acquirer.load_recording(filename)
+        except ValueError as e:
+            self.error_text = e.args[0]
+        else:
+            self.error_text = ''
+
+    @GObject.Property(type=str, flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def error_text(self) -> str:
+        return self._error_text
+
+    @error_text.setter
+    def error_text(self, text: str) -> None:
+        self._error_text = text
+        self.notify('error-text')
+
+    @GObject.Property(type=str, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def recording_description(self) -> str:
+        if self.acquirer.bn_path.get() is None:
+            return ''
+
+        num_frames = len(self.acquirer.bn_images.get())
+        duration = self.acquirer.bn_duration.get()
+
+        return '{} frames over {:.4g} s'.format(num_frames, duration)
+
+    @install
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.CONSTRUCT_ONLY)
+    def acquirer(self) -> RecordingAcquirer:
+        return self._acquirer
+
+    @acquirer.setter
+    def acquirer(self, acquirer: RecordingAcquirer) -> None:
+        self._acquirer = acquirer
+
+    def destroy(self, *_) -> None:
+        for conn in self.event_connections:
+            conn.disconnect()
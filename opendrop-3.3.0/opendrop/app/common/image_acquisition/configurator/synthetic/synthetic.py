@@ -0,0 +1,133 @@
+from typing import Optional
+
+from gi.repository import Gtk, GObject
+
+# These widgets are used in templates, import them to make sure they're registered with the GLib type system.
+from opendrop.widgets.integer_entry import IntegerEntry
+from opendrop.widgets.float_entry import FloatEntry
+
+from opendrop.appfw import Presenter, TemplateChild, component, install
+from opendrop.app.common.services.acquisition import SyntheticCameraAcquirer, SyntheticDrop
+
+
+@component(
+    template_path='./synthetic.ui',
+)
+class ImageAcquisitionConfiguratorSyntheticPresenter(Presenter):
+    drop_combo_box: TemplateChild[Gtk.ComboBoxText] = TemplateChild('drop_combo_box')
+
+    def after_view_init(self) -> None:
+        for drop in SyntheticDrop:
+            self.drop_combo_box.append(id=drop.name, text=drop.display_name)
+
+        self.drop_combo_box.props.active_id = self.acquirer.bn_drop.get().name
+
+        self.event_connections = [
+            self.acquirer.bn_num_frames.on_changed.connect(self.acquirer_num_frames_changed),
+            self.acquirer.bn_frame_interval.on_changed.connect(self.acquirer_frame_interval_changed),
+        ]
+
+        self.acquirer_num_frames_changed()
+        self.acquirer_frame_interval_changed()
+
+    def acquirer_num_frames_changed(self) -> None:
+        self.notify('num-frames')
+        self.notify('frame-interval-enabled')
+
+    def acquirer_frame_interval_changed(self) -> None:
+        self.notify('frame-interval')
+
+    def drop_combo_box_changed(self, *_) -> None:
+        active_id = self.drop_combo_box.props.active_id
+        if active_id is None: return
+
+        self.acquirer.bn_drop.set(SyntheticDrop[active_id])
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def width(self) -> Optional[int]:
+        return self.acquirer.bn_width.get()
+
+    @width.setter
+    def width(self, width: Optional[int]) -> None:
+        self.acquirer.bn_width.set(width)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def height(self) -> Optional[int]:
+        return self.acquirer.bn_height.get()
+
+    @height.setter
+    def height(self, height: Optional[int]) -> None:
+        self.acquirer.bn_height.set(height)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def fps(self) -> Optional[float]:
+        return self.acquirer.bn_fps.get()
+
+    @fps.setter
+    def fps(self, fps: Optional[float]) -> None:
+        self.acquirer.bn_fps.set(fps)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def bond(self) -> Optional[float]:
+        return self.acquirer.bn_bond.get()
+
+    @bond.setter
+    def bond(self, bond: Optional[float]) -> None:
+        self.acquirer.bn_bond.set(bond)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def bond_drift(self) -> Optional[float]:
+        return self.acquirer.bn_bond_drift.get()
+
+    @bond_drift.setter
+    def bond_drift(self, drift: Optional[float]) -> None:
+        self.acquirer.bn_bond_drift.set(drift)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def noise(self) -> Optional[float]:
+        return self.acquirer.bn_noise.get()
+
+    @noise.setter
+    def noise(self, noise: Optional[float]) -> None:
+        self.acquirer.bn_noise.set(noise)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def blur(self) -> Optional[float]:
+        return self.acquirer.bn_blur.get()
+
+    @blur.setter
+    def blur(self, blur: Optional[float]) -> None:
+        self.acquirer.bn_blur.set(blur)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def num_frames(self) -> Optional[int]:
+        return self.acquirer.bn_num_frames.get()
+
+    @num_frames.setter
+    def num_frames(self, num: Optional[int]) -> None:
+        self.acquirer.bn_num_frames.set(num)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def frame_interval(self) -> Optional[float]:
+        return self.acquirer.bn_frame_interval.get()
+
+    @frame_interval.setter
+    def frame_interval(self, interval: Optional[float]) -> None:
+        self.acquirer.bn_frame_interval.set(interval)
+
+    @GObject.Property(type=bool, default=False, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def frame_interval_enabled(self) -> bool:
+        return self.acquirer.bn_num_frames.get() != 1
+
+    @install
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.CONSTRUCT_ONLY)
+    def acquirer(self) -> SyntheticCameraAcquirer:
+        return self._acquirer
+
+    @acquirer.setter
+    def acquirer(self, acquirer: SyntheticCameraAcquirer) -> None:
+        self._acquirer = acquirer
+
+    def destroy(self, *_) -> None:
+        for conn in self.event_connections:
+            conn.disconnect()
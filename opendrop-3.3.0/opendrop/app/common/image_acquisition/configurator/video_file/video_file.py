@@ -0,0 +1,139 @@
+import math
+from typing import Optional
+
+from gi.repository import Gtk, GObject
+
+# These widgets are used in templates, import them to make sure they're registered with the GLib type system.
+from opendrop.widgets.integer_entry import IntegerEntry
+
+from opendrop.appfw import Presenter, TemplateChild, component, install
+from opendrop.app.common.services.acquisition import VideoFileAcquirer
+
+
+@component(
+    template_path='./video_file.ui',
+)
+class ImageAcquisitionConfiguratorVideoFilePresenter(Presenter):
+    file_chooser_button: TemplateChild[Gtk.FileChooserButton] = TemplateChild('file_chooser_button')
+
+    _error_text = ''
+
+    def after_view_init(self) -> None:
+        video_filter = Gtk.FileFilter()
+        video_filter.set_name('Videos')
+        video_filter.add_mime_type('video/*')
+        self.file_chooser_button.add_filter(video_filter)
+
+        path = self.acquirer.bn_path.get()
+        if path is not None:
+            self.file_chooser_button.set_filename(str(path))
+
+        self.event_connections = [
+            self.acquirer.bn_path.on_changed.connect(self.acquirer_video_changed),
+            self.acquirer.bn_first_frame.on_changed.connect(self.acquirer_first_frame_changed),
+            self.acquirer.bn_last_frame.on_changed.connect(self.acquirer_last_frame_changed),
+            self.acquirer.bn_frame_stride.on_changed.connect(self.acquirer_frame_stride_changed),
+            self.acquirer.bn_images.on_changed.connect(self.acquirer_images_changed),
+        ]
+
+        self.acquirer_video_changed()
+
+    def acquirer_video_changed(self) -> None:
+        self.notify('video-description')
+        self.notify('last-frame-upper')
+        self.acquirer_first_frame_changed()
+        self.acquirer_last_frame_changed()
+        self.acquirer_frame_stride_changed()
+
+    def acquirer_first_frame_changed(self) -> None:
+        self.notify('first-frame')
+
+    def acquirer_last_frame_changed(self) -> None:
+        self.notify('last-frame')
+
+    def acquirer_frame_stride_changed(self) -> None:
+        self.notify('frame-stride')
+
+    def acquirer_images_changed(self) -> None:
+        self.notify('selection-description')
+
+    def file_chooser_button_file_set(self, *_) -> None:
+        filename = self.file_chooser_button.get_filename()
+        if filename is None: return
+
+        try:
+            self.acquirer.load_video(filename)
+        except ValueError as e:
+            self.error_text = e.args[0]
+        else:
+            self.error_text = ''
+
+    @GObject.Property(type=str, flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def error_text(self) -> str:
+        return self._error_text
+
+    @error_text.setter
+    def error_text(self, text: str) -> None:
+        self._error_text = text
+        self.notify('error-text')
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def first_frame(self) -> Optional[int]:
+        return self.acquirer.bn_first_frame.get()
+
+    @first_frame.setter
+    def first_frame(self, frame: Optional[int]) -> None:
+        self.acquirer.bn_first_frame.set(frame)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def last_frame(self) -> Optional[int]:
+        return self.acquirer.bn_last_frame.get()
+
+    @last_frame.setter
+    def last_frame(self, frame: Optional[int]) -> None:
+        self.acquirer.bn_last_frame.set(frame)
+
+    @GObject.Property(type=int, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def last_frame_upper(self) -> int:
+        return max(self.acquirer.bn_num_video_frames.get() - 1, 0)
+
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def frame_stride(self) -> Optional[int]:
+        return self.acquirer.bn_frame_stride.get()
+
+    @frame_stride.setter
+    def frame_stride(self, stride: Optional[int]) -> None:
+        self.acquirer.bn_frame_stride.set(stride)
+
+    @GObject.Property(type=str, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def video_description(self) -> str:
+        if self.acquirer.bn_path.get() is None:
+            return ''
+
+        num_frames = self.acquirer.bn_num_video_frames.get()
+        fps = self.acquirer.bn_fps.get()
+
+        if math.isnan(fps):
+            return '{} frames'.format(num_frames)
+        else:
+            return '{} frames at {:.4g} fps'.format(num_frames, fps)
+
+    @GObject.Property(type=str, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def selection_description(self) -> str:
+        if self.acquirer.bn_path.get() is None:
+            return ''
+
+        return '{} frames selected'.format(len(self.acquirer.bn_images.get()))
+
+    @install
+    @GObject.Property(flags=GObject.ParamFlags.READWRITE|GObject.ParamFlags.CONSTRUCT_ONLY)
+    def acquirer(self) -> VideoFileAcquirer:
+        return self._acquirer
+
+    @acquirer.setter
+    def acquirer(self, acquirer: VideoFileAcquirer) -> None:
+        self._acquirer = acquirer
+
+    def destroy(self, *_) -> None:
+        for conn in self.event_connections:
+            conn.disconnect()
@@ -27,12 +27,13 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
+from pathlib import Path
 from typing import Optional
 
 from gi.repository import Gtk, GObject
 from injector import inject
 
-from opendrop.app.common.services.acquisition import AcquirerType, ImageAcquisitionService, ImageAcquirer
+from opendrop.app.common.services.acquisition import AcquirerType, CameraAcquirer, ImageAcquisitionService, ImageAcquirer
 from opendrop.appfw import Presenter, TemplateChild, component
 
 
@@ -41,6 +42,8 @@ from opendrop.appfw import Presenter, TemplateChild, component
 )
 class ImageAcquisitionPresenter(Presenter):
     combo_box = TemplateChild('combo_box')  # type: TemplateChild[Gtk.ComboBoxText]
+    record_check_button = TemplateChild('record_check_button')  # type: TemplateChild[Gtk.CheckButton]
+    record_chooser_button = TemplateChild('record_chooser_button')  # type: TemplateChild[Gtk.FileChooserButton]
 
     @inject
     def __init__(self, acquisition_service: ImageAcquisitionService) -> None:
@@ -56,8 +59,27 @@ class ImageAcquisitionPresenter(Presenter):
 
         self.combo_box.connect('notify::active-id', self.combo_box_active_id_changed)
 
+        recording_dir = self.acquisition_service.bn_recording_dir.get()
+        if recording_dir is not None:
+            self.record_chooser_button.set_filename(str(recording_dir))
+            self.record_check_button.props.active = True
+
         self.acquisition_service_acquirer_changed()
 
+    def record_check_button_toggled(self, *_) -> None:
+        self.update_recording_dir()
+
+    def record_chooser_button_file_set(self, *_) -> None:
+        self.record_check_button.props.active = True
+        self.update_recording_dir()
+
+    def update_recording_dir(self) -> None:
+        filename = self.record_chooser_button.get_filename()
+        if self.record_check_button.props.active and filename is not None:
+            self.acquisition_service.bn_recording_dir.set(Path(filename))
+        else:
+            self.acquisition_service.bn_recording_dir.set(None)
+
     def combo_box_active_id_changed(self, *_) -> None:
         active_id = self.combo_box.props.active_id
         if active_id is not None:
@@ -73,11 +95,17 @@ class ImageAcquisitionPresenter(Presenter):
             self.combo_box.props.active_id = None
 
         self.notify('acquirer')
+        self.notify('can-record')
 
     @GObject.Property(flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
     def acquirer(self) -> Optional[ImageAcquirer]:
         return self.acquisition_service.bn_acquirer.get()
 
+    @GObject.Property(type=bool, default=False, flags=GObject.ParamFlags.READABLE|GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def can_record(self) -> bool:
+        """Whether frames from the current image source can be recorded."""
+        return isinstance(self.acquisition_service.bn_acquirer.get(), CameraAcquirer)
+
     def populate_combobox(self) -> None:
         for typ in AcquirerType:
             self.combo_box.append(id=typ.name, text=typ.display_name)
@@ -28,12 +28,15 @@
 
 
 import asyncio
-import itertools
-from typing import Optional, Hashable, Iterable, MutableSequence
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Hashable, MutableMapping, Sequence, Tuple
 
 import numpy as np
 
-from opendrop.app.common.services.acquisition import ImageSequenceAcquirer, CameraAcquirer
+from opendrop.app.common.services.acquisition import ImageSequenceAcquirer, LazyImageSequence, CameraAcquirer
 from opendrop.utility.bindable import AccessorBindable
 from opendrop.utility.bindable.typing import Bindable
 from opendrop.utility.misc import clamp
@@ -44,11 +47,95 @@ class AcquirerController:
         pass
 
 
+class FeaturesCache:
+    """A least recently used cache of feature extraction futures, keyed by image ID.
+
+    At most `max_entries` futures are kept, and finished results are evicted once the arrays they hold add up to
+    more than `max_bytes` (the most recently used entry is always kept). Futures are cancelled when they are
+    evicted or discarded.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 128 * 2**20) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+
+        self._futs = OrderedDict()  # type: MutableMapping[Hashable, asyncio.Future]
+        self._nbytes = {}  # type: MutableMapping[Hashable, int]
+        self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._futs)
+
+    def __contains__(self, image_id: Hashable) -> bool:
+        return image_id in self._futs
+
+    def get(self, image_id: Hashable) -> Optional[asyncio.Future]:
+        fut = self._futs.get(image_id)
+        if fut is not None:
+            self._futs.move_to_end(image_id)
+
+        return fut
+
+    def put(self, image_id: Hashable, fut: asyncio.Future) -> None:
+        self.discard(image_id)
+
+        self._futs[image_id] = fut
+        fut.add_done_callback(functools.partial(self._fut_done, image_id))
+
+        self._evict()
+
+    def discard(self, image_id: Hashable) -> None:
+        fut = self._futs.pop(image_id, None)
+        if fut is None:
+            return
+
+        self._total_bytes -= self._nbytes.pop(image_id, 0)
+        fut.cancel()
+
+    def clear(self) -> None:
+        for image_id in tuple(self._futs):
+            self.discard(image_id)
+
+    def _fut_done(self, image_id: Hashable, fut: asyncio.Future) -> None:
+        if self._futs.get(image_id) is not fut:
+            return
+
+        if fut.cancelled():
+            # Superseded before it started, a new request has to be made.
+            del self._futs[image_id]
+            return
+
+        if fut.exception() is not None:
+            return
+
+        nbytes = _nbytes(fut.result())
+        self._nbytes[image_id] = nbytes
+        self._total_bytes += nbytes
+
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._futs) > 1 and (len(self._futs) > self._max_entries or self._total_bytes > self._max_bytes):
+            self.discard(next(iter(self._futs)))
+
+
+def _nbytes(result: Any) -> int:
+    # Features are named tuples, count the arrays they hold.
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    elif isinstance(result, tuple):
+        return sum(v.nbytes for v in result if isinstance(v, np.ndarray))
+    else:
+        return 0
+
+
 class ImageSequenceAcquirerController(AcquirerController):
     class _ImageRegistration:
-        def __init__(self, image_id: Hashable, image: np.ndarray) -> None:
+        def __init__(self, image_id: Hashable, image: Optional[np.ndarray], index: Optional[int] = None) -> None:
             self.image_id = image_id
+            # Images of a LazyImageSequence are not kept, they are looked up by index when needed.
             self.image = image
+            self.index = index
 
     def __init__(
             self, *,
@@ -58,7 +145,11 @@ class ImageSequenceAcquirerController(AcquirerController):
         self._acquirer = acquirer
         self._source_image_out = source_image_out
 
-        self._image_registry = []  # type: MutableSequence[self._ImageRegistration]
+        # Images of a LazyImageSequence are identified by their keys, other images by a digest of their contents.
+        self._image_registry = {}  # type: MutableMapping[Hashable, ImageSequenceAcquirerController._ImageRegistration]
+
+        # Digests of the current images, by id() of the images, so unchanged images are not hashed again.
+        self._image_digests = {}  # type: MutableMapping[int, Tuple[np.ndarray, Hashable]]
 
         self.bn_num_images = AccessorBindable(
             getter=self._get_num_images,
@@ -72,6 +163,9 @@ class ImageSequenceAcquirerController(AcquirerController):
 
         self._showing_image_id = None  # type: Optional[Hashable]
 
+        # 1 if the user last stepped forward through the images, -1 if backward.
+        self._step_direction = 1
+
         self.__event_connections = [
             acquirer.bn_images.on_changed.connect(
                 self._hdl_acquirer_images_changed
@@ -85,53 +179,66 @@ class ImageSequenceAcquirerController(AcquirerController):
         self._update_showing_image()
 
     def _update_image_registry(self) -> None:
-        acquirer_images = list(self._acquirer.bn_images.get())
+        acquirer_images = self._acquirer.bn_images.get()
+        if isinstance(acquirer_images, LazyImageSequence):
+            self._image_digests = {}
+            self._update_lazy_image_registry(acquirer_images)
+        else:
+            self._update_image_array_registry(acquirer_images)
 
-        for image_reg in tuple(self._get_unassociated_registered_images(acquirer_images)):
-            self._image_registry.remove(image_reg)
-            self._on_image_deregistered(image_reg.image_id)
+        self.bn_num_images.poke()
 
-        for image in self._filter_unregistered_images(acquirer_images):
-            new_image_reg = self._ImageRegistration(
-                image_id=id(image),
-                image=image,
-            )
-            self._image_registry.append(new_image_reg)
-            self._on_image_registered(
-                image_id=new_image_reg.image_id,
-                image=image,
-            )
+    def _update_lazy_image_registry(self, images: LazyImageSequence) -> None:
+        # Lazy images are identified by their keys, so they don't need to be decoded to be registered.
+        indices = {key: i for i, key in enumerate(images.keys)}
 
-        self.bn_num_images.poke()
+        for image_id, image_reg in tuple(self._image_registry.items()):
+            if image_id not in indices:
+                del self._image_registry[image_id]
+                self._on_image_deregistered(image_id)
+            else:
+                image_reg.index = indices.pop(image_id)
 
-    def _filter_unregistered_images(self, images: Iterable[np.ndarray]) -> Iterable[np.ndarray]:
-        return itertools.filterfalse(self._is_image_registered, images)
+        for key, i in indices.items():
+            self._image_registry[key] = self._ImageRegistration(image_id=key, image=None, index=i)
+            self._on_image_registered(image_id=key)
 
-    def _is_image_registered(self, image: np.ndarray) -> bool:
-        try:
-            self._get_image_reg_by_image(image)
-        except ValueError:
-            return False
-        else:
-            return True
+    def _update_image_array_registry(self, acquirer_images: Sequence[np.ndarray]) -> None:
+        digests = [self._get_image_digest(image) for image in acquirer_images]
 
-    def _get_unassociated_registered_images(self, images: Iterable[np.ndarray]) -> Iterable[_ImageRegistration]:
-        return (
-            image_reg
-            for image_reg in self._image_registry
-            if not self._is_registered_image_associated(images, image_reg)
-        )
+        self._image_digests = {
+            id(image): (image, digest)
+            for image, digest in zip(acquirer_images, digests)
+        }
 
-    @staticmethod
-    def _is_registered_image_associated(images: Iterable[np.ndarray], image_reg: _ImageRegistration) -> bool:
-        for image in images:
-            if np.array_equal(image_reg.image, image):
-                return True
-        else:
-            return False
+        current = set(digests)
+        for image_id in tuple(self._image_registry):
+            if image_id not in current:
+                del self._image_registry[image_id]
+                self._on_image_deregistered(image_id)
+
+        for image, digest in zip(acquirer_images, digests):
+            if digest in self._image_registry:
+                # Already registered, or the same as an earlier image in the sequence.
+                continue
+
+            self._image_registry[digest] = self._ImageRegistration(image_id=digest, image=image)
+            self._on_image_registered(image_id=digest)
+
+    def _get_image_digest(self, image: np.ndarray) -> Hashable:
+        entry = self._image_digests.get(id(image))
+        if entry is not None and entry[0] is image:
+            return entry[1]
+
+        # Identical images get the same digest, like comparing them by value.
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((image.shape, image.dtype.str)).encode())
+        h.update(np.ascontiguousarray(image).data)
+
+        return h.digest()
 
     def _update_showing_image(self) -> None:
-        acquirer_images = list(self._acquirer.bn_images.get())
+        acquirer_images = self._acquirer.bn_images.get()
         if self._showing_image_index is None and len(acquirer_images) > 0:
             self._showing_image_index = 0
             self.bn_showing_image_index.poke()
@@ -139,11 +246,10 @@ class ImageSequenceAcquirerController(AcquirerController):
         if self._showing_image_index is None:
             return
 
-        new_showing_image_reg = self._get_image_reg_by_image(
-            image=acquirer_images[self._showing_image_index]
-        )
-
-        new_showing_image_id = new_showing_image_reg.image_id
+        if isinstance(acquirer_images, LazyImageSequence):
+            new_showing_image_id = acquirer_images.keys[self._showing_image_index]
+        else:
+            new_showing_image_id = self._get_image_digest(acquirer_images[self._showing_image_index])
 
         if new_showing_image_id == self._showing_image_id:
             return
@@ -153,33 +259,24 @@ class ImageSequenceAcquirerController(AcquirerController):
         self._update_source_image_out()
 
     def _update_source_image_out(self) -> None:
-        image_reg = self._get_image_reg_by_image_id(
-            image_id=self._showing_image_id,
-        )
-
-        image = image_reg.image
-
+        image = self._get_image(self._showing_image_id)
         self._source_image_out.set(image)
 
-    def _get_image_reg_by_image(self, image: np.ndarray) -> _ImageRegistration:
-        for image_reg in self._image_registry:
-            if np.array_equal(image_reg.image, image):
-                return image_reg
-        else:
-            raise ValueError(
-                "No _ImageRegistration found for image '{}'"
-                .format(image)
-            )
+    def _get_image(self, image_id: Hashable) -> np.ndarray:
+        image_reg = self._get_image_reg_by_image_id(image_id)
+        if image_reg.image is not None:
+            return image_reg.image
+
+        return self._acquirer.bn_images.get()[image_reg.index]
 
     def _get_image_reg_by_image_id(self, image_id: Hashable) -> _ImageRegistration:
-        for image_reg in self._image_registry:
-            if image_reg.image_id == image_id:
-                return image_reg
-        else:
+        try:
+            return self._image_registry[image_id]
+        except KeyError:
             raise ValueError(
                 "No _ImageRegistration found for image_id '{}'"
                 .format(image_id)
-            )
+            ) from None
 
     def _get_showing_image_index(self) -> Optional[int]:
         return self._showing_image_index
@@ -189,13 +286,44 @@ class ImageSequenceAcquirerController(AcquirerController):
             return
 
         idx = clamp(idx, 0, self.bn_num_images.get() - 1)
+
+        if self._showing_image_index is not None and idx != self._showing_image_index:
+            self._step_direction = 1 if idx > self._showing_image_index else -1
+
         self._showing_image_index = idx
         self._update_showing_image()
 
+    def _get_upcoming_image_ids(self, count: int) -> Sequence[Hashable]:
+        """Return the IDs of the next `count` images after the showing image, in the direction the user is stepping
+        through the images."""
+        if self._showing_image_index is None:
+            return ()
+
+        acquirer_images = self._acquirer.bn_images.get()
+        indices = range(
+            self._showing_image_index + self._step_direction,
+            self._showing_image_index + self._step_direction * (count + 1),
+            self._step_direction,
+        )
+        indices = [i for i in indices if 0 <= i < len(acquirer_images)]
+
+        if isinstance(acquirer_images, LazyImageSequence):
+            return [acquirer_images.keys[i] for i in indices]
+        else:
+            return [self._get_image_digest(acquirer_images[i]) for i in indices]
+
+    async def _read_image(self, image_id: Hashable) -> np.ndarray:
+        """Like _get_image(), but images of a LazyImageSequence are decoded without blocking the event loop."""
+        image_reg = self._get_image_reg_by_image_id(image_id)
+        if image_reg.image is not None:
+            return image_reg.image
+
+        return await self._acquirer.bn_images.get().read(image_reg.index)
+
     def _get_num_images(self) -> int:
         return len(self._acquirer.bn_images.get())
 
-    def _on_image_registered(self, image_id: Hashable, image: np.ndarray) -> None:
+    def _on_image_registered(self, image_id: Hashable) -> None:
         pass
 
     def _on_image_deregistered(self, image_id: Hashable) -> None:
@@ -210,7 +338,15 @@ class ImageSequenceAcquirerController(AcquirerController):
 
 
 class CameraAcquirerController(AcquirerController):
-    PREVIEW_FRAME_RATE = 3
+    """Shows the latest frame of the camera. The preview runs as fast as the camera captures frames (up to
+    MAX_PREVIEW_FRAME_RATE), but slows down if updating it takes more than MAX_PREVIEW_LOAD of the main loop's
+    time, measured as the time spent capturing and setting the image plus how late the update ran."""
+
+    MAX_PREVIEW_FRAME_RATE = 30
+    MAX_PREVIEW_LOAD = 0.5
+
+    # Weight of the latest measurement in the moving average of the update cost.
+    _COST_SMOOTHING = 0.2
 
     def __init__(
             self, *,
@@ -223,6 +359,9 @@ class CameraAcquirerController(AcquirerController):
         self._source_image_out = source_image_out
 
         self._update_loop_handle = None
+        self._update_due = None  # type: Optional[float]
+        self._update_cost = 0.0
+        self._last_frame_timestamp = None  # type: Optional[float]
 
         self.__event_connections = [
             acquirer.bn_camera.on_changed.connect(
@@ -243,12 +382,26 @@ class CameraAcquirerController(AcquirerController):
         self._on_camera_changed()
 
     def _update_loop(self) -> None:
+        due = self._update_due
         self._cancel_pending_update_loop()
 
+        start = time.monotonic()
         self._update_source_image_out()
+        end = time.monotonic()
+
+        # A late update means the main loop is busy, e.g. drawing the previous frame.
+        lateness = max(start - due, 0.0) if due is not None else 0.0
+        cost = end - start + lateness
+        self._update_cost += self._COST_SMOOTHING * (cost - self._update_cost)
 
+        delay = max(
+            1/self.MAX_PREVIEW_FRAME_RATE - (end - start),
+            self._update_cost * (1/self.MAX_PREVIEW_LOAD - 1),
+        )
+
+        self._update_due = end + delay
         self._update_loop_handle = self._loop.call_later(
-            delay=1 / self.PREVIEW_FRAME_RATE,
+            delay=delay,
             callback=self._update_loop,
         )
 
@@ -257,9 +410,14 @@ class CameraAcquirerController(AcquirerController):
         if camera is None:
             return
 
-        self._source_image_out.set(
-            camera.capture()
-        )
+        image, timestamp = camera.capture_timestamped()
+
+        # Don't show the same frame again if the camera has not captured a new one yet.
+        if timestamp == self._last_frame_timestamp:
+            return
+
+        self._last_frame_timestamp = timestamp
+        self._source_image_out.set(image)
 
     def _cancel_pending_update_loop(self) -> None:
         if self._update_loop_handle is None:
@@ -267,6 +425,7 @@ class CameraAcquirerController(AcquirerController):
 
         self._update_loop_handle.cancel()
         self._update_loop_handle = None
+        self._update_due = None
 
     def _on_camera_changed(self) -> None:
         pass
@@ -1,2 +1,2 @@
 from ._acquisition import ImageAcquisitionService, AcquirerType
-from ._acquirer import ImageAcquirer, InputImage, ImageSequenceAcquirer, CameraAcquirer, LocalStorageAcquirer, USBCameraAcquirer, GenicamAcquirer
+from ._acquirer import ImageAcquirer, InputImage, DecodePool, ImageFileSequence, LazyImageSequence, ImageSequenceAcquirer, CameraAcquirer, CaptureStats, FrameDropPolicy, LocalStorageAcquirer, FrameRecorder, RecordedFrameSequence, RecordingAcquirer, RecordingStats, USBCameraAcquirer, GenicamAcquirer, SyntheticCamera, SyntheticCameraAcquirer, SyntheticDrop, VideoFileAcquirer, VideoFrameSequence
@@ -28,8 +28,12 @@
 
 
 from .base import ImageAcquirer, InputImage
-from .camera import CameraAcquirer
+from .camera import CameraAcquirer, CaptureStats, FrameDropPolicy
+from .image_files import DecodePool, ImageFileSequence, LazyImageSequence
 from .image_sequence import ImageSequenceAcquirer
 from .local_storage import LocalStorageAcquirer
+from .recording import FrameRecorder, RecordedFrameSequence, RecordingAcquirer, RecordingStats
 from .usb_camera import USBCameraAcquirer
+from .video_file import VideoFileAcquirer, VideoFrameSequence
 from .genicam import GenicamAcquirer
+from .synthetic import SyntheticCamera, SyntheticCameraAcquirer, SyntheticDrop
@@ -57,3 +57,6 @@ class InputImage(ABC):
 
     def cancel(self) -> None:
         pass
+
+    def release(self) -> None:
+        """Called by the consumer once it has finished with this image."""
@@ -28,10 +28,10 @@
 
 
 import asyncio
-import math
 import time
 from abc import ABC, abstractmethod
-from typing import Sequence, Tuple, Optional
+from enum import Enum
+from typing import AsyncIterator, Callable, NamedTuple, Sequence, Tuple, Optional
 
 import numpy as np
 
@@ -40,16 +40,117 @@ from opendrop.utility.bindable.typing import Bindable
 from .base import ImageAcquirer, InputImage
 
 
+class FrameDropPolicy(Enum):
+    """What a stream does with frames that are due while the maximum number of frames are still being analysed."""
+
+    # Delay capturing until an earlier frame has been released.
+    WAIT = 0
+
+    # Skip frames until an earlier frame has been released.
+    DROP = 1
+
+
+class CaptureStats(NamedTuple):
+    """Scheduling statistics of an acquisition. Lateness is how long after its deadline a frame was captured, it
+    can be slightly negative for cameras that capture in the background."""
+
+    num_captured: int = 0
+    num_dropped: int = 0
+    mean_lateness: float = 0.0
+    max_lateness: float = 0.0
+
+
 class CameraAcquirer(ImageAcquirer):
     def __init__(self) -> None:
         self._loop = asyncio.get_event_loop()
 
         self.bn_camera = VariableBindable(None)  # type: Bindable[Optional[Camera]]
 
+        # A value of 0 means capture until stopped, which is only supported by stream_images().
         self.bn_num_frames = VariableBindable(1)
         self.bn_frame_interval = VariableBindable(None)  # type: Bindable[Optional[float]]
 
+        self.bn_max_in_flight = VariableBindable(4)
+        self.bn_drop_policy = VariableBindable(FrameDropPolicy.DROP)
+
+        # Statistics of the current (or last) acquisition.
+        self.bn_capture_stats = VariableBindable(CaptureStats())  # type: Bindable[CaptureStats]
+
     def acquire_images(self) -> Sequence[InputImage]:
+        camera, num_frames, frame_interval = self._get_capture_settings()
+
+        if num_frames == 0:
+            raise ValueError("Capturing until stopped is only supported by stream_images()")
+
+        run = _CaptureRun(self, camera, frame_interval)
+
+        input_images = []
+
+        for i in range(num_frames):
+            input_image = _BaseCameraInputImage(run, i, loop=self._loop)
+            input_images.append(input_image)
+
+        return input_images
+
+    def stream_images(self) -> AsyncIterator[InputImage]:
+        """Return an async iterator that captures frames as they are due and yields them as they are captured.
+
+        At most `bn_max_in_flight` yielded frames may be unreleased (see InputImage.release()) at any time, frames
+        that are due while this limit is reached are delayed or skipped, depending on `bn_drop_policy`. Frames are
+        only created as they are captured, so open-ended runs (`bn_num_frames` of 0) are supported.
+        """
+        camera, num_frames, frame_interval = self._get_capture_settings()
+
+        return self._stream_images(
+            camera,
+            num_frames,
+            frame_interval,
+            max_in_flight=self.bn_max_in_flight.get(),
+            drop_policy=self.bn_drop_policy.get(),
+        )
+
+    async def _stream_images(
+            self,
+            camera: 'Camera',
+            num_frames: int,
+            frame_interval: float,
+            *,
+            max_in_flight: int,
+            drop_policy: FrameDropPolicy,
+    ) -> AsyncIterator[InputImage]:
+        slots = asyncio.Semaphore(max_in_flight)
+        run = _CaptureRun(self, camera, frame_interval)
+
+        i = 0
+        while num_frames == 0 or i < num_frames:
+            # Aim at absolute deadlines, so a late frame does not delay all the frames after it.
+            delay = run.deadline(i) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if slots.locked() and drop_policy is FrameDropPolicy.DROP:
+                run.record_drop()
+                i += 1
+                continue
+
+            await slots.acquire()
+
+            try:
+                image, timestamp, capture_time = run.capture(i)
+            except BaseException:
+                slots.release()
+                raise
+
+            i += 1
+
+            yield _StreamedInputImage(
+                image,
+                timestamp=timestamp,
+                est_ready=time.time() - (time.monotonic() - capture_time),
+                release=slots.release,
+            )
+
+    def _get_capture_settings(self) -> Tuple['Camera', int, float]:
         camera = self.bn_camera.get()
 
         if camera is None:
@@ -57,9 +158,9 @@ class CameraAcquirer(ImageAcquirer):
 
         num_frames = self.bn_num_frames.get()
 
-        if num_frames is None or num_frames <= 0:
+        if num_frames is None or num_frames < 0:
             raise ValueError(
-                "'num_frames' must be > 0 and not None, currently: '{}'"
+                "'num_frames' must be >= 0 and not None, currently: '{}'"
                 .format(num_frames)
             )
 
@@ -74,21 +175,7 @@ class CameraAcquirer(ImageAcquirer):
                     .format(frame_interval)
                 )
 
-        input_images = []
-
-        for i in range(num_frames):
-            capture_delay = i * frame_interval
-
-            input_image = _BaseCameraInputImage(
-                camera=camera,
-                delay=capture_delay,
-                first_image=input_images[0] if input_images else None,
-                loop=self._loop,
-            )
-
-            input_images.append(input_image)
-
-        return input_images
+        return camera, num_frames, frame_interval
 
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         camera = self.bn_camera.get()
@@ -98,32 +185,69 @@ class CameraAcquirer(ImageAcquirer):
         return camera.get_image_size_hint()
 
 
+class _CaptureRun:
+    """Captures the frames of one acquisition, frame `i` is due `i * frame_interval` seconds after the run started.
+
+    Times are on the time.monotonic() clock. Image timestamps are relative to the capture time of the first frame.
+    """
+
+    def __init__(self, acquirer: CameraAcquirer, camera: 'Camera', frame_interval: float) -> None:
+        self._acquirer = acquirer
+        self._camera = camera
+        self._frame_interval = frame_interval
+
+        self._start = time.monotonic()
+        self._first_capture_time = None  # type: Optional[float]
+
+        acquirer.bn_capture_stats.set(CaptureStats())
+
+    def deadline(self, i: int) -> float:
+        return self._start + i*self._frame_interval
+
+    def capture(self, i: int) -> Tuple[np.ndarray, float, float]:
+        """Capture frame `i` and return the image, its timestamp and its capture time."""
+        deadline = self.deadline(i)
+
+        image, capture_time = self._camera.capture_timestamped(not_before=deadline)
+
+        if self._first_capture_time is None:
+            self._first_capture_time = capture_time
+
+        self._record_capture(capture_time - deadline)
+
+        return image, capture_time - self._first_capture_time, capture_time
+
+    def _record_capture(self, lateness: float) -> None:
+        stats = self._acquirer.bn_capture_stats.get()
+        num_captured = stats.num_captured + 1
+
+        self._acquirer.bn_capture_stats.set(stats._replace(
+            num_captured=num_captured,
+            mean_lateness=stats.mean_lateness + (lateness - stats.mean_lateness)/num_captured,
+            max_lateness=max(stats.max_lateness, lateness) if stats.num_captured else lateness,
+        ))
+
+    def record_drop(self) -> None:
+        stats = self._acquirer.bn_capture_stats.get()
+        self._acquirer.bn_capture_stats.set(stats._replace(num_dropped=stats.num_dropped + 1))
+
+
 class _BaseCameraInputImage(InputImage):
-    def __init__(self, camera: 'Camera', delay: float, first_image: Optional['_BaseCameraInputImage'] = None, *,
-                 loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(self, run: _CaptureRun, index: int, *, loop: asyncio.AbstractEventLoop) -> None:
         self._loop = loop
 
-        self._first_image = first_image
-
         self._read_fut = self._loop.create_future()
 
-        self._camera = camera
-        self._do_capture_handle = self._loop.call_later(delay=delay, callback=self._do_capture)
+        self._run = run
+        self._index = index
 
-        self.capture_time = math.nan
+        delay = run.deadline(index) - time.monotonic()
+        self._do_capture_handle = self._loop.call_later(delay=delay, callback=self._do_capture)
 
         self.est_ready = time.time() + delay
 
     def _do_capture(self) -> None:
-        image = self._camera.capture()
-        self._capture_time = time.time()
-
-        if self._first_image is not None:
-            timestamp = self._capture_time - self._first_image._capture_time
-        else:
-            timestamp = 0
-
-        timestamp = round(timestamp, 1)
+        image, timestamp, _ = self._run.capture(self._index)
 
         self._read_fut.set_result(
             (image, timestamp)
@@ -137,11 +261,39 @@ class _BaseCameraInputImage(InputImage):
         self._read_fut.cancel()
 
 
+class _StreamedInputImage(InputImage):
+    def __init__(self, image: np.ndarray, timestamp: float, est_ready: float, release: Callable[[], None]) -> None:
+        self._image = image
+        self._timestamp = timestamp
+        self._release = release
+
+        self.est_ready = est_ready
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        return self._image, self._timestamp
+
+    def release(self) -> None:
+        if self._release is None:
+            return
+
+        self._release()
+        self._release = None
+
+    def cancel(self) -> None:
+        self.release()
+
+
 class Camera(ABC):
     @abstractmethod
     def capture(self) -> np.ndarray:
         """Return the captured image."""
 
+    def capture_timestamped(self, not_before: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        """Return a captured image and the time.monotonic() time it was captured at. Cameras that keep a buffer of
+        recent frames return the earliest one captured at or after `not_before`, if there is one."""
+        image = self.capture()
+        return image, time.monotonic()
+
     @abstractmethod
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         """Implementation of get_image_size_hint()"""
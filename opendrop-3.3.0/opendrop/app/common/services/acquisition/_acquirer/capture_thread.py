@@ -0,0 +1,232 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import sys
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .camera import CameraCaptureError
+
+
+# Grab functions are passed the frame to overwrite (None if there is none yet), and return the captured frame
+# (which should be the one passed in, if it had the right shape and type) and its time.monotonic() capture time,
+# or None if no frame was available yet (the thread then checks if it has been stopped, and calls the function
+# again).
+GrabFunction = Callable[[Optional[np.ndarray]], Optional[Tuple[np.ndarray, float]]]
+
+
+class FramePool:
+    """Recycles frame arrays once nothing else references them, so capturing at a steady state does not allocate.
+
+    Only used from a single thread. At most `max_size` frames are tracked, if all of them are still in use, new
+    frames are allocated without being tracked.
+    """
+
+    def __init__(self, max_size: int = 12) -> None:
+        self._frames = []  # type: List[np.ndarray]
+        self._max_size = max_size
+
+    def take(self, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        # Index instead of enumerate(), whose reused result tuple would hold an extra reference to the frame.
+        for i in range(len(self._frames)):
+            frame = self._frames[i]
+
+            # Referenced only by self._frames, `frame` and getrefcount()'s argument, so no one else holds it or a
+            # view of it.
+            if sys.getrefcount(frame) > 3:
+                continue
+
+            if frame.shape == shape and frame.dtype == dtype:
+                # Readers may have made it read-only.
+                frame.flags.writeable = True
+                return frame
+
+            # Left over from a different frame size or type, make room for a new frame.
+            del self._frames[i]
+            break
+
+        frame = np.empty(shape, dtype)
+        if len(self._frames) < self._max_size:
+            self._frames.append(frame)
+
+        return frame
+
+
+class CaptureThread:
+    """Continuously grabs frames from a camera in a background thread, into a ring buffer of frames that are reused
+    once they have been overwritten.
+
+    Readers get a copy of the latest frame without waiting for the camera, so blocking camera reads never run on the
+    main loop. If grabbing fails, the thread stops and readers get CameraCaptureError.
+
+    If a FramePool is given, readers are handed the buffered frames themselves (made read-only) instead of copies,
+    and a frame that has been handed out is replaced with one from the pool before its slot is written to again.
+    """
+
+    def __init__(
+            self,
+            grab: GrabFunction,
+            size: int = 4,
+            *,
+            pool: Optional[FramePool] = None,
+            name: Optional[str] = None,
+    ) -> None:
+        # The slot after the latest one is being written to and can't be read, the other slots hold the most recent
+        # frames, so a reader that runs a little late can still pick the frame captured closest to when it wanted.
+        if size < 2:
+            raise ValueError("'size' must be >= 2, got {}".format(size))
+
+        self._grab = grab
+
+        self._frames = [None] * size  # type: List[Optional[np.ndarray]]
+        self._timestamps = [0.0] * size
+
+        self._pool = pool
+        self._handed_out = [False] * size
+
+        self._cond = threading.Condition()
+        self._latest = -1
+        self._seq = 0
+        self._error = None  # type: Optional[BaseException]
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        slot = 0
+
+        while not self._stopped:
+            with self._cond:
+                out = self._frames[slot]
+                if self._handed_out[slot]:
+                    # Readers may still be using it, write to another frame.
+                    out = self._pool.take(out.shape, out.dtype)
+                    self._handed_out[slot] = False
+
+            try:
+                result = self._grab(out)
+            except BaseException as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            if result is None:
+                continue
+
+            frame, timestamp = result
+
+            with self._cond:
+                self._frames[slot] = frame
+                self._timestamps[slot] = timestamp
+                self._latest = slot
+                self._seq += 1
+                self._cond.notify_all()
+
+            slot = (slot + 1) % len(self._frames)
+
+    def frame_at(self, not_before: float, timeout: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        """Return (a copy of) the earliest buffered frame captured at or after `not_before`, or the latest frame if
+        there is none, and its capture time.
+
+        Only waits if no frame has been captured yet, raises CameraCaptureError like latest().
+        """
+        with self._cond:
+            self._wait_for_frame(0, timeout)
+
+            size = len(self._frames)
+            chosen = self._latest
+
+            # Go back from the latest frame, stopping before the slot being written to.
+            for k in range(1, size - 1):
+                slot = (self._latest - k) % size
+                if self._frames[slot] is None or self._timestamps[slot] < not_before:
+                    break
+                chosen = slot
+
+            return self._read_frame(chosen), self._timestamps[chosen]
+
+    def latest(self, timeout: Optional[float] = None) -> Tuple[np.ndarray, float, int]:
+        """Return (a copy of) the latest frame, its capture time and its sequence number.
+
+        Only waits if no frame has been captured yet, raises CameraCaptureError if none is captured within `timeout`
+        seconds or if grabbing has failed.
+        """
+        return self.wait_newer(0, timeout)
+
+    def wait_newer(self, seq: int, timeout: Optional[float] = None) -> Tuple[np.ndarray, float, int]:
+        """Like latest(), but wait for a frame with sequence number greater than `seq`."""
+        with self._cond:
+            self._wait_for_frame(seq, timeout)
+
+            frame = self._read_frame(self._latest)
+            timestamp = self._timestamps[self._latest]
+
+            return frame, timestamp, self._seq
+
+    def _read_frame(self, slot: int) -> np.ndarray:
+        frame = self._frames[slot]
+
+        if self._pool is None:
+            return frame.copy()
+
+        frame.flags.writeable = False
+        self._handed_out[slot] = True
+
+        return frame
+
+    def _wait_for_frame(self, seq: int, timeout: Optional[float]) -> None:
+        if not self._cond.wait_for(lambda: self._seq > seq or self._error is not None or self._stopped, timeout):
+            raise CameraCaptureError("Timed out waiting for frame")
+
+        if self._error is not None:
+            raise CameraCaptureError("Capture failed") from self._error
+
+        if self._seq <= seq:
+            raise CameraCaptureError("Capture stopped")
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest frame, 0 if no frame has been captured yet."""
+        return self._seq
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+        if self._thread is not threading.current_thread():
+            self._thread.join()
@@ -28,6 +28,7 @@
 
 
 import os
+import time
 from pathlib import Path
 from typing import Tuple, Optional, NamedTuple, Sequence
 
@@ -35,20 +36,11 @@ import cv2
 
 import numpy as np
 
-try:
-    import genicam.gentl
-    import opendrop.vendor.harvesters.core as harvesters
-    GENICAM_ENABLED = True
-except ModuleNotFoundError:
-    from unittest.mock import Mock
-    genicam = Mock()
-    harvesters = Mock()
-    GENICAM_ENABLED = False
-
 from opendrop.utility.bindable import VariableBindable, AccessorBindable
 from opendrop.utility.bindable.typing import ReadBindable
 from opendrop.utility.events import EventConnection
 from .camera import CameraAcquirer, Camera, CameraCaptureError
+from .capture_thread import CaptureThread, FramePool
 
 
 GenicamCameraInfo = NamedTuple('GenicamCameraInfo', [
@@ -60,10 +52,38 @@ GenicamCameraInfo = NamedTuple('GenicamCameraInfo', [
     ("version", str),
 ])
 
+
+# The GenTL bindings and harvesters are slow to import, so they are only imported by _import_genicam() when the first
+# GenicamAcquirer is created.
+genicam = None
+harvesters = None
+GENICAM_ENABLED = None  # type: Optional[bool]
+
+
+def _import_genicam() -> bool:
+    global genicam, harvesters, GENICAM_ENABLED
+
+    if GENICAM_ENABLED is not None:
+        return GENICAM_ENABLED
+
+    try:
+        import genicam.gentl
+        import opendrop.vendor.harvesters.core as harvesters
+        GENICAM_ENABLED = True
+    except ModuleNotFoundError:
+        from unittest.mock import Mock
+        genicam = Mock()
+        harvesters = Mock()
+        GENICAM_ENABLED = False
+
+    return GENICAM_ENABLED
+
+
 class GenicamAcquirer(CameraAcquirer):
     def __init__(self):
         super().__init__()
 
+        _import_genicam()
         self._harvester = harvesters.Harvester()
 
         for cti_path in os.environ.get('GENICAM_GENTL64_PATH', '').split(os.pathsep):
@@ -75,6 +95,15 @@ class GenicamAcquirer(CameraAcquirer):
 
         self._camera_alive_changed_conn = None  # type: Optional[EventConnection]
 
+        self.bn_keep_high_bit_depth = VariableBindable(False)
+        self.bn_keep_high_bit_depth.on_changed.connect(self._keep_high_bit_depth_changed)
+
+    def _keep_high_bit_depth_changed(self) -> None:
+        camera = self.bn_camera.get()
+        if camera is None: return
+
+        camera.keep_high_bit_depth = self.bn_keep_high_bit_depth.get()
+
     def _get_camera_id(self) -> Optional[str]:
         if not GENICAM_ENABLED: return
         return self._camera_id
@@ -129,6 +158,8 @@ class GenicamAcquirer(CameraAcquirer):
         except ValueError:
             raise ValueError("Failed to open '{}'".format(id_))
 
+        new_camera.keep_high_bit_depth = self.bn_keep_high_bit_depth.get()
+
         self.remove_current_camera(_poke_current_camera_id=False)
 
         self._camera_alive_changed_conn = new_camera.bn_alive.on_changed.connect(self._camera_alive_changed)
@@ -169,7 +200,13 @@ class GenicamAcquirer(CameraAcquirer):
 
 
 class GenicamCamera(Camera):
-    def __init__(self, hacquirer: harvesters.ImageAcquirer) -> None:
+    _FETCH_TIMEOUT = 0.5
+    _CAPTURE_TIMEOUT = 5
+
+    # If true, 10 and 12-bit pixel formats are captured as 16-bit images instead of being reduced to 8-bit.
+    keep_high_bit_depth = False
+
+    def __init__(self, hacquirer: 'harvesters.ImageAcquirer') -> None:
         self._hacquirer = hacquirer
         self.bn_alive = VariableBindable(False)
 
@@ -178,10 +215,54 @@ class GenicamCamera(Camera):
         except genicam.gentl.IoException as e:
             raise ValueError('Camera failed to open.') from e
 
+        # Offset from the device clock to time.monotonic(), set on the first frame.
+        self._device_clock_offset = None  # type: Optional[float]
+
+        # Frames are handed to readers without copying, and recycled once readers are done with them.
+        self._capture_thread = CaptureThread(self._grab, pool=FramePool(), name='GenicamCamera')
+
         self.bn_alive.set(True)
 
     def capture(self) -> np.ndarray:
-        with self._hacquirer.fetch_buffer() as buf:
+        image, _, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+        return image
+
+    def capture_timestamped(self, not_before: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        if not_before is None:
+            image, timestamp, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+        else:
+            image, timestamp = self._capture_thread.frame_at(not_before, timeout=self._CAPTURE_TIMEOUT)
+
+        return image, timestamp
+
+    def _capture_time(self, buf: 'harvesters.Buffer') -> float:
+        now = time.monotonic()
+
+        try:
+            device_time_ns = buf.timestamp_ns
+        except genicam.gentl.NotImplementedException:
+            device_time_ns = 0
+
+        if not device_time_ns:
+            return now
+
+        # Device timestamps are taken at exposure, so they are unaffected by transfer and scheduling delays, but they
+        # are on the device's own clock.
+        if self._device_clock_offset is None:
+            self._device_clock_offset = now - device_time_ns*1e-9
+
+        return device_time_ns*1e-9 + self._device_clock_offset
+
+    def _grab(self, out: Optional[np.ndarray]) -> Optional[Tuple[np.ndarray, float]]:
+        # Runs in the capture thread. Fetch with a timeout so the thread notices when it is stopped.
+        try:
+            buf = self._hacquirer.fetch_buffer(timeout=self._FETCH_TIMEOUT)
+        except genicam.gentl.TimeoutException:
+            return None
+
+        with buf:
+            timestamp = self._capture_time(buf)
+
             if not buf.payload.components:
                 raise CameraCaptureError
 
@@ -200,39 +281,27 @@ class GenicamCamera(Camera):
 
             data_format = component.data_format
 
+            # Monochrome frames are kept single channel, the rest of the pipeline works with 2D images.
             if data_format == 'Mono8':
-                image = cv2.cvtColor(data, cv2.COLOR_GRAY2RGB)
-            elif data_format == 'Mono10':
-                image = cv2.cvtColor(data, cv2.COLOR_GRAY2RGB)
-                image = (image/1023*255).astype(np.uint8)
-            elif data_format == 'Mono12':
-                image = cv2.cvtColor(data, cv2.COLOR_GRAY2RGB)
-                image = (image/4095*255).astype(np.uint8)
+                image = _copy_to_buffer(data, out)
+            elif data_format in {'Mono10', 'Mono12'}:
+                image = self._convert_bit_depth(data, _PIXEL_BITS[data_format], out)
             elif data_format == 'RGB8':
-                image = data.reshape(height, width, 3).copy()
-            elif data_format == 'RGB10':
-                image = data.reshape(height, width, 3)
-                image = (image/1023*255).astype(np.uint8)
-            elif data_format == 'RGB12':
-                image = data.reshape(height, width, 3)
-                image = (image/4095*255).astype(np.uint8)
+                image = _copy_to_buffer(data.reshape(height, width, 3), out)
+            elif data_format in {'RGB10', 'RGB12'}:
+                image = self._convert_bit_depth(data.reshape(height, width, 3), _PIXEL_BITS[data_format], out)
             elif data_format == 'BGR8':
                 image = cv2.cvtColor(
                     data.reshape(height, width, 3),
                     code=cv2.COLOR_BGR2RGB,
+                    dst=out,
                 )
-            elif data_format == 'BGR10':
-                image = cv2.cvtColor(
-                    data.reshape(height, width, 3),
-                    code=cv2.COLOR_BGR2RGB,
-                )
-                image = (image/1023*255).astype(np.uint8)
-            elif data_format == 'BGR12':
+            elif data_format in {'BGR10', 'BGR12'}:
                 image = cv2.cvtColor(
                     data.reshape(height, width, 3),
                     code=cv2.COLOR_BGR2RGB,
                 )
-                image = (image/4095*255).astype(np.uint8)
+                image = self._convert_bit_depth(image, _PIXEL_BITS[data_format], out)
             elif data_format in {'BayerGR8', 'BayerRG8', 'BayerBG8', 'BayerGB8'}:
                 image = cv2.cvtColor(
                     data,
@@ -241,7 +310,8 @@ class GenicamCamera(Camera):
                           'BayerRG8': cv2.COLOR_BayerBG2RGB,
                           'BayerBG8': cv2.COLOR_BayerRG2RGB,
                           'BayerGB8': cv2.COLOR_BayerGR2RGB,
-                    }[data_format]
+                    }[data_format],
+                    dst=out,
                 )
             elif data_format in {'BayerGR10', 'BayerRG10', 'BayerBG10', 'BayerGB10'}:
                 image = cv2.cvtColor(
@@ -253,7 +323,7 @@ class GenicamCamera(Camera):
                           'BayerGB10': cv2.COLOR_BayerGR2RGB,
                     }[data_format]
                 )
-                image = (image/1023*255).astype(np.uint8)
+                image = self._convert_bit_depth(image, 10, out)
             elif data_format in {'BayerGR12', 'BayerRG12', 'BayerBG12', 'BayerGB12'}:
                 image = cv2.cvtColor(
                     data,
@@ -264,11 +334,17 @@ class GenicamCamera(Camera):
                           'BayerGB12': cv2.COLOR_BayerGR2RGB,
                     }[data_format]
                 )
-                image = (image/4095*255).astype(np.uint8)
+                image = self._convert_bit_depth(image, 12, out)
             else:
                 raise CameraCaptureError('Unsupported pixel format {}'.format(data_format))
 
-            return image
+            return image, timestamp
+
+    def _convert_bit_depth(self, image: np.ndarray, bits: int, out: Optional[np.ndarray]) -> np.ndarray:
+        if self.keep_high_bit_depth:
+            return _expand_bit_depth(image, bits, out)
+        else:
+            return _reduce_bit_depth(image, bits, out)
 
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         if not hasattr(self, '_hacquirer'): return
@@ -279,7 +355,40 @@ class GenicamCamera(Camera):
 
     def destroy(self) -> None:
         if not hasattr(self, '_hacquirer'): return
+        self._capture_thread.stop()
         self._hacquirer.stop_acquisition()
         self._hacquirer.destroy()
         del self._hacquirer
         self.bn_alive.set(False)
+
+
+_PIXEL_BITS = {
+    'Mono10': 10, 'Mono12': 12,
+    'RGB10': 10, 'RGB12': 12,
+    'BGR10': 10, 'BGR12': 12,
+}
+
+
+def _reduce_bit_depth(image: np.ndarray, bits: int, out: Optional[np.ndarray]) -> np.ndarray:
+    # Shift straight into an 8-bit array, a single integer pass without any float temporaries.
+    if out is None or out.shape != image.shape or out.dtype != np.uint8:
+        out = np.empty(image.shape, np.uint8)
+
+    return np.right_shift(image, bits - 8, out=out, casting='unsafe')
+
+
+def _expand_bit_depth(image: np.ndarray, bits: int, out: Optional[np.ndarray]) -> np.ndarray:
+    # Scale up to the full 16-bit range, so images have the same brightness whatever the camera's bit depth.
+    if out is None or out.shape != image.shape or out.dtype != np.uint16:
+        out = np.empty(image.shape, np.uint16)
+
+    return np.left_shift(image, 16 - bits, out=out, casting='unsafe')
+
+
+def _copy_to_buffer(image: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    # The camera reuses its buffers, so frames must be copied out of them.
+    if out is not None and out.shape == image.shape and out.dtype == image.dtype:
+        np.copyto(out, image)
+        return out
+    else:
+        return image.copy()
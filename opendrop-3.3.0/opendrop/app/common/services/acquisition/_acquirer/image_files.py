@@ -0,0 +1,416 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import struct
+import threading
+from abc import abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Hashable, Iterable, List, MutableMapping, Optional, Sequence, Tuple, TypeVar, Union
+
+import cv2
+import numpy as np
+
+
+__all__ = ('DecodePool', 'LazyImageSequence', 'ImageFileSequence', 'decode_image', 'read_image_size')
+
+T = TypeVar('T')
+U = TypeVar('U')
+
+
+def decode_image(path: Union[Path, str]) -> np.ndarray:
+    # Load in grayscale to save memory.
+    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Failed to load image from '{path}'")
+
+    image.flags.writeable = False
+
+    return image
+
+
+class DecodePool:
+    """A pool of threads for decoding and reading image files.
+
+    cv2.imread() releases the GIL, so decoding scales with the number of threads. The threads are started when
+    first needed and shared by all users of the default pool.
+    """
+
+    _default = None  # type: Optional[DecodePool]
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'DecodePool':
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def submit(self, fn: Callable[..., T], *args) -> 'concurrent.futures.Future[T]':
+        return self._get_executor().submit(fn, *args)
+
+    def map(self, fn: Callable[[T], U], items: Iterable[T]) -> List[U]:
+        """Return `[fn(item) for item in items]`, computed in parallel. Results are in the same order as `items`.
+
+        If any call raises, the remaining calls are cancelled and the exception is raised.
+        """
+        futs = [self.submit(fn, item) for item in items]
+
+        try:
+            return [fut.result() for fut in futs]
+        finally:
+            for fut in futs:
+                fut.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the threads once all submitted work finishes. The pool can still be used afterwards, new threads
+        are started when needed."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='ImageDecode',
+                )
+
+            return self._executor
+
+
+class LazyImageSequence(Sequence[np.ndarray]):
+    """A sequence of images that are only decoded when they are needed.
+
+    Each image is identified by a hashable key in `keys`, which stays the same for the same image across
+    sequences, so consumers can tell which images they have seen before without decoding them.
+
+    Decoded images are kept in a least recently used cache bounded by `max_cached_bytes` (at least one image is
+    always kept). Reading an image with `read()` decodes it in `pool` and starts decoding the next `prefetch`
+    images in parallel, so a consumer stepping through the sequence rarely has to wait.
+    """
+
+    DEFAULT_MAX_CACHED_BYTES = 256 * 2**20
+    DEFAULT_PREFETCH = 4
+
+    keys = ()  # type: Sequence[Hashable]
+
+    def __init__(
+            self,
+            *,
+            max_cached_bytes: int = DEFAULT_MAX_CACHED_BYTES,
+            prefetch: int = DEFAULT_PREFETCH,
+            pool: Optional[DecodePool] = None,
+    ) -> None:
+        self._pool = pool or DecodePool.default()
+
+        self._max_cached_bytes = max_cached_bytes
+        self._prefetch = prefetch
+
+        # Decode callbacks run in worker threads.
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()  # type: MutableMapping[int, np.ndarray]
+        self._cached_bytes = 0
+        self._pending = {}  # type: MutableMapping[int, concurrent.futures.Future]
+        # Number of read() calls waiting on each pending decode, a decode is not cancelled while it has readers.
+        self._readers = {}  # type: MutableMapping[int, int]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        """Return the decoded image at `index`, decoding it in the calling thread if it is not already cached or
+        being decoded."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        index = self._check_index(index)
+
+        with self._lock:
+            image = self._get_cached(index)
+            if image is not None:
+                return image
+
+            fut = self._pending.get(index)
+            if fut is not None and not fut.running():
+                # Still waiting for a decode thread, quicker to decode it here. Readers may be waiting on the
+                # pending decode, so only cancel it if there are none.
+                if not self._readers.get(index):
+                    fut.cancel()
+                fut = None
+
+        if fut is not None:
+            return fut.result()
+
+        image = self._decode(index)
+        with self._lock:
+            self._put_cached(index, image)
+
+        return image
+
+    async def read(self, index: int) -> np.ndarray:
+        """Decode the image at `index` without blocking the event loop, and prefetch the images after it."""
+        index = self._check_index(index)
+
+        with self._lock:
+            fut = self._load(index)
+            self._readers[index] = self._readers.get(index, 0) + 1
+
+        for i in range(index + 1, min(index + 1 + self._prefetch, len(self))):
+            self._load(i)
+
+        cancelled = False
+        try:
+            # Shield the decode so cancelling one reader does not cancel it for other readers of the same image.
+            return await asyncio.shield(asyncio.wrap_future(fut))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self._lock:
+                self._readers[index] -= 1
+                if self._readers[index] == 0:
+                    del self._readers[index]
+                    if cancelled:
+                        # The last reader was cancelled, nobody needs the decode any more.
+                        fut.cancel()
+
+    def discard(self, index: int) -> None:
+        """Cancel decoding the image at `index` if it has not started yet and no reader is waiting on it, e.g.
+        when an image that was only prefetched is no longer needed."""
+        with self._lock:
+            fut = self._pending.get(index)
+            if fut is not None and not self._readers.get(index):
+                fut.cancel()
+
+    def close(self) -> None:
+        """Cancel decodes that have not started yet and drop all cached images."""
+        with self._lock:
+            pending = tuple(self._pending.values())
+            self._cache.clear()
+            self._cached_bytes = 0
+
+        for fut in pending:
+            fut.cancel()
+
+    def size_hint(self) -> Optional[Tuple[int, int]]:
+        """Return the (width, height) of the images."""
+        if len(self) == 0:
+            return None
+
+        return self[0].shape[1::-1]
+
+    @abstractmethod
+    def _decode(self, index: int) -> np.ndarray:
+        """Decode and return the image at `index`, this may be called from any thread."""
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('image index out of range')
+
+        return index
+
+    def _load(self, index: int) -> concurrent.futures.Future:
+        with self._lock:
+            image = self._get_cached(index)
+            if image is not None:
+                fut = concurrent.futures.Future()
+                fut.set_result(image)
+                return fut
+
+            fut = self._pending.get(index)
+            if fut is not None and not fut.cancelled():
+                return fut
+
+            fut = self._pool.submit(self._decode, index)
+            self._pending[index] = fut
+
+        fut.add_done_callback(functools.partial(self._decode_done, index))
+
+        return fut
+
+    def _decode_done(self, index: int, fut: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._pending.get(index) is fut:
+                del self._pending[index]
+
+            if fut.cancelled() or fut.exception() is not None:
+                return
+
+            self._put_cached(index, fut.result())
+
+    def _get_cached(self, index: int) -> Optional[np.ndarray]:
+        image = self._cache.get(index)
+        if image is not None:
+            self._cache.move_to_end(index)
+
+        return image
+
+    def _put_cached(self, index: int, image: np.ndarray) -> None:
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return
+
+        self._cache[index] = image
+        self._cached_bytes += image.nbytes
+
+        while self._cached_bytes > self._max_cached_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted.nbytes
+
+
+class ImageFileSequence(LazyImageSequence):
+    """A sequence of images backed by files, keyed by their paths."""
+
+    def __init__(self, paths: Sequence[Union[Path, str]], **options) -> None:
+        super().__init__(**options)
+        self.paths = self.keys = tuple(map(Path, paths))
+
+    def size_hint(self) -> Optional[Tuple[int, int]]:
+        """Return the (width, height) of the first image, read from its file header if possible."""
+        if len(self) > 0:
+            size = read_image_size(self.paths[0])
+            if size is not None:
+                return size
+
+        return super().size_hint()
+
+    def _decode(self, index: int) -> np.ndarray:
+        return decode_image(self.paths[index])
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# JPEG start of frame markers, these are followed by the image dimensions.
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def read_image_size(path: Union[Path, str]) -> Optional[Tuple[int, int]]:
+    """Return the (width, height) of the image at `path` by reading only its header, or None if the format is not
+    recognised (PNG, JPEG, BMP and TIFF are supported)."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(26)
+            if head.startswith(_PNG_SIGNATURE) and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            elif head.startswith(b'\xff\xd8'):
+                return _read_jpeg_size(f)
+            elif head.startswith(b'BM'):
+                return _read_bmp_size(head)
+            elif head[:4] in (b'II*\x00', b'MM\x00*'):
+                return _read_tiff_size(f, '<' if head[:2] == b'II' else '>')
+    except (OSError, struct.error):
+        pass
+
+    return None
+
+
+def _read_jpeg_size(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    f.seek(2)
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+
+        marker = f.read(1)
+        while marker == b'\xff':
+            # Fill bytes.
+            marker = f.read(1)
+        if not marker:
+            return None
+
+        marker = marker[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Markers without a payload.
+            continue
+
+        length, = struct.unpack('>H', f.read(2))
+        if marker in _JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack('>BHH', f.read(5))
+            return width, height
+
+        f.seek(length - 2, 1)
+
+
+def _read_bmp_size(head: bytes) -> Tuple[int, int]:
+    header_size, = struct.unpack('<I', head[14:18])
+    if header_size == 12:
+        # OS/2 BITMAPCOREHEADER.
+        width, height = struct.unpack('<HH', head[18:22])
+    else:
+        # Height is negative for top-down bitmaps.
+        width, height = struct.unpack('<ii', head[18:26])
+
+    return abs(width), abs(height)
+
+
+def _read_tiff_size(f: BinaryIO, byte_order: str) -> Optional[Tuple[int, int]]:
+    f.seek(4)
+    ifd_offset, = struct.unpack(byte_order + 'I', f.read(4))
+    f.seek(ifd_offset)
+    num_entries, = struct.unpack(byte_order + 'H', f.read(2))
+
+    width = height = None
+    for _ in range(num_entries):
+        tag, type_, _, value = struct.unpack(byte_order + 'HHI4s', f.read(12))
+        if tag not in (256, 257):
+            continue
+
+        # ImageWidth and ImageLength are either SHORT (3) or LONG (4).
+        if type_ == 3:
+            value, = struct.unpack(byte_order + 'H', value[:2])
+        else:
+            value, = struct.unpack(byte_order + 'I', value)
+
+        if tag == 256:
+            width = value
+        else:
+            height = value
+
+    if width is None or height is None:
+        return None
+
+    return width, height
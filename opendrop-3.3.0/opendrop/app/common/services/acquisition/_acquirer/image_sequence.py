@@ -62,16 +62,19 @@ class ImageSequenceAcquirer(ImageAcquirer):
 
         input_images = []
 
-        for i, img in enumerate(images):
-            input_image = _BaseImageSequenceInputImage(
-                image=img,
-                timestamp=i * frame_interval
-            )
+        for i in range(len(images)):
+            input_image = self._create_input_image(i, timestamp=i * frame_interval)
             input_image.is_replicated = self.IS_REPLICATED
             input_images.append(input_image)
 
         return input_images
 
+    def _create_input_image(self, index: int, timestamp: float) -> InputImage:
+        return _BaseImageSequenceInputImage(
+            image=self.bn_images.get()[index],
+            timestamp=timestamp,
+        )
+
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         images = self.bn_images.get()
         if images is None or len(images) == 0:
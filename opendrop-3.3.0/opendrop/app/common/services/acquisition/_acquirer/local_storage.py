@@ -28,12 +28,14 @@
 
 
 from pathlib import Path
-from typing import Union, Sequence, MutableSequence
+from typing import Union, Sequence, Optional, Tuple
 
 import cv2
 import numpy as np
 
 from opendrop.utility.bindable import VariableBindable
+from .base import InputImage
+from .image_files import DecodePool, ImageFileSequence
 from .image_sequence import ImageSequenceAcquirer
 
 
@@ -48,16 +50,38 @@ class LocalStorageAcquirer(ImageSequenceAcquirer):
         # Sort image paths in lexicographic order, and ignore paths to directories.
         image_paths = sorted([p for p in map(Path, image_paths) if not p.is_dir()])
 
-        images: MutableSequence[np.ndarray] = []
-        for image_path in image_paths:
-            # Load in grayscale to save memory.
-            image = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
-            if image is None:
-                raise ValueError(f"Failed to load image from '{image_path}'")
+        # Images are decoded lazily, only check that they look readable for now. Reading the file headers is
+        # mostly waiting on I/O, so check them in parallel.
+        DecodePool.default().map(_check_image_readable, image_paths)
 
-            image.flags.writeable = False
+        self.bn_images.set(ImageFileSequence(image_paths))
+        self.bn_last_loaded_paths.set(tuple(image_paths))
 
-            images.append(image)
+    def _create_input_image(self, index: int, timestamp: float) -> InputImage:
+        return _ImageFileInputImage(self.bn_images.get(), index, timestamp)
 
-        self.bn_images.set(images)
-        self.bn_last_loaded_paths.set(tuple(image_paths))
+    def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
+        images = self.bn_images.get()
+        if not isinstance(images, ImageFileSequence):
+            return super().get_image_size_hint()
+
+        return images.size_hint()
+
+
+def _check_image_readable(image_path: Path) -> None:
+    if not cv2.haveImageReader(str(image_path)):
+        raise ValueError(f"Failed to load image from '{image_path}'")
+
+
+class _ImageFileInputImage(InputImage):
+    def __init__(self, images: ImageFileSequence, index: int, timestamp: float) -> None:
+        self._images = images
+        self._index = index
+        self._timestamp = timestamp
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        image = await self._images.read(self._index)
+        return image, self._timestamp
+
+    def cancel(self) -> None:
+        self._images.discard(self._index)
@@ -0,0 +1,410 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import csv
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import List, MutableMapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from opendrop.utility.bindable import AccessorBindable, VariableBindable
+from opendrop.utility.bindable.typing import Bindable
+from .base import InputImage
+from .image_files import LazyImageSequence
+from .image_sequence import ImageSequenceAcquirer
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# A recording is a directory of chunk files and an index. Each chunk is a .npy file holding an array of frames with
+# the same shape and type, so it can be memory-mapped with np.load(mmap_mode='r'). The index is a CSV file with a
+# row for each frame, in the order they were recorded, giving the chunk, the position in the chunk and the
+# timestamp of the frame.
+INDEX_FILENAME = 'index.csv'
+INDEX_HEADER = ('chunk', 'position', 'timestamp')
+
+# Size of a chunk, a chunk holds at least one frame.
+_CHUNK_BYTES = 256 * 2**20
+
+# Number of frames that may be waiting to be written before further frames are dropped.
+_MAX_PENDING = 64
+
+
+def _chunk_filename(chunk: int) -> str:
+    return 'chunk-{:05d}.npy'.format(chunk)
+
+
+class RecordingStats(NamedTuple):
+    """Progress of a FrameRecorder. Frames are dropped if they arrive faster than they can be written, or after a
+    write has failed, which is then given by `error`."""
+
+    num_recorded: int = 0
+    num_dropped: int = 0
+    error: Optional[Exception] = None
+
+
+class FrameRecorder:
+    """Appends frames and their timestamps to a recording in `directory` (created if it does not exist, and must
+    not already contain a recording).
+
+    Frames are written in a background thread, so record() does not block on the disk. At most `max_pending`
+    frames wait to be written, further frames are dropped until the writer catches up. The recorded frames must not
+    be modified afterwards. The index is flushed after every frame, so if OpenDrop exits unexpectedly, the frames
+    written so far can still be read.
+
+    `bn_stats` is updated on the event loop the recorder was created in.
+    """
+
+    def __init__(
+            self,
+            directory: Union[Path, str],
+            *,
+            chunk_bytes: int = _CHUNK_BYTES,
+            max_pending: int = _MAX_PENDING,
+    ) -> None:
+        self._loop = asyncio.get_event_loop()
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        index_path = self.directory/INDEX_FILENAME
+        if index_path.exists():
+            raise ValueError(f"'{self.directory}' already contains a recording")
+
+        self._chunk_bytes = chunk_bytes
+
+        self._index_file = open(index_path, 'x', newline='')
+        self._index_writer = csv.writer(self._index_file)
+        self._index_writer.writerow(INDEX_HEADER)
+        self._index_file.flush()
+
+        self._chunk = -1
+        self._chunk_frames = None  # type: Optional[np.memmap]
+        self._position = 0
+
+        self.bn_stats = VariableBindable(RecordingStats())  # type: Bindable[RecordingStats]
+
+        # Set by the writer thread.
+        self._error = None  # type: Optional[Exception]
+
+        self._queue = queue.SimpleQueue()
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+        self._writer = threading.Thread(target=self._writer_loop, name='FrameRecorder')
+        self._writer.start()
+
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def record(self, image: np.ndarray, timestamp: float) -> bool:
+        """Queue `image` to be written, return False if it was dropped instead."""
+        if self._closed:
+            raise ValueError("Recorder is closed")
+
+        stats = self.bn_stats.get()
+
+        if self._error is not None or not self._pending_slots.acquire(blocking=False):
+            self.bn_stats.set(stats._replace(num_dropped=stats.num_dropped + 1))
+            return False
+
+        self._queue.put((image, timestamp))
+        self.bn_stats.set(stats._replace(num_recorded=stats.num_recorded + 1))
+
+        return True
+
+    def close(self) -> None:
+        """Stop recording. The frames already recorded are written and the recording is closed in the background,
+        use join() to wait for it to finish."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the recording is closed, return False if `timeout` seconds passed first."""
+        self._writer.join(timeout)
+        return not self._writer.is_alive()
+
+    def _writer_loop(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+
+                try:
+                    if self._error is None:
+                        self._write(*item)
+                except Exception as e:
+                    self._write_failed(e)
+                finally:
+                    self._pending_slots.release()
+
+            try:
+                self._finish_chunk()
+            except Exception as e:
+                self._write_failed(e)
+        finally:
+            self._index_file.close()
+
+    def _write_failed(self, error: Exception) -> None:
+        _LOGGER.error("Failed to write to recording '%s'", self.directory, exc_info=error)
+
+        if self._error is None:
+            self._error = error
+
+        try:
+            self._loop.call_soon_threadsafe(self._report_error, error)
+        except RuntimeError:
+            # Event loop is closed.
+            pass
+
+    def _report_error(self, error: Exception) -> None:
+        self.bn_stats.set(self.bn_stats.get()._replace(error=error))
+
+    def _write(self, image: np.ndarray, timestamp: float) -> None:
+        chunk_frames = self._chunk_frames
+        if (chunk_frames is None
+                or self._position == len(chunk_frames)
+                or chunk_frames.shape[1:] != image.shape
+                or chunk_frames.dtype != image.dtype):
+            self._finish_chunk()
+            self._start_chunk(image.shape, image.dtype)
+            chunk_frames = self._chunk_frames
+
+        chunk_frames[self._position] = image
+
+        self._index_writer.writerow((self._chunk, self._position, repr(float(timestamp))))
+        self._index_file.flush()
+
+        self._position += 1
+
+    def _start_chunk(self, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        self._chunk += 1
+        self._position = 0
+
+        capacity = max(self._chunk_bytes // max(int(np.prod(shape)) * dtype.itemsize, 1), 1)
+
+        self._chunk_frames = np.lib.format.open_memmap(
+            self.directory/_chunk_filename(self._chunk),
+            mode='w+',
+            dtype=dtype,
+            shape=(capacity, *shape),
+        )
+
+    def _finish_chunk(self) -> None:
+        chunk_frames = self._chunk_frames
+        if chunk_frames is None:
+            return
+
+        self._chunk_frames = None
+
+        chunk_frames.flush()
+        capacity = len(chunk_frames)
+        del chunk_frames
+
+        if self._position < capacity:
+            _truncate_npy(self.directory/_chunk_filename(self._chunk), self._position)
+
+
+def _truncate_npy(path: Path, length: int) -> None:
+    """Shorten the first axis of the array in the .npy file at `path` to `length`, in place."""
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+
+        shape = (length, *shape[1:])
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(dtype),
+            'fortran_order': fortran_order,
+            'shape': shape,
+        })
+
+        # The new header is never longer than the old one, pad it to the same length so the data does not move.
+        prefix_length = 6 + 2 + (2 if version == (1, 0) else 4)
+        header_length = data_offset - prefix_length
+        header = header.ljust(header_length - 1) + '\n'
+
+        f.seek(prefix_length)
+        f.write(header.encode('latin1'))
+
+        f.truncate(data_offset + length * int(np.prod(shape[1:])) * dtype.itemsize)
+
+
+class RecordedFrameSequence(LazyImageSequence):
+    """The frames of a recording made by FrameRecorder, keyed by (directory, frame number). Chunks are
+    memory-mapped, so reading a frame only reads that frame from disk."""
+
+    def __init__(self, directory: Union[Path, str], **options) -> None:
+        super().__init__(**options)
+
+        self.directory = Path(directory)
+
+        try:
+            with open(self.directory/INDEX_FILENAME, newline='') as f:
+                rows = list(csv.reader(f))
+        except OSError as e:
+            raise ValueError(f"'{self.directory}' is not a recording") from e
+
+        if not rows or tuple(rows[0]) != INDEX_HEADER:
+            raise ValueError(f"'{self.directory}' is not a recording")
+
+        try:
+            entries = [(int(chunk), int(position), float(timestamp)) for chunk, position, timestamp in rows[1:]]
+        except ValueError as e:
+            raise ValueError(f"Index of recording '{self.directory}' is corrupt") from e
+
+        self._locations = [(chunk, position) for chunk, position, _ in entries]
+        self.timestamps = tuple(timestamp for _, _, timestamp in entries)  # type: Sequence[float]
+        self.keys = tuple((self.directory, i) for i in range(len(entries)))
+
+        self._chunks_lock = threading.Lock()
+        self._chunks = {}  # type: MutableMapping[int, np.ndarray]
+
+    def size_hint(self) -> Optional[Tuple[int, int]]:
+        if len(self) == 0:
+            return None
+
+        chunk, _ = self._locations[0]
+        return self._get_chunk(chunk).shape[2:0:-1]
+
+    def close(self) -> None:
+        super().close()
+
+        with self._chunks_lock:
+            self._chunks.clear()
+
+    def _decode(self, index: int) -> np.ndarray:
+        chunk, position = self._locations[index]
+
+        # Copy the frame out of the memory map, so the cache does not keep the chunk files open.
+        image = np.array(self._get_chunk(chunk)[position])
+        image.flags.writeable = False
+
+        return image
+
+    def _get_chunk(self, chunk: int) -> np.ndarray:
+        with self._chunks_lock:
+            frames = self._chunks.get(chunk)
+            if frames is None:
+                path = self.directory/_chunk_filename(chunk)
+                try:
+                    frames = np.load(path, mmap_mode='r')
+                except (OSError, ValueError) as e:
+                    raise ValueError(f"Failed to read '{path}'") from e
+                self._chunks[chunk] = frames
+
+        return frames
+
+
+class RecordingAcquirer(ImageSequenceAcquirer):
+    """Replays a recording made by FrameRecorder. Frames are available immediately and keep their recorded
+    timestamps, so `bn_frame_interval` is not used."""
+
+    IS_REPLICATED = True
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.bn_path = VariableBindable(None)  # type: Bindable[Optional[Path]]
+
+        self.bn_duration = AccessorBindable(getter=self._get_duration)
+
+    def load_recording(self, directory: Union[Path, str]) -> None:
+        images = RecordedFrameSequence(directory)
+        if len(images) == 0:
+            raise ValueError(f"Recording '{images.directory}' has no frames")
+
+        old_images = self.bn_images.get()
+
+        self.bn_path.set(images.directory)
+        self.bn_images.set(images)
+        self.bn_duration.poke()
+
+        if isinstance(old_images, RecordedFrameSequence):
+            old_images.close()
+
+    def _get_duration(self) -> float:
+        images = self.bn_images.get()
+        if not isinstance(images, RecordedFrameSequence) or len(images) == 0:
+            return 0.0
+
+        return images.timestamps[-1] - images.timestamps[0]
+
+    def acquire_images(self) -> Sequence[InputImage]:
+        images = self.bn_images.get()
+        if len(images) == 0:
+            raise ValueError("No recording loaded")
+
+        input_images = []  # type: List[InputImage]
+
+        start = images.timestamps[0]
+        for i in range(len(images)):
+            input_image = _RecordedInputImage(images, i, images.timestamps[i] - start)
+            input_image.is_replicated = self.IS_REPLICATED
+            input_images.append(input_image)
+
+        return input_images
+
+    def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
+        images = self.bn_images.get()
+        if not isinstance(images, RecordedFrameSequence):
+            return None
+
+        return images.size_hint()
+
+    def destroy(self) -> None:
+        images = self.bn_images.get()
+        if isinstance(images, RecordedFrameSequence):
+            images.close()
+
+
+class _RecordedInputImage(InputImage):
+    def __init__(self, images: RecordedFrameSequence, index: int, timestamp: float) -> None:
+        self._images = images
+        self._index = index
+        self._timestamp = timestamp
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        image = await self._images.read(self._index)
+        return image, self._timestamp
+
+    def cancel(self) -> None:
+        self._images.discard(self._index)
@@ -0,0 +1,336 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import math
+import time
+from enum import Enum
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from opendrop.fit.younglaplace.shape import YoungLaplaceShape
+from opendrop.utility.bindable import VariableBindable
+from opendrop.utility.bindable.typing import Bindable
+from .camera import Camera, CameraAcquirer
+from .capture_thread import CaptureThread, FramePool
+
+
+class SyntheticDrop(Enum):
+    PENDANT = ('Pendant drop',)
+    SESSILE = ('Sessile drop',)
+
+    def __init__(self, display_name: str) -> None:
+        self.display_name = display_name
+
+
+class SyntheticCameraAcquirer(CameraAcquirer):
+    """Captures rendered drop images from a SyntheticCamera, for testing without a camera. A new camera is opened
+    whenever a setting changes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.bn_drop = VariableBindable(SyntheticDrop.PENDANT)  # type: Bindable[SyntheticDrop]
+        self.bn_width = VariableBindable(1280)  # type: Bindable[Optional[int]]
+        self.bn_height = VariableBindable(960)  # type: Bindable[Optional[int]]
+        self.bn_fps = VariableBindable(30.0)  # type: Bindable[Optional[float]]
+        self.bn_bond = VariableBindable(0.2)  # type: Bindable[Optional[float]]
+        self.bn_bond_drift = VariableBindable(0.0)  # type: Bindable[Optional[float]]
+        self.bn_noise = VariableBindable(2.0)  # type: Bindable[Optional[float]]
+        self.bn_blur = VariableBindable(1.0)  # type: Bindable[Optional[float]]
+
+        for bn in (self.bn_drop, self.bn_width, self.bn_height, self.bn_fps, self.bn_bond, self.bn_bond_drift,
+                   self.bn_noise, self.bn_blur):
+            bn.on_changed.connect(self._update_camera)
+
+        self._update_camera()
+
+    def _update_camera(self) -> None:
+        try:
+            new_camera = SyntheticCamera(
+                drop=self.bn_drop.get(),
+                resolution=(self.bn_width.get(), self.bn_height.get()),
+                fps=self.bn_fps.get(),
+                bond=self.bn_bond.get(),
+                bond_drift=self.bn_bond_drift.get() or 0.0,
+                noise=self.bn_noise.get() or 0.0,
+                blur=self.bn_blur.get() or 0.0,
+            )
+        except (TypeError, ValueError):
+            # Incomplete or invalid settings.
+            new_camera = None
+
+        self._remove_camera()
+        self.bn_camera.set(new_camera)
+
+    def _remove_camera(self) -> None:
+        camera = self.bn_camera.get()
+        if camera is None:
+            return
+
+        self.bn_camera.set(None)
+        camera.release()
+
+    def destroy(self) -> None:
+        self._remove_camera()
+        super().destroy()
+
+
+class SyntheticCamera(Camera):
+    """A camera that renders drops with Young-Laplace profiles, for load testing the acquisition and analysis
+    pipeline without a camera.
+
+    Frames are rendered in a background thread at `fps` frames per second, or as fast as possible if `fps` is 0.
+    The Bond number starts at `bond` and changes by `bond_drift` per second (kept within the range of shapes that
+    can be rendered). Frames are blurred with a Gaussian of standard deviation `blur` pixels, and Gaussian noise of
+    standard deviation `noise` grey levels is added.
+    """
+
+    _CAPTURE_TIMEOUT = 1.0
+
+    # Longest time the capture thread waits before checking if it has been stopped.
+    _MAX_WAIT = 0.1
+
+    # Range of Bond numbers of the rendered drops. Pendant drops detach above about 0.5, and sessile drops are
+    # rendered with the negative of their Bond number (gravity acts towards the apex).
+    _BOND_RANGE = (0.01, 0.45)
+
+    # Number of points to sample the drop profile at.
+    _PROFILE_POINTS = 400
+
+    _BACKGROUND_LEVEL = 220
+    _DROP_LEVEL = 30
+
+    def __init__(
+            self,
+            drop: SyntheticDrop = SyntheticDrop.PENDANT,
+            resolution: Tuple[int, int] = (1280, 960),
+            fps: float = 30.0,
+            bond: float = 0.2,
+            bond_drift: float = 0.0,
+            noise: float = 2.0,
+            blur: float = 1.0,
+            *,
+            seed: Optional[int] = None,
+    ) -> None:
+        width, height = resolution
+        if width < 16 or height < 16:
+            raise ValueError("'resolution' must be at least 16x16, got {}x{}".format(width, height))
+
+        if fps < 0:
+            raise ValueError("'fps' must be >= 0, got {}".format(fps))
+
+        if not self._BOND_RANGE[0] <= bond <= self._BOND_RANGE[1]:
+            raise ValueError("'bond' must be between {} and {}, got {}".format(*self._BOND_RANGE, bond))
+
+        if noise < 0 or blur < 0:
+            raise ValueError("'noise' and 'blur' must be >= 0")
+
+        self.drop = drop
+        self.resolution = (width, height)
+        self.fps = fps
+        self.bond = bond
+        self.bond_drift = bond_drift
+        self.noise = noise
+        self.blur = blur
+
+        self.bn_alive = VariableBindable(True)
+
+        # Only used by the capture thread.
+        self._rng = np.random.default_rng(seed)
+        self._noise_buffer = np.empty((height, width), dtype=np.float32)
+        self._clean_bond = None  # type: Optional[float]
+        self._clean_frame = None  # type: Optional[np.ndarray]
+
+        self._start = time.monotonic()
+        self._next_frame_time = self._start
+
+        self._capture_thread = CaptureThread(self._grab, pool=FramePool(), name='SyntheticCamera')
+
+    def bond_at(self, t: float) -> float:
+        """Return the Bond number of the drop `t` seconds after the camera was opened."""
+        bond = self.bond + self.bond_drift * t
+        return min(max(bond, self._BOND_RANGE[0]), self._BOND_RANGE[1])
+
+    def capture(self) -> np.ndarray:
+        image, _, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+        return image
+
+    def capture_timestamped(self, not_before: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        if not_before is None:
+            image, timestamp, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+        else:
+            image, timestamp = self._capture_thread.frame_at(not_before, timeout=self._CAPTURE_TIMEOUT)
+
+        return image, timestamp
+
+    def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
+        return self.resolution
+
+    def release(self) -> None:
+        if not self.bn_alive.get():
+            return
+
+        self._capture_thread.stop()
+        self.bn_alive.set(False)
+
+    def _grab(self, out: Optional[np.ndarray]) -> Optional[Tuple[np.ndarray, float]]:
+        # Runs in the capture thread.
+        if self.fps > 0:
+            now = time.monotonic()
+            if now < self._next_frame_time:
+                time.sleep(min(self._next_frame_time - now, self._MAX_WAIT))
+                return None
+
+            # Like a real camera, frames are not made up for if rendering falls behind.
+            self._next_frame_time = max(self._next_frame_time + 1/self.fps, now)
+
+        timestamp = time.monotonic()
+        image = self.render(self.bond_at(timestamp - self._start), out)
+
+        return image, timestamp
+
+    def render(self, bond: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render a frame of a drop with Bond number `bond` into `out` (if it has the right shape and type)."""
+        width, height = self.resolution
+
+        if out is None or out.shape != (height, width) or out.dtype != np.uint8:
+            out = np.empty((height, width), dtype=np.uint8)
+
+        # Rendering the shape is the slow part, reuse it while the Bond number does not change.
+        if bond != self._clean_bond:
+            self._clean_frame = self._render_clean(bond)
+            self._clean_bond = bond
+
+        if self.noise > 0:
+            noise = self._noise_buffer
+            self._rng.standard_normal(dtype=np.float32, out=noise)
+            noise *= self.noise
+            noise += self._clean_frame
+            np.clip(noise, 0, 255, out=noise)
+            np.copyto(out, noise, casting='unsafe')
+        else:
+            np.copyto(out, self._clean_frame, casting='unsafe')
+
+        return out
+
+    def _render_clean(self, bond: float) -> np.ndarray:
+        width, height = self.resolution
+
+        if self.drop is SyntheticDrop.PENDANT:
+            r, z = _pendant_profile(bond, self._PROFILE_POINTS)
+        else:
+            r, z = _sessile_profile(bond, self._PROFILE_POINTS)
+
+        # Scale the drop to half the height and at most 70% of the width of the image.
+        scale = min(0.5 * height / z[-1], 0.35 * width / r.max())
+
+        cx = width / 2
+        x = np.concatenate((cx - r[::-1]*scale, cx + r*scale))
+
+        image = np.full((height, width), self._BACKGROUND_LEVEL, dtype=np.float32)
+
+        if self.drop is SyntheticDrop.PENDANT:
+            # Apex at the bottom, hanging from a needle at the top of the image.
+            apex_y = 0.75 * height
+            y = np.concatenate((apex_y - z[::-1]*scale, apex_y - z*scale))
+            top = apex_y - z[-1]*scale
+            needle_radius = r[-1]*scale
+            cv2.rectangle(
+                image,
+                (int(round(cx - needle_radius)), 0),
+                (int(round(cx + needle_radius)), int(math.ceil(top))),
+                color=self._DROP_LEVEL,
+                thickness=-1,
+            )
+        else:
+            # Apex at the top, sitting on a substrate.
+            base_y = 0.7 * height
+            y = np.concatenate((base_y - z[-1]*scale + z[::-1]*scale, base_y - z[-1]*scale + z*scale))
+            cv2.rectangle(
+                image,
+                (0, int(round(base_y))),
+                (width - 1, height - 1),
+                color=self._DROP_LEVEL,
+                thickness=-1,
+            )
+
+        # Fill with subpixel precision.
+        shift = 4
+        points = np.round(np.stack((x, y), axis=1) * 2**shift).astype(np.int32)
+        cv2.fillPoly(image, [points], color=self._DROP_LEVEL, lineType=cv2.LINE_AA, shift=shift)
+
+        if self.blur > 0:
+            image = cv2.GaussianBlur(image, ksize=(0, 0), sigmaX=self.blur)
+
+        return image
+
+
+def _pendant_profile(bond: float, num_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the profile of a pendant drop (in units of the apex radius, z measured up from the apex), from the
+    apex up to where it narrows to the width of the needle."""
+    r, z = _profile(YoungLaplaceShape(bond), num_points)
+
+    # The needle is 60% as wide as the drop, or attached at the neck if the drop is not that narrow anywhere. The
+    # profile continues past the neck, so only look at the first bulge.
+    dr = np.diff(r)
+    shrinking = np.flatnonzero(dr < 0)
+    widest = shrinking[0] if len(shrinking) else len(r) - 1
+    growing = np.flatnonzero(dr[widest:] > 0)
+    neck = widest + growing[0] if len(growing) else len(r) - 1
+    narrow = np.flatnonzero(r[widest:neck] <= 0.6 * r[widest])
+    end = widest + narrow[0] if len(narrow) else neck
+
+    return r[:end + 1], z[:end + 1]
+
+
+def _sessile_profile(bond: float, num_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the profile of a sessile drop (in units of the apex radius, z measured down from the apex), from the
+    apex down to the substrate."""
+    r, z = _profile(YoungLaplaceShape(-bond), num_points)
+
+    # Cut at a contact angle of 110 degrees.
+    angle = np.arctan2(np.gradient(z), np.gradient(r))
+    past = np.flatnonzero(angle >= math.radians(110))
+    end = past[0] if len(past) else int(np.argmax(z))
+
+    return r[:end + 1], z[:end + 1]
+
+
+def _profile(shape: YoungLaplaceShape, num_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    s = np.linspace(0, 2*math.pi, num_points)
+    r, z = shape(s)
+
+    # Stop where the profile closes on itself.
+    closed = np.flatnonzero(r[1:] <= 0)
+    if len(closed):
+        r, z = r[:closed[0] + 1], z[:closed[0] + 1]
+
+    return r, z
@@ -36,6 +36,7 @@ import numpy as np
 from opendrop.utility.bindable import VariableBindable, AccessorBindable
 from opendrop.utility.events import EventConnection
 from .camera import CameraAcquirer, Camera, CameraCaptureError
+from .capture_thread import CaptureThread
 
 
 class USBCameraAcquirer(CameraAcquirer):
@@ -116,6 +117,9 @@ class USBCamera(Camera):
     _PRECAPTURE = 5
     _CAPTURE_TIMEOUT = 0.5
 
+    # Pixel formats of monochrome cameras, OpenCV would otherwise expand these to three identical channels.
+    _MONO_FOURCCS = {'GREY', 'Y800', 'Y8  '}
+
     def __init__(self, camera_index: int) -> None:
         self._vc = cv2.VideoCapture(camera_index)
 
@@ -124,11 +128,21 @@ class USBCamera(Camera):
         if not self.check_vc_works(timeout=5):
             raise ValueError('Camera failed to open.')
 
+        fourcc = int(self._vc.get(cv2.CAP_PROP_FOURCC))
+        fourcc = ''.join(chr((fourcc >> 8*i) & 0xFF) for i in range(4))
+        if fourcc in self._MONO_FOURCCS:
+            # Not all backends support this, frames are checked for the number of channels anyway.
+            self._vc.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
         # For some reason, on some cameras, the first few images captured will be dark. Consume those images now so the
         # camera will be "fully operational" after initialisation.
         for i in range(self._PRECAPTURE):
             self._vc.read()
 
+        # Only the capture thread reads from self._vc from now on.
+        self._bgr_frame = None  # type: Optional[np.ndarray]
+        self._capture_thread = CaptureThread(self._grab, name='USBCamera({})'.format(camera_index))
+
     def check_vc_works(self, timeout: float) -> bool:
         start_time = time.time()
         while self._vc.isOpened() and (time.time() - start_time) < timeout:
@@ -139,26 +153,59 @@ class USBCamera(Camera):
         else:
             return False
 
-    def capture(self) -> np.ndarray:
+    def _grab(self, out: Optional[np.ndarray]) -> Tuple[np.ndarray, float]:
+        # Runs in the capture thread.
         start_time = time.time()
         while self._vc.isOpened() and (time.time() - start_time) < self._CAPTURE_TIMEOUT:
-            success, image = self._vc.read()
-
+            success, self._bgr_frame = self._vc.read(self._bgr_frame)
             if success:
-                return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                timestamp = time.monotonic()
+                if self._bgr_frame.ndim == 2:
+                    # Monochrome frame, keep it single channel.
+                    if out is None or out.shape != self._bgr_frame.shape:
+                        out = np.empty_like(self._bgr_frame)
+                    np.copyto(out, self._bgr_frame)
+                    return out, timestamp
+                return cv2.cvtColor(self._bgr_frame, cv2.COLOR_BGR2RGB, dst=out), timestamp
 
-        self.release()
         raise CameraCaptureError
 
+    def capture(self) -> np.ndarray:
+        try:
+            image, _, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+        except CameraCaptureError:
+            self.release()
+            raise
+
+        return image
+
+    def capture_timestamped(self, not_before: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        try:
+            if not_before is None:
+                image, timestamp, _ = self._capture_thread.latest(timeout=self._CAPTURE_TIMEOUT)
+            else:
+                image, timestamp = self._capture_thread.frame_at(not_before, timeout=self._CAPTURE_TIMEOUT)
+        except CameraCaptureError:
+            self.release()
+            raise
+
+        return image, timestamp
+
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         width = self._vc.get(cv2.CAP_PROP_FRAME_WIDTH)
         height = self._vc.get(cv2.CAP_PROP_FRAME_HEIGHT)
         return width, height
 
     def release_if_not_working(self, timeout=_CAPTURE_TIMEOUT) -> None:
-        if not self.check_vc_works(timeout):
+        try:
+            self._capture_thread.wait_newer(self._capture_thread.seq, timeout)
+        except CameraCaptureError:
             self.release()
 
     def release(self) -> None:
+        if not self.bn_alive.get():
+            return
+
+        self._capture_thread.stop()
         self._vc.release()
         self.bn_alive.set(False)
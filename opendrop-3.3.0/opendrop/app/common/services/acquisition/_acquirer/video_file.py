@@ -0,0 +1,290 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import math
+import threading
+from pathlib import Path
+from typing import MutableMapping, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from opendrop.utility.bindable import AccessorBindable, VariableBindable
+from opendrop.utility.bindable.typing import Bindable
+from .base import InputImage
+from .image_files import DecodePool, LazyImageSequence
+from .image_sequence import ImageSequenceAcquirer
+
+
+# Seeking may have to decode from the previous keyframe, so skip short distances forward by grabbing frames.
+_MAX_GRAB_AHEAD = 16
+
+
+class VideoFrameSequence(LazyImageSequence):
+    """A sequence of frames of a video file, decoded on demand. `frames` are the frame numbers in the video to
+    include, and images are keyed by (path, frame number).
+
+    Frames are decoded one at a time in a single thread, in the order they are requested, so reading the sequence
+    from start to end decodes the video sequentially and only seeks when `frames` skips a large number of frames.
+    """
+
+    _pool = None  # type: Optional[DecodePool]
+
+    def __init__(self, path: Union[Path, str], frames: Sequence[int], **options) -> None:
+        if VideoFrameSequence._pool is None:
+            VideoFrameSequence._pool = DecodePool(max_workers=1)
+
+        options.setdefault('pool', VideoFrameSequence._pool)
+        super().__init__(**options)
+
+        self.path = Path(path)
+        self.frames = frames
+        self.keys = tuple((self.path, frame) for frame in frames)
+
+        self._capture_lock = threading.Lock()
+        self._capture = _open_video(self.path)
+        self._next_frame = 0  # type: Optional[int]
+        self._fps = self._capture.get(cv2.CAP_PROP_FPS)
+
+        # Container timestamps of decoded frames, these are kept after their images are evicted from the cache.
+        self._timestamps = {}  # type: MutableMapping[int, float]
+
+    async def read_timestamp(self, index: int) -> float:
+        """Return the presentation timestamp in seconds of the frame at `index`, decoding it if necessary."""
+        timestamp = self._timestamps.get(index)
+        if timestamp is None:
+            await self.read(index)
+            timestamp = self._timestamps[index]
+
+        return timestamp
+
+    def size_hint(self) -> Optional[Tuple[int, int]]:
+        width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            return width, height
+
+        return super().size_hint()
+
+    def close(self) -> None:
+        super().close()
+
+        with self._capture_lock:
+            self._capture.release()
+
+    def _decode(self, index: int) -> np.ndarray:
+        frame = self.frames[index]
+
+        with self._capture_lock:
+            capture = self._capture
+            next_frame = self._next_frame
+
+            # The position is unknown until this frame has been read, if anything fails the next decode will seek.
+            self._next_frame = None
+
+            if next_frame is None or not 0 <= frame - next_frame <= _MAX_GRAB_AHEAD:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame)
+                next_frame = frame
+
+            while next_frame < frame:
+                if not capture.grab():
+                    raise ValueError(f"Failed to read frame {next_frame} from '{self.path}'")
+                next_frame += 1
+
+            ret, image = capture.read()
+            if not ret:
+                raise ValueError(f"Failed to read frame {frame} from '{self.path}'")
+
+            self._next_frame = frame + 1
+            timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+
+        if timestamp <= 0 and frame > 0 and self._fps > 0:
+            # Some backends don't report timestamps, assume a constant frame rate.
+            timestamp = frame / self._fps
+
+        self._timestamps[index] = timestamp
+
+        # Convert to grayscale to save memory, like LocalStorageAcquirer.
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        image.flags.writeable = False
+
+        return image
+
+
+def _open_video(path: Path) -> cv2.VideoCapture:
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        raise ValueError(f"Failed to open video '{path}'")
+
+    return capture
+
+
+class VideoFileAcquirer(ImageSequenceAcquirer):
+    """Acquires the frames of a video file. Timestamps are taken from the container, so `bn_frame_interval` is
+    not used."""
+
+    IS_REPLICATED = True
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._loading = False
+
+        self.bn_path = VariableBindable(None)  # type: Bindable[Optional[Path]]
+
+        self._num_video_frames = 0
+        self._fps = math.nan
+        self.bn_num_video_frames = AccessorBindable(getter=self._get_num_video_frames)
+        self.bn_fps = AccessorBindable(getter=self._get_fps)
+
+        self.bn_first_frame = VariableBindable(0)  # type: Bindable[Optional[int]]
+        self.bn_last_frame = VariableBindable(None)  # type: Bindable[Optional[int]]
+        self.bn_frame_stride = VariableBindable(1)  # type: Bindable[Optional[int]]
+
+        self.bn_first_frame.on_changed.connect(self._update_images)
+        self.bn_last_frame.on_changed.connect(self._update_images)
+        self.bn_frame_stride.on_changed.connect(self._update_images)
+
+    def load_video(self, path: Union[Path, str]) -> None:
+        path = Path(path)
+
+        capture = _open_video(path)
+        try:
+            num_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = capture.get(cv2.CAP_PROP_FPS)
+        finally:
+            capture.release()
+
+        if num_frames <= 0:
+            raise ValueError(f"Could not determine the number of frames in '{path}'")
+
+        self._num_video_frames = num_frames
+        self._fps = fps if fps > 0 else math.nan
+
+        self._loading = True
+        try:
+            self.bn_path.set(path)
+
+            # Select the whole video.
+            self.bn_first_frame.set(0)
+            self.bn_last_frame.set(num_frames - 1)
+            self.bn_frame_stride.set(1)
+        finally:
+            self._loading = False
+
+        self.bn_num_video_frames.poke()
+        self.bn_fps.poke()
+
+        self._update_images()
+
+    def _get_num_video_frames(self) -> int:
+        return self._num_video_frames
+
+    def _get_fps(self) -> float:
+        return self._fps
+
+    def get_selected_frames(self) -> range:
+        """Return the frame numbers selected by the first frame, last frame and stride settings."""
+        first = self.bn_first_frame.get()
+        last = self.bn_last_frame.get()
+        stride = self.bn_frame_stride.get()
+
+        if first is None:
+            first = 0
+        if last is None:
+            last = self._num_video_frames - 1
+        if stride is None or stride < 1:
+            stride = 1
+
+        first = max(first, 0)
+        last = min(last, self._num_video_frames - 1)
+
+        return range(first, last + 1, stride)
+
+    def acquire_images(self) -> Sequence[InputImage]:
+        images = self.bn_images.get()
+        if len(images) == 0:
+            raise ValueError("No frames selected")
+
+        input_images = []
+
+        for i in range(len(images)):
+            input_image = _VideoFrameInputImage(images, i)
+            input_image.is_replicated = self.IS_REPLICATED
+            input_images.append(input_image)
+
+        return input_images
+
+    def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
+        images = self.bn_images.get()
+        if not isinstance(images, VideoFrameSequence):
+            return None
+
+        return images.size_hint()
+
+    def _update_images(self) -> None:
+        path = self.bn_path.get()
+        if path is None or self._loading:
+            return
+
+        frames = self.get_selected_frames()
+
+        old_images = self.bn_images.get()
+        if isinstance(old_images, VideoFrameSequence) and old_images.path == path and old_images.frames == frames:
+            return
+
+        self.bn_images.set(VideoFrameSequence(path, frames))
+
+        if isinstance(old_images, VideoFrameSequence):
+            old_images.close()
+
+    def destroy(self) -> None:
+        images = self.bn_images.get()
+        if isinstance(images, VideoFrameSequence):
+            images.close()
+
+
+class _VideoFrameInputImage(InputImage):
+    def __init__(self, images: VideoFrameSequence, index: int) -> None:
+        self._images = images
+        self._index = index
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        image = await self._images.read(self._index)
+
+        # Timestamps are relative to the first selected frame.
+        timestamp = await self._images.read_timestamp(self._index)
+        start = await self._images.read_timestamp(0)
+
+        return image, timestamp - start
+
+    def cancel(self) -> None:
+        self._images.discard(self._index)
@@ -27,11 +27,28 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import time
 from enum import Enum
-from typing import Optional, Tuple, Sequence
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Tuple, Sequence
 
-from ._acquirer import ImageAcquirer, InputImage, LocalStorageAcquirer, USBCameraAcquirer, GenicamAcquirer
-from opendrop.utility.bindable import AccessorBindable
+import numpy as np
+
+from ._acquirer import (
+    CameraAcquirer,
+    FrameRecorder,
+    ImageAcquirer,
+    InputImage,
+    LocalStorageAcquirer,
+    USBCameraAcquirer,
+    GenicamAcquirer,
+    RecordingAcquirer,
+    RecordingStats,
+    SyntheticCameraAcquirer,
+    VideoFileAcquirer,
+)
+from opendrop.utility.bindable import AccessorBindable, VariableBindable
+from opendrop.utility.bindable.typing import Bindable
 
 
 class ImageAcquisitionService:
@@ -42,6 +59,17 @@ class ImageAcquisitionService:
             getter=self._get_acquirer,
         )
 
+        # If set, frames acquired from a camera are recorded to a new recording in this directory, which can be
+        # replayed with RecordingAcquirer.
+        self.bn_recording_dir = VariableBindable(None)  # type: Bindable[Optional[Path]]
+        self.bn_recording_dir.on_changed.connect(self._stop_recording)
+
+        # Statistics of the current (or last) recording.
+        self.bn_recording_stats = VariableBindable(RecordingStats())  # type: Bindable[RecordingStats]
+
+        self._recorder = None  # type: Optional[FrameRecorder]
+        self._recorder_stats_conn = None
+
     def get_acquirer_type(self) -> Optional['AcquirerType']:
         acquirer = self._acquirer
         if acquirer is None:
@@ -49,10 +77,16 @@ class ImageAcquisitionService:
 
         if isinstance(acquirer, LocalStorageAcquirer):
             return AcquirerType.LOCAL_STORAGE
+        elif isinstance(acquirer, VideoFileAcquirer):
+            return AcquirerType.VIDEO_FILE
+        elif isinstance(acquirer, RecordingAcquirer):
+            return AcquirerType.RECORDING
         elif isinstance(acquirer, USBCameraAcquirer):
             return AcquirerType.USB_CAMERA
         elif isinstance(acquirer, GenicamAcquirer):
             return AcquirerType.GENICAM
+        elif isinstance(acquirer, SyntheticCameraAcquirer):
+            return AcquirerType.SYNTHETIC
         else:
             raise ValueError(
                 "Unknown acquirer '{}'"
@@ -69,10 +103,16 @@ class ImageAcquisitionService:
 
         if acquirer_type is AcquirerType.LOCAL_STORAGE:
             new_acquirer = LocalStorageAcquirer()
+        elif acquirer_type is AcquirerType.VIDEO_FILE:
+            new_acquirer = VideoFileAcquirer()
+        elif acquirer_type is AcquirerType.RECORDING:
+            new_acquirer = RecordingAcquirer()
         elif acquirer_type is AcquirerType.USB_CAMERA:
             new_acquirer = USBCameraAcquirer()
         elif acquirer_type is AcquirerType.GENICAM:
             new_acquirer = GenicamAcquirer()
+        elif acquirer_type is AcquirerType.SYNTHETIC:
+            new_acquirer = SyntheticCameraAcquirer()
         else:
             raise ValueError(
                 "Unknown acquirer type '{}'"
@@ -85,7 +125,95 @@ class ImageAcquisitionService:
         if self._acquirer is None:
             raise ValueError('No acquirer chosen yet')
 
-        return self._acquirer.acquire_images()
+        input_images = self._acquirer.acquire_images()
+
+        recorder = self._start_recording()
+        if recorder is not None:
+            # Close the recording once every frame has been recorded or cancelled.
+            remaining = len(input_images)
+
+            def frame_done() -> None:
+                nonlocal remaining
+                remaining -= 1
+                if remaining == 0:
+                    recorder.close()
+
+            input_images = [_RecordingInputImage(im, recorder, frame_done) for im in input_images]
+
+        return input_images
+
+    def stream_images(self) -> AsyncIterator[InputImage]:
+        """Return an async iterator of frames captured by the current camera acquirer, see
+        CameraAcquirer.stream_images()."""
+        if not isinstance(self._acquirer, CameraAcquirer):
+            raise ValueError('Only camera acquirers can stream images')
+
+        input_images = self._acquirer.stream_images()
+
+        recorder = self._start_recording()
+        if recorder is not None:
+            input_images = self._record_stream(input_images, recorder)
+
+        return input_images
+
+    @staticmethod
+    async def _record_stream(
+            input_images: AsyncIterator[InputImage],
+            recorder: FrameRecorder,
+    ) -> AsyncIterator[InputImage]:
+        # Streamed frames have already been captured, record them straight away so the recording can be closed as
+        # soon as the stream ends.
+        try:
+            async for im in input_images:
+                image, timestamp = await im.read()
+                im.is_replicated = recorder.record(image, timestamp)
+                yield im
+        finally:
+            recorder.close()
+
+    def _start_recording(self) -> Optional[FrameRecorder]:
+        self._stop_recording()
+
+        # Stats of the last recording (e.g. a write error that happened after it was closed) are reported until the
+        # next one starts.
+        if self._recorder_stats_conn is not None:
+            self._recorder_stats_conn.disconnect()
+            self._recorder_stats_conn = None
+
+        recording_dir = self.bn_recording_dir.get()
+        if recording_dir is None or not isinstance(self._acquirer, CameraAcquirer):
+            return None
+
+        # Each acquisition gets its own recording, named after when it started.
+        name = time.strftime('%Y-%m-%d %H-%M-%S')
+        path = Path(recording_dir)/name
+        suffix = 1
+        while path.exists():
+            suffix += 1
+            path = Path(recording_dir)/'{} ({})'.format(name, suffix)
+
+        try:
+            recorder = FrameRecorder(path)
+        except OSError as e:
+            raise ValueError("Failed to create recording in '{}'".format(recording_dir)) from e
+
+        self._recorder = recorder
+        self._recorder_stats_conn = recorder.bn_stats.on_changed.connect(
+            lambda: self.bn_recording_stats.set(recorder.bn_stats.get()),
+            weak_ref=False,
+        )
+        self.bn_recording_stats.set(recorder.bn_stats.get())
+
+        return recorder
+
+    def _stop_recording(self) -> None:
+        # Recordings normally close themselves when their acquisition ends, this stops one early. Closing does not
+        # wait for the remaining frames to be written.
+        if self._recorder is None:
+            return
+
+        self._recorder.close()
+        self._recorder = None
 
     def get_image_size_hint(self) -> Optional[Tuple[int, int]]:
         """Return the size that the acquired images will have. If a sensible size cannot be determined, return None.
@@ -99,6 +227,8 @@ class ImageAcquisitionService:
         return self._acquirer
 
     def _set_acquirer(self, new_acquirer: Optional[ImageAcquirer]) -> None:
+        self._stop_recording()
+
         old_acquirer = self._acquirer
         if old_acquirer is not None:
             old_acquirer.destroy()
@@ -107,14 +237,56 @@ class ImageAcquisitionService:
         self.bn_acquirer.poke()
 
     def destroy(self) -> None:
+        self._stop_recording()
+
         if self._acquirer is not None:
             self._acquirer.destroy()
 
 
 class AcquirerType(Enum):
     LOCAL_STORAGE = ('Filesystem',)
+    VIDEO_FILE = ('Video file',)
+    RECORDING = ('Recording',)
     USB_CAMERA = ('cv2.VideoCapture',)
     GENICAM = ('GenICam',)
+    SYNTHETIC = ('Synthetic drop',)
 
     def __init__(self, display_name: str) -> None:
         self.display_name = display_name
+
+
+class _RecordingInputImage(InputImage):
+    """Records the image of another input image when it is read, and calls `done` once it has been recorded or
+    cancelled. The image is only marked as replicated if the recorder accepted it."""
+
+    def __init__(self, input_image: InputImage, recorder: FrameRecorder, done: Callable[[], None]) -> None:
+        self._input_image = input_image
+        self._recorder = recorder
+        self._done = done
+
+    @property
+    def est_ready(self) -> float:
+        return self._input_image.est_ready
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        image, timestamp = await self._input_image.read()
+
+        if self._done is not None and not self._recorder.closed:
+            self.is_replicated = self._recorder.record(image, timestamp)
+        self._call_done()
+
+        return image, timestamp
+
+    def cancel(self) -> None:
+        self._input_image.cancel()
+        self._call_done()
+
+    def _call_done(self) -> None:
+        if self._done is None:
+            return
+
+        self._done()
+        self._done = None
+
+    def release(self) -> None:
+        self._input_image.release()
@@ -32,6 +32,7 @@ from injector import inject
 
 from opendrop.app.common.footer.analysis import AnalysisFooterStatus
 from opendrop.appfw import Presenter, TemplateChild, component
+from opendrop.widgets.error_dialog import ErrorDialog
 from opendrop.widgets.yes_no_dialog import YesNoDialog
 
 from .save_dialog import conan_save_dialog_cs
@@ -63,9 +64,11 @@ class ConanExperimentPresenter(Presenter[Gtk.Assistant]):
         self.progress_helper = progress_helper
         self.save_params_factory = save_params_factory
         session.bind_property('analyses', self.progress_helper, 'analyses', SYNC_CREATE)
+        session.bind_property('acquiring', self.progress_helper, 'acquiring', SYNC_CREATE)
 
     def after_view_init(self) -> None:
         self.session.bind_property('analyses', self.report_page, 'analyses', SYNC_CREATE)
+        self.session.connect('notify::stream-error', self.stream_error_changed)
 
         self.progress_helper.bind_property(
             'status', self.analysis_footer, 'status', SYNC_CREATE,
@@ -143,6 +146,17 @@ class ConanExperimentPresenter(Presenter[Gtk.Assistant]):
 
         self.cancel_dialog.show()
 
+    def stream_error_changed(self, *_) -> None:
+        error = self.session.stream_error
+        if error is None: return
+
+        dialog = ErrorDialog(
+            message_format='Image acquisition stopped: {}'.format(error),
+            parent=self.host,
+        )
+        dialog.connect('response', lambda *_: dialog.destroy())
+        dialog.show()
+
     def save_analyses(self, *_) -> None:
         if hasattr(self, 'save_dialog_component'): return
 
@@ -32,7 +32,7 @@ from typing import Optional, Any
 import cairo
 import numpy as np
 
-from opendrop.features import colorize_labels
+from opendrop.features import LabelOverlay
 from opendrop.geometry import Rect2
 from opendrop.widgets.canvas import ImageArtist
 from opendrop.mvp import ComponentSymbol, View, Presenter
@@ -64,6 +64,15 @@ class ConanPreviewPluginView(View['ConanPreviewPluginPresenter', None]):
         self._features_artist = ImageArtist()
         self._canvas.add_artist(self._features_artist, z_index=z_index)
 
+        # Reused for every update, only the labelled pixels are repainted.
+        self._features_overlay = LabelOverlay(
+            colors=np.array([
+                0x00000000,
+                0xffbbbbff,  # All edges
+                0xff0000ff,  # Drop edges
+            ], dtype=np.uint32).view(np.uint8).reshape(-1, 4),
+        )
+
         self.presenter.view_ready()
 
     def set_image(self, image: Optional[np.ndarray]) -> None:
@@ -89,14 +98,7 @@ class ConanPreviewPluginView(View['ConanPreviewPluginPresenter', None]):
             self._features_artist.clear_data()
             return
 
-        data = colorize_labels(
-            features.labels,
-            colors=np.array([
-                0x00000000,
-                0xffbbbbff,  # All edges
-                0xff0000ff,  # Drop edges
-            ], dtype=np.uint32).view(np.uint8).reshape(-1, 4),
-        )
+        data = self._features_overlay.update(features.labels)
 
         width = features.labels.shape[1]
         height = features.labels.shape[0]
@@ -32,9 +32,6 @@ from typing import Sequence, Iterable
 
 from gi.repository import Gtk, GObject
 from injector import inject
-from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib.ticker import FuncFormatter
 
 from opendrop.app.conan.services.analysis import ConanAnalysisJob
 from opendrop.appfw import Presenter, TemplateChild, component, install
@@ -51,11 +48,25 @@ class ConanReportGraphsPresenter(Presenter[Gtk.Stack]):
 
     _analyses = ()
 
+    figure = None
+    figure_canvas_mapped = False
+
     @inject
     def __init__(self, graphs_service: ConanReportGraphsService) -> None:
         self.graphs_service = graphs_service
 
     def after_view_init(self) -> None:
+        self.graphs_service.connect('notify::left-angle', self.data_changed)
+        self.graphs_service.connect('notify::right-angle', self.data_changed)
+
+        self.data_changed()
+
+    def create_figure(self) -> None:
+        # Matplotlib takes a while to import, so wait until there is something to plot.
+        from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import FuncFormatter
+
         self.figure = Figure(tight_layout=False)
 
         self.figure_canvas = FigureCanvas(self.figure)
@@ -64,8 +75,6 @@ class ConanReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.figure_canvas.props.visible = True
         self.figure_container.add(self.figure_canvas)
 
-        self.figure_canvas_mapped = False
-
         self.figure_canvas.connect('map', self.canvas_map)
         self.figure_canvas.connect('unmap', self.canvas_unmap)
         self.figure_canvas.connect('size-allocate', self.canvas_size_allocate)
@@ -100,11 +109,6 @@ class ConanReportGraphsPresenter(Presenter[Gtk.Stack]):
         self._left_ca_line = left_ca_ax.plot([], marker='o', color='#0080ff')[0]
         self._right_ca_line = right_ca_ax.plot([], marker='o', color='#ff8000')[0]
 
-        self.graphs_service.connect('notify::left-angle', self.data_changed)
-        self.graphs_service.connect('notify::right-angle', self.data_changed)
-
-        self.data_changed()
-
     def canvas_map(self, *_) -> None:
         self.figure_canvas_mapped = True
         self.figure_canvas.draw_idle()
@@ -134,6 +138,9 @@ class ConanReportGraphsPresenter(Presenter[Gtk.Stack]):
             self.show_waiting_placeholder()
             return
 
+        if self.figure is None:
+            self.create_figure()
+
         self.hide_waiting_placeholder()
 
         self._left_ca_line.set_data(left_angle_data)
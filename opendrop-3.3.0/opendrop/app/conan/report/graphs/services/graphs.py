@@ -27,12 +27,13 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from typing import Sequence, Iterable, Tuple
+from typing import Iterable, MutableMapping, Sequence, Tuple
 
 from gi.repository import GObject
 import numpy as np
 
 from opendrop.app.conan.services.analysis import ConanAnalysisJob
+from opendrop.utility.misc import appended_items
 
 
 class ConanReportGraphsService(GObject.Object):
@@ -56,7 +57,7 @@ class ConanReportGraphsService(GObject.Object):
                 self.analysis.disconnect(hid)
 
     def __init__(self, **properties) -> None:
-        self._watchers = []
+        self._watchers = {}  # type: MutableMapping[ConanAnalysisJob, ConanReportGraphsService._AnalysisWatcher]
         super().__init__(**properties)
 
     @GObject.Property
@@ -65,8 +66,20 @@ class ConanReportGraphsService(GObject.Object):
 
     @analyses.setter
     def analyses(self, value: Iterable[ConanAnalysisJob]) -> None:
-        self._analyses = tuple(value)
-        self._analyses_changed()
+        analyses = tuple(value)
+
+        # Analyses are usually only added (while streaming from a camera), avoid comparing all of them.
+        added = appended_items(self._analyses, analyses)
+        if added is not None:
+            watch = added
+            unwatch = ()
+        else:
+            watching = set(self._watchers)
+            watch = set(analyses) - watching
+            unwatch = watching - set(analyses)
+
+        self._analyses = analyses
+        self._analyses_changed(watch, unwatch)
 
     @GObject.Property
     def left_angle(self) -> Tuple[Sequence[float], Sequence[float]]:
@@ -76,21 +89,20 @@ class ConanReportGraphsService(GObject.Object):
     def right_angle(self) -> Tuple[Sequence[float], Sequence[float]]:
         return self._right_angle
 
-    def _analyses_changed(self) -> None:
-        analyses = self._analyses
-        watchers = self._watchers
-        watching = {w.analysis for w in watchers}
+    def _analyses_changed(self, watch: Iterable[ConanAnalysisJob], unwatch: Iterable[ConanAnalysisJob]) -> None:
+        data_changed = False
 
-        for a in analyses:
-            if a not in watching:
-                self._watchers.append(self._AnalysisWatcher(a, self))
+        for analysis in unwatch:
+            self._watchers.pop(analysis).destroy()
+            data_changed = data_changed or _has_data(analysis)
 
-        for w in watchers:
-            if w.analysis not in analyses:
-                w.destroy()
-                self._watchers.remove(w)
+        for analysis in watch:
+            self._watchers[analysis] = self._AnalysisWatcher(analysis, self)
+            data_changed = data_changed or _has_data(analysis)
 
-        self._analysis_data_changed()
+        # New analyses have no results yet, so usually nothing needs to be recomputed.
+        if data_changed:
+            self._analysis_data_changed()
 
     def _analysis_data_changed(self, *_) -> None:
         left_angle_data = []
@@ -130,3 +142,10 @@ class ConanReportGraphsService(GObject.Object):
 
         self.notify('left-angle')
         self.notify('right-angle')
+
+
+def _has_data(analysis: ConanAnalysisJob) -> bool:
+    if analysis.timestamp is None:
+        return False
+
+    return analysis.left_angle is not None or analysis.right_angle is not None
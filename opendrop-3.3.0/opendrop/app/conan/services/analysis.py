@@ -2,7 +2,7 @@ import asyncio
 from enum import IntEnum
 import math
 import time
-from typing import Optional
+from typing import Any, Optional
 
 from injector import inject, Injector
 from gi.repository import GObject
@@ -13,8 +13,7 @@ from opendrop.geometry import Vector2, Rect2, Line2
 from opendrop.app.common.services.acquisition import InputImage
 
 from .params import ConanParams, ConanParamsFactory
-from .features import ConanFeatures, ConanFeaturesService
-from .conan import ConanFitResult, ConanFitService
+from .pipeline import AnalysisStage, ConanAnalysisResult, ConanPipelineService
 
 
 class ConanAnalysisStatus(IntEnum):
@@ -49,8 +48,7 @@ class ConanAnalysisJob(GObject.GObject):
             source: InputImage,
             params: ConanParams,
             *,
-            features_service: ConanFeaturesService,
-            cafit_service: ConanFitService,
+            pipeline_service: ConanPipelineService,
     ) -> None:
         super().__init__()
         self._loop = asyncio.get_event_loop()
@@ -58,8 +56,7 @@ class ConanAnalysisJob(GObject.GObject):
         self._source = source
 
         self._params = params
-        self._features_service = features_service
-        self._cafit_service = cafit_service
+        self._pipeline_service = pipeline_service
 
         self._image = None
         self._timestamp = None
@@ -93,8 +90,7 @@ class ConanAnalysisJob(GObject.GObject):
         self._status = ConanAnalysisStatus.WAITING_FOR_IMAGE
         self._job_start = time.time()
         self._job_end = None
-        self._features = None
-        self._cafit = None
+        self._task = None
 
         self._loop.create_task(source.read()).add_done_callback(self._source_read_done)
 
@@ -113,34 +109,40 @@ class ConanAnalysisJob(GObject.GObject):
         self._image = image
         self._timestamp = timestamp
 
-        self._features = self._features_service.extract(image, self._params)
-        self._features.add_done_callback(self._features_done)
+        self._task = self._pipeline_service.analyse(
+            image,
+            self._params,
+            on_status=self._task_status_changed,
+            # Camera frames are never analysed twice, don't fill the cache with them.
+            use_cache=self._source.is_replicated,
+        )
+        self._task.add_done_callback(self._task_done)
 
         self.status = ConanAnalysisStatus.EXTRACTING_FEATURES
 
-    def _features_done(self, fut: asyncio.Future) -> None:
-        if fut.cancelled():
-            self.cancel()
-        
+    def _task_status_changed(self, stage: AnalysisStage, data: Any) -> None:
         if self.done():
             return
 
-        features: ConanFeatures = fut.result()
-        self.drop_points = features.drop_points
-
-        self._cafit = self._cafit_service.fit(features.drop_points, self._params)
-        self._cafit.add_done_callback(self._cafit_done)
+        if stage is AnalysisStage.FITTING:
+            # Show the extracted features while fitting.
+            self.drop_points = data
+            self.status = ConanAnalysisStatus.FITTING
 
-        self.status = ConanAnalysisStatus.FITTING
+    def _task_done(self, fut: asyncio.Future) -> None:
+        # Finished with the source image, let the acquirer capture more (if it is streaming).
+        self._source.release()
 
-    def _cafit_done(self, fut: asyncio.Future) -> None:
         if fut.cancelled():
             self.cancel()
         
         if self.done():
             return
 
-        result: ConanFitResult = fut.result()
+        analysis_result: ConanAnalysisResult = fut.result()
+        self.drop_points = analysis_result.drop_points
+
+        result = analysis_result.fit
         self.left_contact = result.left_contact
         self.right_contact = result.right_contact
         self.left_angle = result.left_angle
@@ -167,11 +169,10 @@ class ConanAnalysisJob(GObject.GObject):
         if self.status is ConanAnalysisStatus.WAITING_FOR_IMAGE:
             self._source.cancel()
 
-        if self._features is not None:
-            self._features.cancel()
+        if self._task is not None:
+            self._task.cancel()
 
-        if self._cafit is not None:
-            self._cafit.cancel()
+        self._source.release()
 
         self.status = ConanAnalysisStatus.CANCELLED
 
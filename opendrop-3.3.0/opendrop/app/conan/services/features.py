@@ -1,12 +1,12 @@
 from abc import abstractmethod
 import asyncio
-from concurrent.futures.process import ProcessPoolExecutor
-from typing import Optional, Protocol
+from typing import Hashable, Optional, Protocol
 
 from gi.repository import GObject
 from injector import inject
 import numpy as np
 
+from opendrop.analysis import TaskPriority, TaskScheduler
 from opendrop.geometry import Line2, Rect2
 from opendrop.features import extract_contact_angle_features, ContactAngleFeatures as ConanFeatures
 
@@ -39,8 +39,8 @@ class ConanFeaturesParams(Protocol):
 
 class ConanFeaturesService:
     @inject
-    def __init__(self, default_params_factory: ConanParamsFactory) -> None:
-        self._executor = ProcessPoolExecutor(max_workers=1)
+    def __init__(self, scheduler: TaskScheduler, default_params_factory: ConanParamsFactory) -> None:
+        self._scheduler = scheduler
         self._default_params_factory = default_params_factory
 
     def extract(
@@ -48,8 +48,11 @@ class ConanFeaturesService:
             image: np.ndarray,
             params: Optional[ConanFeaturesParams] = None,
             *,
-            labels: bool = False
+            labels: bool = False,
+            source: Optional[Hashable] = None,
     ) -> asyncio.Future:
+        """Extract features for a preview. Previews have lower priority than analyses, and a new request for
+        `source` replaces the previous request for the same source if it has not started yet."""
         params = params or self._default_params_factory.create()
         params_dict = {
             'baseline': params.baseline,
@@ -58,9 +61,10 @@ class ConanFeaturesService:
             'roi': params.roi,
             'labels': labels,
         }
-        cfut = self._executor.submit(extract_contact_angle_features, image, **params_dict)
-        fut = asyncio.wrap_future(cfut, loop=asyncio.get_event_loop())
-        return fut
-
-    def destroy(self) -> None:
-        self._executor.shutdown()
+        return self._scheduler.submit(
+            extract_contact_angle_features,
+            image,
+            **params_dict,
+            priority=TaskPriority.PREVIEW,
+            key=source,
+        )
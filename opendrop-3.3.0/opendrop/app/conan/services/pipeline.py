@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from injector import inject
+import numpy as np
+
+from opendrop.analysis import (
+    AnalysisStage,
+    ContactAngleAnalysisResult as ConanAnalysisResult,
+    ResultCache,
+    TaskPriority,
+    TaskScheduler,
+    analyse_contact_angle,
+)
+
+from .params import ConanParams, ConanParamsFactory
+
+
+__all__ = ('AnalysisStage', 'ConanAnalysisResult', 'ConanPipelineService')
+
+
+class ConanPipelineService:
+    @inject
+    def __init__(
+            self,
+            scheduler: TaskScheduler,
+            cache: ResultCache,
+            default_params_factory: ConanParamsFactory,
+    ) -> None:
+        self._scheduler = scheduler
+        self._cache = cache
+        self._default_params_factory = default_params_factory
+
+    def analyse(
+            self,
+            image: np.ndarray,
+            params: Optional[ConanParams] = None,
+            *,
+            on_status: Optional[Callable[[AnalysisStage, Any], Any]] = None,
+            use_cache: bool = False,
+    ) -> asyncio.Future:
+        """Analyse `image` in a worker process. If `use_cache` is true, results are looked up in and saved to the
+        result cache, which is only worthwhile for images that can be analysed again (e.g. ones read from files).
+        """
+        params = params or self._default_params_factory.create()
+
+        params_dict = {
+            'baseline': params.baseline,
+            'inverted': params.inverted,
+            'thresh': params.thresh,
+            'roi': params.roi,
+            'cache': self._cache if use_cache and self._cache.enabled else None,
+        }
+        return self._scheduler.submit(
+            analyse_contact_angle,
+            image,
+            **params_dict,
+            priority=TaskPriority.ANALYSIS,
+            on_status=on_status,
+            cancellable=True,
+        )
@@ -1,12 +1,18 @@
+import math
 from enum import Enum
-from typing import Iterable, Sequence, Optional
+from typing import Iterable, MutableMapping, Sequence, Optional
 
 from gi.repository import GObject
 
-from .analysis import ConanAnalysisJob
+from opendrop.utility.misc import appended_items
+
+from .analysis import ConanAnalysisJob, ConanAnalysisStatus
 
 
 class ConanAnalysisProgressHelper(GObject.Object):
+    """Aggregate progress of a set of analyses, counts are kept up to date as analyses change status so reading the
+    properties does not depend on the number of analyses."""
+
     class Status(Enum):
         ANALYSING = 0
         FINISHED  = 1
@@ -18,6 +24,9 @@ class ConanAnalysisProgressHelper(GObject.Object):
             self.owner = owner
             self._cleanup_tasks = []
 
+            # The status this analysis is counted under.
+            self.status = analysis.status
+
             self._status_changed_id = analysis.connect('notify::status', self._status_changed)
 
         def _status_changed(self, *_) -> None:
@@ -28,7 +37,13 @@ class ConanAnalysisProgressHelper(GObject.Object):
 
     def __init__(self, **properties) -> None:
         self._analyses = ()
-        self._watchers = []
+        self._acquiring = False
+        self._watchers = {}  # type: MutableMapping[ConanAnalysisJob, ConanAnalysisProgressHelper._AnalysisWatcher]
+
+        self._num_done = 0
+        self._num_cancelled = 0
+        self._time_start = math.inf
+
         super().__init__(**properties)
 
     @GObject.Property
@@ -37,69 +52,99 @@ class ConanAnalysisProgressHelper(GObject.Object):
 
     @analyses.setter
     def analyses(self, analyses: Iterable[ConanAnalysisJob]) -> None:
-        self._analyses = tuple(analyses)
-        self._update_watchers()
+        analyses = tuple(analyses)
 
-    def _update_watchers(self) -> None:
-        analyses = self._analyses
-        watching = [watcher.analysis for watcher in self._watchers]
+        # Analyses are usually only added (while streaming from a camera), avoid comparing all of them.
+        added = appended_items(self._analyses, analyses)
+        if added is not None:
+            watch = added
+            unwatch = ()
+        else:
+            watching = set(self._watchers)
+            watch = set(analyses) - watching
+            unwatch = watching - set(analyses)
 
-        unwatch = set(watching) - set(analyses)
-        watch = set(analyses) - set(watching)
+        self._analyses = analyses
+        self._update_watchers(watch, unwatch)
 
+    @GObject.Property(type=bool, default=False)
+    def acquiring(self) -> bool:
+        """Whether more analyses may still be added because images are still being acquired."""
+        return self._acquiring
+
+    @acquiring.setter
+    def acquiring(self, acquiring: bool) -> None:
+        self._acquiring = acquiring
+        self.notify('status')
+
+    def _update_watchers(
+            self,
+            watch: Iterable[ConanAnalysisJob],
+            unwatch: Iterable[ConanAnalysisJob],
+    ) -> None:
         for analysis in unwatch:
-            for w in tuple(self._watchers):
-                if w.analysis == analysis:
-                    self._watchers.remove(w)
-                    w.destroy()
+            watcher = self._watchers.pop(analysis)
+            watcher.destroy()
+            self._uncount(watcher.status)
 
         for analysis in watch:
-            self._watchers.append(self._AnalysisWatcher(analysis, self))
+            watcher = self._AnalysisWatcher(analysis, self)
+            self._watchers[analysis] = watcher
+            self._count(watcher.status)
+            self._time_start = min(self._time_start, analysis.job_start)
+
+        if unwatch:
+            # The running minimum can't be undone, start over.
+            self._time_start = min((analysis.job_start for analysis in self._watchers), default=math.inf)
 
         self.notify('status')
         self.notify('fraction')
         self.notify('time-start')
 
-    def _analysis_status_changed(self, *_) -> None:
+    def _analysis_status_changed(self, watcher: _AnalysisWatcher) -> None:
+        old_status = watcher.status
+        new_status = watcher.analysis.status
+        if new_status is old_status:
+            return
+
+        self._uncount(old_status)
+        self._count(new_status)
+        watcher.status = new_status
+
         self.notify('status')
         self.notify('fraction')
-        self.notify('time-start')
+
+    def _count(self, status: ConanAnalysisStatus) -> None:
+        if status & ConanAnalysisStatus.TERMINAL:
+            self._num_done += 1
+        if status is ConanAnalysisStatus.CANCELLED:
+            self._num_cancelled += 1
+
+    def _uncount(self, status: ConanAnalysisStatus) -> None:
+        if status & ConanAnalysisStatus.TERMINAL:
+            self._num_done -= 1
+        if status is ConanAnalysisStatus.CANCELLED:
+            self._num_cancelled -= 1
 
     @GObject.Property
     def status(self) -> Status:
-        analyses = self._analyses
-
-        if any(analysis.cancelled() for analysis in analyses):
+        if self._num_cancelled > 0:
             return self.Status.CANCELLED
-        elif all(analysis.done() and not analysis.cancelled()
-                 for analysis in analyses):
+        elif self._acquiring:
+            return self.Status.ANALYSING
+        elif self._num_done == len(self._watchers):
             return self.Status.FINISHED
         else:
             return self.Status.ANALYSING
 
     @GObject.Property
     def time_start(self) -> Optional[float]:
-        analyses = self._analyses
-        if not analyses: return None
-
-        time_start = min(
-            analysis.job_start
-            for analysis in analyses
-        )
-
-        return time_start
+        if not self._watchers: return None
+        return self._time_start
 
     @GObject.Property(type=float)
     def fraction(self) -> float:
-        analyses = self._analyses
-        if not analyses: return 1.0
-
-        num_completed = len([
-            analysis
-            for analysis in analyses
-            if analysis.done()
-        ])
-
-        completed_fraction = num_completed/len(analyses)
+        num_analyses = len(self._watchers)
+        if num_analyses == 0: return 1.0
 
-        return completed_fraction
+        return self._num_done/num_analyses
@@ -141,7 +141,12 @@ def _save_image(job: ConanAnalysisJob, out_file_path: Path) -> None:
         # A copy of the image already exists somewhere, we don't need to save it again.
         return
 
-    image = PIL.Image.fromarray(job.image)
+    image = job.image
+    if image.dtype == np.uint16 and image.ndim == 3:
+        # PIL can't save 16-bit colour images.
+        image = np.right_shift(image, 8, out=np.empty(image.shape, np.uint8), casting='unsafe')
+
+    image = PIL.Image.fromarray(image)
     image.save(out_file_path)
 
 
@@ -221,7 +226,7 @@ def _save_timeline(jobs: Sequence[ConanAnalysisJob], out_file) -> None:
         right_contact = job.right_contact
 
         writer.writerow([
-            format(timestamp, '.1f') if timestamp is not None else '',
+            format(timestamp, '.3f') if timestamp is not None else '',
             format(math.degrees(left_angle), '.1f') if left_angle is not None else '',
             format(math.degrees(right_angle), '.1f') if right_angle is not None else '',
             format(left_contact.x, '.1f') if left_contact is not None else '',
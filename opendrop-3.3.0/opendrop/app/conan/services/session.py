@@ -27,23 +27,31 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from typing import Sequence
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Sequence
 
 from gi.repository import GObject
 from injector import Binder, Module, inject, singleton
 
+from opendrop.analysis import ResultCache, TaskScheduler, default_cache_enabled
 from opendrop.app.common.services.acquisition import (
     AcquirerType,
+    CameraAcquirer,
     ImageAcquisitionService,
+    InputImage,
 )
+from opendrop.utility.events import Event
 
 from .params import ConanParamsFactory
 from .features import ConanFeaturesService
-from .conan import ConanFitService
+from .pipeline import ConanPipelineService
 from .analysis import ConanAnalysisJob, ConanAnalysisStatus, ConanAnalysisService
 from .save import ConanSaveParamsFactory, ConanSaveService
 
 
+_LOGGER = logging.getLogger(__name__)
+
 READABLE        = GObject.ParamFlags.READABLE
 EXPLICIT_NOTIFY = GObject.ParamFlags.EXPLICIT_NOTIFY
 
@@ -54,8 +62,10 @@ class ConanSessionModule(Module):
         binder.bind(ConanSaveParamsFactory, scope=singleton)
 
         binder.bind(ImageAcquisitionService, scope=singleton)
+        binder.bind(TaskScheduler, scope=singleton)
+        binder.bind(ResultCache, to=ResultCache(enabled=default_cache_enabled()), scope=singleton)
         binder.bind(ConanFeaturesService, scope=singleton)
-        binder.bind(ConanFitService, scope=singleton)
+        binder.bind(ConanPipelineService, scope=singleton)
         binder.bind(ConanSaveService, scope=singleton)
 
         binder.bind(ConanSession, scope=singleton)
@@ -66,19 +76,25 @@ class ConanSession(GObject.Object):
     def __init__(
             self,
             image_acquisition: ImageAcquisitionService,
-            features_service: ConanFeaturesService,
-            cafit_service: ConanFitService,
+            scheduler: TaskScheduler,
             analysis_service: ConanAnalysisService,
             save_service: ConanSaveService,
     ) -> None:
-        self._analyses = ()
+        self._analyses = []  # type: List[ConanAnalysisJob]
+        self._analyses_snapshot = ()  # type: Sequence[ConanAnalysisJob]
         self._analyses_saved = False
+        self._stream_task = None  # type: Optional[asyncio.Task]
+        self._stream_error = None  # type: Optional[BaseException]
+
+        # Analyses are added as each frame is captured when streaming from a camera, so notify 'analyses' at most
+        # once per main loop iteration.
+        self._analyses_changed = Event()
+        self._analyses_changed.connect(self._notify_analyses)
 
         self._image_acquisition = image_acquisition
         self._image_acquisition.use_acquirer_type(AcquirerType.LOCAL_STORAGE)
 
-        self._features_service = features_service
-        self._cafit_service = cafit_service
+        self._scheduler = scheduler
         self._analysis_service = analysis_service
         self._save_service = save_service
 
@@ -86,7 +102,17 @@ class ConanSession(GObject.Object):
 
     @GObject.Property(flags=READABLE | EXPLICIT_NOTIFY)
     def analyses(self) -> Sequence[ConanAnalysisJob]:
-        return self._analyses
+        return self._analyses_snapshot
+
+    @GObject.Property(type=bool, default=False, flags=READABLE | EXPLICIT_NOTIFY)
+    def acquiring(self) -> bool:
+        """Whether images are still being acquired, and analyses may still be added."""
+        return self._stream_task is not None
+
+    @GObject.Property(flags=READABLE | EXPLICIT_NOTIFY)
+    def stream_error(self) -> Optional[BaseException]:
+        """The exception that stopped image acquisition early, if any."""
+        return self._stream_error
 
     @GObject.Property(flags=READABLE | EXPLICIT_NOTIFY)
     def analyses_saved(self) -> bool:
@@ -111,17 +137,56 @@ class ConanSession(GObject.Object):
     def start_analyses(self) -> None:
         assert not self._analyses
 
-        sources = self._image_acquisition.acquire_images()
-        self._analyses = tuple(
-            self._analysis_service.analyse(s)
-            for s in sources
-        )
+        acquirer = self._image_acquisition.bn_acquirer.get()
+
+        if isinstance(acquirer, CameraAcquirer):
+            # Create analyses as frames are captured instead of all up front.
+            self._stream_task = asyncio.get_event_loop().create_task(
+                self._stream_analyses(self._image_acquisition.stream_images())
+            )
+            self._stream_task.add_done_callback(self._stream_done)
+        else:
+            sources = self._image_acquisition.acquire_images()
+            self._analyses = [
+                self._analysis_service.analyse(s)
+                for s in sources
+            ]
+
         self._analyses_saved = False
+        self._stream_error = None
 
-        self.notify('analyses')
+        self._notify_analyses()
         self.notify('analyses_saved')
+        self.notify('acquiring')
+        self.notify('stream_error')
+
+    async def _stream_analyses(self, sources: AsyncIterator[InputImage]) -> None:
+        async for s in sources:
+            self._analyses.append(self._analysis_service.analyse(s))
+            self._analyses_changed.fire_soon()
+
+    def _stream_done(self, task: asyncio.Task) -> None:
+        if task is not self._stream_task:
+            return
+
+        self._stream_task = None
+
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            _LOGGER.error("Image acquisition failed", exc_info=error)
+            self._stream_error = error
+            self.notify('stream_error')
+
+        self.notify('acquiring')
+
+    def _notify_analyses(self) -> None:
+        self._analyses_snapshot = tuple(self._analyses)
+        self.notify('analyses')
 
     def cancel_analyses(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+
         keep_analyses = []
         for analysis in self._analyses:
             if analysis.status == ConanAnalysisStatus.WAITING_FOR_IMAGE:
@@ -131,14 +196,14 @@ class ConanSession(GObject.Object):
                 analysis.cancel()
                 keep_analyses.append(analysis)
 
-        self._analyses = tuple(keep_analyses)
-        self.notify('analyses')
+        self._analyses = keep_analyses
+        self._notify_analyses()
 
     def clear_analyses(self) -> None:
         self.cancel_analyses()
-        self._analyses = ()
+        self._analyses = []
         self._analyses_saved = True
-        self.notify('analyses')
+        self._notify_analyses()
         self.notify('analyses_saved')
 
     def save_analyses(self) -> None:
@@ -150,5 +215,4 @@ class ConanSession(GObject.Object):
     def quit(self) -> None:
         self.clear_analyses()
         self._image_acquisition.destroy()
-        self._features_service.destroy()
-        self._cafit_service.destroy()
+        self._scheduler.destroy()
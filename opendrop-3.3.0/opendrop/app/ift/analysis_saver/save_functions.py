@@ -136,7 +136,10 @@ def _save_drop_image(drop: PendantAnalysisJob, out_file_path: Path) -> None:
     if image is None:
         return
 
-    cv2.imwrite(str(out_file_path), cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+    cv2.imwrite(str(out_file_path), image)
 
 
 def _save_drop_params(drop: PendantAnalysisJob, out_file) -> None:
@@ -330,7 +333,7 @@ def _save_timeline_data(drops: Sequence[PendantAnalysisJob], out_file) -> None:
         needle_width = drop.bn_needle_width_px.get()
 
         if timestamp is not None:
-            timestamp_txt = format(timestamp, '.1f')
+            timestamp_txt = format(timestamp, '.3f')
         else:
             timestamp_txt = ''
 
@@ -41,7 +41,7 @@ from opendrop.app.common.image_processing.plugins.preview import (
 from opendrop.mvp import ComponentSymbol, View, Presenter
 from opendrop.geometry import Rect2
 from opendrop.widgets.canvas import ImageArtist, PolylineArtist
-from opendrop.features import colorize_labels
+from opendrop.features import LabelOverlay
 from .model import IFTPreviewPluginModel
 
 ift_preview_plugin_cs = ComponentSymbol()  # type: ComponentSymbol[None]
@@ -61,6 +61,15 @@ class IFTPreviewPluginView(View['IFTPreviewPluginPresenter', None]):
         self._features_artist = ImageArtist()
         self._canvas.add_artist(self._features_artist, z_index=z_index)
 
+        # Reused for every update, only the labelled pixels are repainted.
+        self._features_overlay = LabelOverlay(
+            colors=np.array([
+                0x00000000,
+                0xff8080ff,  # Drop edges
+                0xff8080ff,  # Needle edges
+            ], dtype=np.uint32).view(np.uint8).reshape(-1, 4),
+        )
+
         self._needle_artist = PolylineArtist(
             stroke_color=(1.0, 1.0, 0.5),
             scale_strokes=True,
@@ -88,14 +97,7 @@ class IFTPreviewPluginView(View['IFTPreviewPluginPresenter', None]):
             self._features_artist.clear_data()
             return
 
-        data = colorize_labels(
-            labels,
-            colors=np.array([
-                0x00000000,
-                0xff8080ff,  # Drop edges
-                0xff8080ff,  # Needle edges
-            ], dtype=np.uint32).view(np.uint8).reshape(-1, 4),
-        )
+        data = self._features_overlay.update(labels)
 
         width = labels.shape[1]
         height = labels.shape[0]
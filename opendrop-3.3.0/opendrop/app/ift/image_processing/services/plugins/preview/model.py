@@ -36,6 +36,7 @@ import numpy as np
 from opendrop.app.common.services.acquisition import ImageAcquisitionService, ImageSequenceAcquirer, CameraAcquirer
 from opendrop.app.common.image_processing.plugins.preview.model import (
     AcquirerController,
+    FeaturesCache,
     ImageSequenceAcquirerController,
     CameraAcquirerController
 )
@@ -141,6 +142,9 @@ class IFTPreviewPluginModel:
 
 
 class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
+    # Number of images ahead of the showing image to extract features for in advance.
+    PREFETCH_COUNT = 2
+
     def __init__(
             self, *,
             acquirer: ImageSequenceAcquirer,
@@ -155,10 +159,11 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
 
         self.__destroyed = False
 
-        self._extracted_features = {}
-        self._images = {}
+        self._extracted_features = FeaturesCache()
         self._current_image = None
         self._current_preview = None
+        self._current_preview_fut = None  # type: Optional[asyncio.Future]
+        self._prefetched_for = None
 
         super().__init__(
             acquirer=acquirer,
@@ -169,19 +174,12 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
             features_params_factory.connect('changed', self._features_params_changed)
 
     def _features_params_changed(self, *_) -> None:
-        for fut in self._extracted_features.values():
-            fut.cancel()
-
-        self._extracted_features = {}
+        self._extracted_features.clear()
+        self._prefetched_for = None
         self._queue_update_preview()
 
-    def _on_image_registered(self, image_id: Hashable, image: np.ndarray) -> None:
-        self._images[image_id] = image
-
     def _on_image_deregistered(self, image_id: Hashable) -> None:
-        del self._images[image_id]
-        if image_id in self._extracted_features:
-            del self._extracted_features[image_id]
+        self._extracted_features.discard(image_id)
 
     def _on_image_changed(self, image_id: Hashable) -> None:
         self._current_image = image_id
@@ -191,28 +189,51 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
         if self.__destroyed: return
 
         image_id = self._current_image
-        image = self._images[self._current_image]
+        if image_id is None: return
 
-        if image_id not in self._extracted_features:
-            fut = self._features_service.extract(
-                image,
-                self._features_params_factory.create(),
-                labels=True,
-            )
+        fut = self._request_features(image_id, source=self)
+
+        if not fut.done():
+            # Keep showing the previous features of the same image until the new ones are ready.
+            if self._current_preview != image_id:
+                self._update_preview(None)
+            return
 
-            self._extracted_features[image_id] = fut
-            fut.add_done_callback(self._queue_update_preview)
+        if fut is not self._current_preview_fut:
+            self._current_preview_fut = fut
+            self._update_preview(fut.result())
 
-        fut = self._extracted_features[image_id]
-        if not fut.done() and self._current_preview is self._current_image:
+        if self._prefetched_for == image_id:
             return
 
-        if not fut.done():
-            extracted_features = None
-        else:
-            extracted_features = fut.result()
+        # Warm the cache with the images the user is likely to step to next, once the showing image is done so
+        # prefetching never delays it. Only done once per image, so prefetched features evicted by a full cache are
+        # not extracted over and over again.
+        self._prefetched_for = image_id
+        for k, next_image_id in enumerate(self._get_upcoming_image_ids(self.PREFETCH_COUNT)):
+            self._request_features(next_image_id, source=(self, k))
+
+    def _request_features(self, image_id: Hashable, source: Hashable) -> asyncio.Future:
+        fut = self._extracted_features.get(image_id)
+        if fut is not None and not fut.cancelled():
+            return fut
+
+        # Not requested yet, evicted, or the request was superseded by a request for another image before it started.
+        fut = asyncio.get_event_loop().create_task(self._extract_features(image_id, source))
+        self._extracted_features.put(image_id, fut)
+        fut.add_done_callback(self._queue_update_preview)
+
+        return fut
 
-        self._update_preview(extracted_features)
+    async def _extract_features(self, image_id: Hashable, source: Hashable) -> PendantFeatures:
+        image = await self._read_image(image_id)
+        fut = self._features_service.extract(
+            image,
+            self._features_params_factory.create(),
+            labels=True,
+            source=source,
+        )
+        return await fut
 
     def _update_preview(self, extracted_feature: Optional[PendantFeatures]) -> None:
         self._show_features(extracted_feature)
@@ -220,6 +241,7 @@ class IFTImageSequenceAcquirerController(ImageSequenceAcquirerController):
 
     def destroy(self) -> None:
         self.__destroyed = True
+        self._extracted_features.clear()
         self._features_params_factory.disconnect(self._features_params_changed_id)
         super().destroy()
 
@@ -239,7 +261,9 @@ class IFTCameraAcquirerController(CameraAcquirerController):
 
         self.__destroyed = False
 
-        self._extracted_feature_fut = None
+        self._extracted_feature_fut = None  # type: Optional[asyncio.Future]
+        self._frame_seq = 0
+        self._extracted_seq = 0
 
         super().__init__(
             acquirer=acquirer,
@@ -249,23 +273,32 @@ class IFTCameraAcquirerController(CameraAcquirerController):
         self._source_image_changed_conn = out_image.on_changed.connect(self._source_image_changed)
 
     def _source_image_changed(self) -> None:
+        self._frame_seq += 1
         self._queue_update_preview()
 
     def _queue_update_preview(self) -> None:
         if self.__destroyed: return
 
-        image = self._source_image_out.get()
-        if image is None:
+        # Frames are shown as soon as they are captured, but features are only extracted for one frame at a time,
+        # the latest one once the previous extraction finishes, so the overlay updates as fast as the workers allow
+        # without holding back the frames.
+        fut = self._extracted_feature_fut
+        if fut is not None and not fut.done():
+            return
+
+        if self._extracted_seq == self._frame_seq:
             return
 
-        old = self._extracted_feature_fut
-        if old is not None and not old.done():
+        image = self._source_image_out.get()
+        if image is None:
             return
 
+        self._extracted_seq = self._frame_seq
         fut = self._features_service.extract(
             image,
             self._features_params_factory.create(),
             labels=True,
+            source=self,
         )
         self._extracted_feature_fut = fut
         fut.add_done_callback(self._update_preview)
@@ -274,7 +307,12 @@ class IFTCameraAcquirerController(CameraAcquirerController):
         if fut.cancelled():
             return
 
-        features = fut.result()
+        try:
+            features = fut.result()
+        finally:
+            # Catch up with frames captured in the meantime.
+            self._queue_update_preview()
+
         self._show_features(features)
 
     def destroy(self) -> None:
@@ -29,11 +29,8 @@
 
 from typing import Iterable, Sequence, Tuple
 
-from gi.repository import Gtk, GObject
+from gi.repository import GLib, Gtk, GObject
 from injector import inject
-from matplotlib import ticker
-from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
-from matplotlib.figure import Figure
 
 from opendrop.app.ift.services.analysis import PendantAnalysisJob
 from opendrop.appfw import Presenter, TemplateChild, component, install
@@ -48,13 +45,36 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
     spinner: TemplateChild[Gtk.Spinner] = TemplateChild('spinner')
     figure_container: TemplateChild[Gtk.Container] = TemplateChild('figure_container')
 
+    # Minimum time between redraws in milliseconds, data changes in the meantime are drawn together.
+    REDRAW_INTERVAL = 200
+
+    # Points are drawn without markers once a series is longer than this, markers make drawing long series slow.
+    MAX_MARKERS = 500
+
     _analyses = ()
+    _redraw_source_id = None
+    _ylims = ()
+
+    figure = None
+    figure_canvas_mapped = False
 
     @inject
     def __init__(self, graphs_service: IFTReportGraphsService) -> None:
         self.graphs_service = graphs_service
 
     def after_view_init(self) -> None:
+        self.graphs_service.connect('notify::ift', self.hdl_model_data_changed)
+        self.graphs_service.connect('notify::volume', self.hdl_model_data_changed)
+        self.graphs_service.connect('notify::surface-area', self.hdl_model_data_changed)
+
+        self.redraw()
+
+    def create_figure(self) -> None:
+        # Matplotlib takes a while to import, so wait until there is something to plot.
+        from matplotlib import ticker
+        from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
+        from matplotlib.figure import Figure
+
         figure = Figure(tight_layout=False)
         self.figure = figure
 
@@ -64,8 +84,6 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.figure_canvas.props.visible = True
         self.figure_container.add(self.figure_canvas)
 
-        self.figure_canvas_mapped = False
-
         self.figure_canvas.connect('map', self.hdl_canvas_map)
         self.figure_canvas.connect('unmap', self.hdl_canvas_unmap)
         self.figure_canvas.connect('size-allocate', self.hdl_canvas_size_allocate)
@@ -101,15 +119,9 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.volume_line = volume_axes.plot([], marker='o', color='blue')[0]
         self.surface_area_line = surface_area_axes.plot([], marker='o', color='green')[0]
 
-        self.graphs_service.connect('notify::ift', self.hdl_model_data_changed)
-        self.graphs_service.connect('notify::volume', self.hdl_model_data_changed)
-        self.graphs_service.connect('notify::surface-area', self.hdl_model_data_changed)
-
-        self.hdl_model_data_changed()
-
     def hdl_canvas_map(self, *_) -> None:
         self.figure_canvas_mapped = True
-        self.figure_canvas.draw_idle()
+        self.redraw()
 
     def hdl_canvas_unmap(self, *_) -> None:
         self.figure_canvas_mapped = False
@@ -129,6 +141,20 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.graphs_service.set_analyses(analyses)
 
     def hdl_model_data_changed(self, *args) -> None:
+        if self._redraw_source_id is not None:
+            return
+
+        self._redraw_source_id = GLib.timeout_add(
+            priority=GLib.PRIORITY_LOW,
+            interval=self.REDRAW_INTERVAL,
+            function=self.redraw,
+        )
+
+    def redraw(self) -> bool:
+        if self._redraw_source_id is not None:
+            GLib.source_remove(self._redraw_source_id)
+            self._redraw_source_id = None
+
         ift_data = self.graphs_service.ift
         volume_data = self.graphs_service.volume
         surface_area_data = self.graphs_service.surface_area
@@ -139,7 +165,10 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
                 len(surface_area_data[0]) <= 1
         ):
             self.show_waiting_placeholder()
-            return
+            return GLib.SOURCE_REMOVE
+
+        if self.figure is None:
+            self.create_figure()
 
         self.hide_waiting_placeholder()
 
@@ -147,12 +176,17 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.set_volume_data(volume_data)
         self.set_surface_area_data(surface_area_data)
 
-        if self.figure_canvas_mapped:
+        # Laying out the figure is about as slow as drawing it, only needed if the tick labels may have changed.
+        ylims = tuple(axes.get_ylim() for axes in self.figure.axes)
+        if self.figure_canvas_mapped and ylims != self._ylims:
+            self._ylims = ylims
             self.figure.tight_layout(pad=2.0, h_pad=0)
             self.figure.subplots_adjust(hspace=0)
 
         self.figure_canvas.draw_idle()
 
+        return GLib.SOURCE_REMOVE
+
     def show_waiting_placeholder(self) -> None:
         self.host.set_visible_child(self.spinner)
         self.spinner.start()
@@ -166,6 +200,7 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
             return
 
         self.ift_line.set_data(data)
+        self.ift_line.set_marker('o' if len(data[0]) <= self.MAX_MARKERS else '')
 
         self.update_xlim()
 
@@ -177,6 +212,7 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
             return
 
         self.volume_line.set_data(data)
+        self.volume_line.set_marker('o' if len(data[0]) <= self.MAX_MARKERS else '')
 
         self.update_xlim()
 
@@ -188,6 +224,7 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
             return
 
         self.surface_area_line.set_data(data)
+        self.surface_area_line.set_marker('o' if len(data[0]) <= self.MAX_MARKERS else '')
 
         self.update_xlim()
 
@@ -195,17 +232,22 @@ class IFTReportGraphsPresenter(Presenter[Gtk.Stack]):
         self.surface_area_line.axes.margins(y=0.1)
 
     def update_xlim(self) -> None:
-        all_xdata = (
-            *self.ift_line.get_xdata(),
-            *self.volume_line.get_xdata(),
-            *self.surface_area_line.get_xdata(),
-        )
-
-        if len(all_xdata) <= 1:
+        # Data is sorted by time, so only the ends need to be looked at.
+        all_xdata = [
+            xdata
+            for xdata in (
+                self.ift_line.get_xdata(),
+                self.volume_line.get_xdata(),
+                self.surface_area_line.get_xdata(),
+            )
+            if len(xdata) > 0
+        ]
+
+        if sum(map(len, all_xdata)) <= 1:
             return
 
-        xmin = min(all_xdata)
-        xmax = max(all_xdata)
+        xmin = min(xdata[0] for xdata in all_xdata)
+        xmax = max(xdata[-1] for xdata in all_xdata)
 
         if xmin == xmax:
             return
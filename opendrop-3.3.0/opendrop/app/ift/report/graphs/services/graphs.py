@@ -28,11 +28,101 @@
 
 
 import math
-from typing import Iterable, Sequence, Tuple
+from typing import Any, Hashable, Iterable, MutableMapping, Optional, Sequence, Tuple
 
 from gi.repository import GObject
+import numpy as np
 
 from opendrop.app.ift.services.analysis import PendantAnalysisJob
+from opendrop.utility.misc import appended_items
+
+
+class TimeSeries:
+    """Points (timestamp, value), each belonging to a key, kept sorted by timestamp in arrays that grow as needed.
+
+    Points are usually added in order of timestamp, which appends in amortized constant time. Out of order
+    insertions and removals only move the points after them.
+    """
+
+    def __init__(self) -> None:
+        self._t = np.empty(64)
+        self._v = np.empty(64)
+        self._keys = np.empty(64, dtype=object)
+        self._len = 0
+
+        self._timestamps = {}  # type: MutableMapping[Hashable, float]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timestamps
+
+    @property
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the timestamps and values in ascending order of timestamp."""
+        return self._t[:self._len].copy(), self._v[:self._len].copy()
+
+    def set(self, key: Hashable, timestamp: float, value: float) -> bool:
+        """Add or move the point of `key`, return False if it was already there."""
+        if self._timestamps.get(key) == timestamp:
+            i = self._index(key, timestamp)
+            if self._v[i] == value:
+                return False
+            self._v[i] = value
+            return True
+
+        self.discard(key)
+
+        if self._len == len(self._t):
+            self._grow()
+
+        # After points with the same timestamp, so points added in order stay in order.
+        i = int(np.searchsorted(self._t[:self._len], timestamp, side='right'))
+
+        for arr in (self._t, self._v, self._keys):
+            arr[i + 1:self._len + 1] = arr[i:self._len]
+
+        self._t[i] = timestamp
+        self._v[i] = value
+        self._keys[i] = key
+        self._len += 1
+
+        self._timestamps[key] = timestamp
+
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        timestamp = self._timestamps.pop(key, None)
+        if timestamp is None:
+            return
+
+        i = self._index(key, timestamp)
+
+        for arr in (self._t, self._v, self._keys):
+            arr[i:self._len - 1] = arr[i + 1:self._len]
+
+        self._len -= 1
+        self._keys[self._len] = None
+
+    def _index(self, key: Hashable, timestamp: float) -> int:
+        t = self._t[:self._len]
+        lo = int(np.searchsorted(t, timestamp, side='left'))
+        hi = int(np.searchsorted(t, timestamp, side='right'))
+
+        for i in range(lo, hi):
+            if self._keys[i] == key:
+                return i
+
+        raise RuntimeError("Point not found, this should never happen.")
+
+    def _grow(self) -> None:
+        size = 2 * len(self._t)
+        for name in ('_t', '_v', '_keys'):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:self._len] = old[:self._len]
+            setattr(self, name, new)
 
 
 class IFTReportGraphsService(GObject.Object):
@@ -43,19 +133,17 @@ class IFTReportGraphsService(GObject.Object):
             self._cleanup_tasks = []
 
             event_connections = [
-                self.analysis.bn_interfacial_tension.on_changed.connect(
-                    owner._tracked_analysis_data_changed
-                ),
-                self.analysis.bn_volume.on_changed.connect(
-                    owner._tracked_analysis_data_changed
-                ),
-                self.analysis.bn_surface_area.on_changed.connect(
-                    owner._tracked_analysis_data_changed
-                ),
+                self.analysis.bn_image_timestamp.on_changed.connect(self._data_changed),
+                self.analysis.bn_interfacial_tension.on_changed.connect(self._data_changed),
+                self.analysis.bn_volume.on_changed.connect(self._data_changed),
+                self.analysis.bn_surface_area.on_changed.connect(self._data_changed),
             ]
 
             self._cleanup_tasks.extend(conn.disconnect for conn in event_connections)
 
+        def _data_changed(self) -> None:
+            self._owner._tracked_analysis_data_changed(self.analysis)
+
         def destroy(self) -> None:
             for f in self._cleanup_tasks:
                 f()
@@ -63,92 +151,96 @@ class IFTReportGraphsService(GObject.Object):
     def __init__(self) -> None:
         super().__init__()
         self._analyses = ()
-        self._watchers = []
+        self._watchers = {}  # type: MutableMapping[PendantAnalysisJob, IFTReportGraphsService._AnalysisWatcher]
 
-        self._ift = ((), ())  # type: Tuple[Sequence[float], Sequence[float]]
-        self._volume = ((), ())  # type: Tuple[Sequence[float], Sequence[float]]
-        self._surface_area = ((), ())  # type: Tuple[Sequence[float], Sequence[float]]
+        self._ift = TimeSeries()
+        self._volume = TimeSeries()
+        self._surface_area = TimeSeries()
 
     def set_analyses(self, analyses: Iterable[PendantAnalysisJob]) -> None:
-        self._analyses = tuple(analyses)
-        self._analyses_changed()
-
-    def _analyses_changed(self) -> None:
-        analyses = self._analyses
-        watching = [watcher.analysis for watcher in self._watchers]
+        analyses = tuple(analyses)
+
+        # Analyses are usually only added (while streaming from a camera), avoid comparing all of them.
+        added = appended_items(self._analyses, analyses)
+        if added is not None:
+            to_watch = added
+            to_unwatch = ()
+        else:
+            watching = set(self._watchers)
+            to_watch = set(analyses) - watching
+            to_unwatch = watching - set(analyses)
+
+        self._analyses = analyses
+        self._analyses_changed(to_watch, to_unwatch)
+
+    def _analyses_changed(
+            self,
+            to_watch: Iterable[PendantAnalysisJob],
+            to_unwatch: Iterable[PendantAnalysisJob],
+    ) -> None:
+        ift_changed = volume_changed = surface_area_changed = False
 
-        to_watch = set(analyses) - set(watching)
-        for analysis in to_watch:
-            self._watchers.append(self._AnalysisWatcher(analysis, self))
-
-        to_unwatch = set(watching) - set(analyses)
         for analysis in to_unwatch:
-            for watcher in tuple(self._watchers):
-                if watcher.analysis == analysis:
-                    self._watchers.remove(watcher)
-                    watcher.destroy()
-
-        self._tracked_analysis_data_changed()
-
-    def _tracked_analysis_data_changed(self) -> None:
-        ift_data = []
-        vol_data = []
-        sur_data = []
-
-        analyses = self._analyses
-
-        for analysis in analyses:
-            timestamp = analysis.bn_image_timestamp.get()
-            if timestamp is None or not math.isfinite(timestamp):
-                continue
-
-            ift_value = analysis.bn_interfacial_tension.get()
-            vol_value = analysis.bn_volume.get()
-            sur_value = analysis.bn_surface_area.get()
-
-            if ift_value is not None and math.isfinite(ift_value):
-                ift_data.append((timestamp, ift_value))
-
-            if vol_value is not None and math.isfinite(vol_value):
-                vol_data.append((timestamp, vol_value))
+            self._watchers.pop(analysis).destroy()
+            ift_changed |= _update_point(self._ift, analysis, None, None)
+            volume_changed |= _update_point(self._volume, analysis, None, None)
+            surface_area_changed |= _update_point(self._surface_area, analysis, None, None)
 
-            if sur_value is not None and math.isfinite(sur_value):
-                sur_data.append((timestamp, sur_value))
-
-        # Sort in ascending order of timestamp
-        ift_data = sorted(ift_data, key=lambda x: x[0])
-        vol_data = sorted(vol_data, key=lambda x: x[0])
-        sur_data = sorted(sur_data, key=lambda x: x[0])
-
-        ift_data = tuple(zip(*ift_data))
-        vol_data = tuple(zip(*vol_data))
-        sur_data = tuple(zip(*sur_data))
-
-        if len(ift_data) == 0:
-            ift_data = (tuple(), tuple())
-
-        if len(vol_data) == 0:
-            vol_data = (tuple(), tuple())
-
-        if len(sur_data) == 0:
-            sur_data = (tuple(), tuple())
-
-        self._ift = ift_data
-        self._volume = vol_data
-        self._surface_area = sur_data
-
-        self.notify('ift')
-        self.notify('volume')
-        self.notify('surface-area')
+        for analysis in to_watch:
+            self._watchers[analysis] = self._AnalysisWatcher(analysis, self)
+            changed = self._update_series(analysis)
+            ift_changed |= changed[0]
+            volume_changed |= changed[1]
+            surface_area_changed |= changed[2]
+
+        # New analyses have no results yet, so usually nothing needs to be redrawn.
+        if ift_changed:
+            self.notify('ift')
+        if volume_changed:
+            self.notify('volume')
+        if surface_area_changed:
+            self.notify('surface-area')
+
+    def _tracked_analysis_data_changed(self, analysis: PendantAnalysisJob) -> None:
+        ift_changed, volume_changed, surface_area_changed = self._update_series(analysis)
+
+        if ift_changed:
+            self.notify('ift')
+        if volume_changed:
+            self.notify('volume')
+        if surface_area_changed:
+            self.notify('surface-area')
+
+    def _update_series(self, analysis: PendantAnalysisJob) -> Tuple[bool, bool, bool]:
+        timestamp = analysis.bn_image_timestamp.get()
+        if timestamp is None or not math.isfinite(timestamp):
+            timestamp = None
+
+        return (
+            _update_point(self._ift, analysis, timestamp, analysis.bn_interfacial_tension.get()),
+            _update_point(self._volume, analysis, timestamp, analysis.bn_volume.get()),
+            _update_point(self._surface_area, analysis, timestamp, analysis.bn_surface_area.get()),
+        )
 
     @GObject.Property
     def ift(self) -> Tuple[Sequence[float], Sequence[float]]:
-        return self._ift
+        return self._ift.data
 
     @GObject.Property
     def volume(self) -> Tuple[Sequence[float], Sequence[float]]:
-        return self._volume
+        return self._volume.data
 
     @GObject.Property
     def surface_area(self) -> Tuple[Sequence[float], Sequence[float]]:
-        return self._surface_area
+        return self._surface_area.data
+
+
+def _update_point(series: TimeSeries, key: Any, timestamp: Optional[float], value: Optional[float]) -> bool:
+    """Set or remove the point of `key` in `series`, return True if the series changed."""
+    if timestamp is None or value is None or not math.isfinite(value):
+        if key not in series:
+            return False
+        series.discard(key)
+        return True
+
+    return series.set(key, timestamp, value)
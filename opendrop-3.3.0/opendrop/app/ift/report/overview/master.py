@@ -35,6 +35,7 @@ from gi.repository import GLib
 
 from opendrop.app.ift.services.analysis import PendantAnalysisJob
 from opendrop.appfw import Presenter, TemplateChild, component, install
+from opendrop.utility.misc import appended_items
 
 
 COLUMN_TYPES = (object, int, str, str, str, str, str, str)
@@ -224,12 +225,22 @@ class IFTReportOverviewMasterPresenter(Presenter[Gtk.ScrolledWindow]):
         analyses = self.analyses
         bound = [p.analysis for p in self.row_bindings]
 
+        # Analyses are usually only added (while streaming from a camera), avoid comparing all of them.
+        added = appended_items(bound, analyses)
+        if added is not None:
+            for analysis in added:
+                self.bind_analysis(analysis)
+            return
+
+        analyses_set = set(analyses)
+        bound_set = set(bound)
+
         for analysis in analyses:
-            if analysis in bound: continue
+            if analysis in bound_set: continue
             self.bind_analysis(analysis)
 
         for analysis in bound:
-            if analysis in analyses: continue
+            if analysis in analyses_set: continue
             self.unbind_analysis(analysis)
 
     def bind_analysis(self, analysis: PendantAnalysisJob) -> None:
@@ -32,27 +32,20 @@ import math
 import time
 from asyncio import Future
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 from injector import inject, Injector
 
 import numpy as np
 
 from opendrop.app.common.services.acquisition import InputImage
-from .features import (
-    PendantFeatures,
-    PendantFeaturesParamsFactory,
-    PendantFeaturesService,
-)
+from .features import PendantFeaturesParamsFactory
+from .pipeline import AnalysisStage, PendantAnalysisResult, PendantPipelineService
 from .quantities import PendantPhysicalParamsFactory
-from .younglaplace import YoungLaplaceFitService, YoungLaplaceFitResult
 
 from opendrop.utility.bindable import AccessorBindable, VariableBindable
 from opendrop.geometry import Vector2
 
 
-PI = math.pi
-
-
 class PendantAnalysisService:
     @inject
     def __init__(self, *, injector: Injector) -> None:
@@ -87,16 +80,14 @@ class PendantAnalysisJob:
             *,
             physical_params_factory: PendantPhysicalParamsFactory,
             features_params_factory: PendantFeaturesParamsFactory,
-            features_service: PendantFeaturesService,
-            ylfit_service: YoungLaplaceFitService,
+            pipeline_service: PendantPipelineService,
     ) -> None:
         self._loop = asyncio.get_event_loop()
 
         self._features_params_factory = features_params_factory
         self._physical_params_factory = physical_params_factory
 
-        self._features_service = features_service
-        self._ylfit_service = ylfit_service
+        self._pipeline_service = pipeline_service
 
         self._time_start = time.time()
         self._time_end = math.nan
@@ -151,8 +142,7 @@ class PendantAnalysisJob:
 
         self._loop.create_task(self._input_image.read()).add_done_callback(self._input_image_read_done)
 
-        self._features = None
-        self._ylfit = None
+        self._task = None
 
     def _input_image_read_done(self, read_task: Future) -> None:
         if read_task.cancelled():
@@ -180,94 +170,73 @@ class PendantAnalysisJob:
         self.bn_canny_max.set(features_params.thresh2)
         self.bn_canny_min.set(features_params.thresh1)
 
-        self._features = self._features_service.extract(image, features_params)
-        self._features.add_done_callback(self._features_done)
+        self._task = self._pipeline_service.analyse(
+            image,
+            features_params,
+            self._physical_params_factory.create(),
+            on_status=self._task_status_changed,
+            # Camera frames are never analysed twice, don't fill the cache with them.
+            use_cache=self._input_image.is_replicated,
+        )
+        self._task.add_done_callback(self._task_done)
 
         self.bn_image.poke()
         self.bn_image_timestamp.poke()
 
         self.bn_status.set(self.Status.EXTRACTING_FEATURES)
 
-    def _features_done(self, fut: asyncio.Future) -> None:
-        features: PendantFeatures
-
-        if fut.cancelled():
-            self.cancel()
+    def _task_status_changed(self, stage: AnalysisStage, data: Any) -> None:
+        if self.bn_is_done.get():
             return
-        try:
-            features = fut.result()
-        except Exception as e:
-            raise e
 
-        self.bn_drop_profile_extract.set(features.drop_points.T)
-        self.bn_needle_width_px.set(features.needle_diameter)
+        if stage is AnalysisStage.FITTING:
+            # Show the extracted features while fitting.
+            drop_points, needle_diameter = data
+            self.bn_drop_profile_extract.set(drop_points.T)
+            self.bn_needle_width_px.set(needle_diameter)
 
-        self._ylfit = self._ylfit_service.fit(features.drop_points)
-        self._ylfit.add_done_callback(self._ylfit_done)
+            self.bn_status.set(self.Status.FITTING)
 
-        self.bn_status.set(self.Status.FITTING)
+    def _task_done(self, fut: asyncio.Future) -> None:
+        result: PendantAnalysisResult
 
-    def _ylfit_done(self, fut: asyncio.Future) -> None:
-        result: YoungLaplaceFitResult
+        # Finished with the input image, let the acquirer capture more (if it is streaming).
+        self._input_image.release()
 
         if fut.cancelled():
             self.cancel()
             return
+
+        if self.bn_is_done.get():
+            return
+
         try:
             result = fut.result()
         except Exception as e:
             raise e
 
-        physical_params = self._physical_params_factory.create()
-        drop_density = physical_params.drop_density
-        continuous_density = physical_params.continuous_density
-        needle_diameter = physical_params.needle_diameter
-        gravity = physical_params.gravity
-
-        bond = result.bond
-        apex_x = result.apex_x
-        apex_y = result.apex_y
-        rotation = result.rotation
-        residuals = result.residuals
-        closest = result.closest
-        arclengths = result.arclengths
-        radius_px = result.radius
-        surface_area_px = result.surface_area
-        volume_px = result.volume
+        fit = result.fit
+        quantities = result.quantities
 
         # Keep rotation angle between -90 to 90 degrees.
-        rotation = (rotation + np.pi/2) % np.pi - np.pi/2
-
-        needle_diameter_px = self.bn_needle_width_px.get()
-        if needle_diameter_px is not None:
-            px_size = needle_diameter/needle_diameter_px
-            delta_density = abs(drop_density - continuous_density)
-
-            radius = radius_px * px_size
-            surface_area = surface_area_px * px_size**2
-            volume = volume_px * px_size**3
-            ift = delta_density * gravity * radius**2 / bond
-            worthington = (delta_density * gravity * volume) / (PI * ift * needle_diameter)
-        else:
-            radius = math.nan
-            surface_area = math.nan
-            volume = math.nan
-            ift = math.nan
-            worthington = math.nan
-
-        self.bn_bond_number.set(bond)
-        self.bn_apex_coords_px.set(Vector2(apex_x, apex_y))
-        self.bn_apex_radius_px.set(radius_px)
+        rotation = (fit.rotation + np.pi/2) % np.pi - np.pi/2
+
+        self.bn_drop_profile_extract.set(result.drop_points.T)
+        self.bn_needle_width_px.set(result.needle_diameter)
+
+        self.bn_bond_number.set(fit.bond)
+        self.bn_apex_coords_px.set(Vector2(fit.apex_x, fit.apex_y))
+        self.bn_apex_radius_px.set(fit.radius)
         self.bn_rotation.set(rotation)
-        self.bn_residuals.set(residuals)
-        self.bn_arclengths.set(arclengths)
-        self.bn_drop_profile_fit.set(closest.T[np.argsort(arclengths)])
+        self.bn_residuals.set(fit.residuals)
+        self.bn_arclengths.set(fit.arclengths)
+        self.bn_drop_profile_fit.set(fit.closest.T[np.argsort(fit.arclengths)])
 
-        self.bn_apex_radius.set(radius)
-        self.bn_surface_area.set(surface_area)
-        self.bn_volume.set(volume)
-        self.bn_interfacial_tension.set(ift)
-        self.bn_worthington.set(worthington)
+        self.bn_apex_radius.set(quantities.apex_radius)
+        self.bn_surface_area.set(quantities.surface_area)
+        self.bn_volume.set(quantities.volume)
+        self.bn_interfacial_tension.set(quantities.interfacial_tension)
+        self.bn_worthington.set(quantities.worthington)
 
         self.bn_status.set(self.Status.FINISHED)
 
@@ -279,11 +248,10 @@ class PendantAnalysisJob:
         if self.bn_status.get() is self.Status.WAITING_FOR_IMAGE:
             self._input_image.cancel()
 
-        if self._features is not None:
-            self._features.cancel()
+        if self._task is not None:
+            self._task.cancel()
 
-        if self._ylfit is not None:
-            self._ylfit.cancel()
+        self._input_image.release()
 
         self.bn_status.set(self.Status.CANCELLED)
 
@@ -28,13 +28,13 @@
 
 
 import asyncio
-from concurrent.futures.process import ProcessPoolExecutor
 from injector import inject
-from typing import Optional
+from typing import Hashable, Optional
 
 from gi.repository import GObject
 import numpy as np
 
+from opendrop.analysis import TaskPriority, TaskScheduler
 from opendrop.geometry import Rect2
 from opendrop.features.pendant import PendantFeatures, extract_pendant_features
 
@@ -125,8 +125,8 @@ class PendantFeaturesParams:
 
 class PendantFeaturesService:
     @inject
-    def __init__(self, default_params_factory: PendantFeaturesParamsFactory) -> None:
-        self._executor = ProcessPoolExecutor(max_workers=1)
+    def __init__(self, scheduler: TaskScheduler, default_params_factory: PendantFeaturesParamsFactory) -> None:
+        self._scheduler = scheduler
         self._default_params_factory = default_params_factory
 
     def extract(
@@ -135,11 +135,14 @@ class PendantFeaturesService:
             params: Optional[PendantFeaturesParams] = None,
             *,
             labels: bool = False,
+            source: Optional[Hashable] = None,
     ) -> asyncio.Future:
+        """Extract features for a preview. Previews have lower priority than analyses, and a new request for
+        `source` replaces the previous request for the same source if it has not started yet."""
         if params is None:
             params = self._default_params_factory.create()
 
-        cfut = self._executor.submit(
+        return self._scheduler.submit(
             extract_pendant_features,
             image,
             params.drop_region,
@@ -147,10 +150,6 @@ class PendantFeaturesService:
             thresh1=params.thresh1,
             thresh2=params.thresh2,
             labels=labels,
+            priority=TaskPriority.PREVIEW,
+            key=source,
         )
-
-        fut = asyncio.wrap_future(cfut, loop=asyncio.get_event_loop())
-        return fut
-
-    def destroy(self) -> None:
-        self._executor.shutdown()
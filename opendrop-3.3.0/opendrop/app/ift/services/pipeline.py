@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from injector import inject
+import numpy as np
+
+from opendrop.analysis import (
+    AnalysisStage,
+    PendantAnalysisResult,
+    ResultCache,
+    TaskPriority,
+    TaskScheduler,
+    analyse_pendant,
+)
+
+from .features import PendantFeaturesParams, PendantFeaturesParamsFactory
+from .quantities import PendantPhysicalParams, PendantPhysicalParamsFactory
+
+
+__all__ = ('AnalysisStage', 'PendantAnalysisResult', 'PendantPipelineService')
+
+
+class PendantPipelineService:
+    @inject
+    def __init__(
+            self,
+            scheduler: TaskScheduler,
+            cache: ResultCache,
+            features_params_factory: PendantFeaturesParamsFactory,
+            physical_params_factory: PendantPhysicalParamsFactory,
+    ) -> None:
+        self._scheduler = scheduler
+        self._cache = cache
+        self._features_params_factory = features_params_factory
+        self._physical_params_factory = physical_params_factory
+
+    def analyse(
+            self,
+            image: np.ndarray,
+            features_params: Optional[PendantFeaturesParams] = None,
+            physical_params: Optional[PendantPhysicalParams] = None,
+            *,
+            on_status: Optional[Callable[[AnalysisStage, Any], Any]] = None,
+            use_cache: bool = False,
+    ) -> asyncio.Future:
+        """Analyse `image` in a worker process. If `use_cache` is true, results are looked up in and saved to the
+        result cache, which is only worthwhile for images that can be analysed again (e.g. ones read from files).
+        """
+        if features_params is None:
+            features_params = self._features_params_factory.create()
+
+        if physical_params is None:
+            physical_params = self._physical_params_factory.create()
+
+        return self._scheduler.submit(
+            analyse_pendant,
+            image,
+            features_params.drop_region,
+            features_params.needle_region,
+            thresh1=features_params.thresh1,
+            thresh2=features_params.thresh2,
+            drop_density=physical_params.drop_density,
+            continuous_density=physical_params.continuous_density,
+            needle_diameter=physical_params.needle_diameter,
+            gravity=physical_params.gravity,
+            cache=self._cache if use_cache and self._cache.enabled else None,
+            priority=TaskPriority.ANALYSIS,
+            on_status=on_status,
+            cancellable=True,
+        )
@@ -1,132 +1,247 @@
+import math
+import time
 from enum import Enum
-from typing import Iterable, Optional
+from typing import Iterable, MutableMapping, Optional
 
 from gi.repository import GObject
 
 from opendrop.app.ift.services.analysis import PendantAnalysisJob
+from opendrop.utility.misc import appended_items
 
 
 class IFTAnalysisProgressHelper(GObject.Object):
+    """Aggregate progress of a set of analyses.
+
+    Counts of analyses in each status are kept up to date as analyses change status, so reading the properties does
+    not depend on the number of analyses.
+    """
+
     class Status(Enum):
         ANALYSING = 0
         FINISHED  = 1
         CANCELLED = 2
 
+    # Analysis stages that are timed to estimate the time of completion, in the order analyses go through them.
+    _TIMED_STAGES = (
+        PendantAnalysisJob.Status.EXTRACTING_FEATURES,
+        PendantAnalysisJob.Status.FITTING,
+    )
+
+    # Weight of the latest measurement in the moving averages of stage durations and throughput.
+    _SMOOTHING = 0.1
+
     class _AnalysisWatcher:
-        def __init__(self, analysis: PendantAnalysisJob, owner: 'IFTReportProgressService') -> None:
+        def __init__(self, analysis: PendantAnalysisJob, owner: 'IFTAnalysisProgressHelper') -> None:
             self.analysis = analysis
             self.owner = owner
             self._cleanup_tasks = []
 
+            # The status this analysis is counted under, and when it entered it.
+            self.status = analysis.bn_status.get()
+            self.status_since = time.time()
+
             event_connections = [
-                self.analysis.bn_status.on_changed.connect(
-                    lambda: (owner.notify('status'), owner.notify('est-complete')), weak_ref=False,
-                ),
-                self.analysis.bn_is_done.on_changed.connect(
-                    lambda: owner.notify('fraction'), weak_ref=False,
-                ),
-                self.analysis.bn_time_start.on_changed.connect(
-                    lambda: owner.notify('time-start'), weak_ref=False,
-                ),
-                self.analysis.bn_time_est_complete.on_changed.connect(
-                    lambda: owner.notify('est-complete'), weak_ref=False,
-                ),
+                self.analysis.bn_status.on_changed.connect(self._status_changed),
             ]
 
             self._cleanup_tasks.extend(conn.disconnect for conn in event_connections)
 
+        def _status_changed(self) -> None:
+            self.owner._analysis_status_changed(self)
+
         def destroy(self) -> None:
             for f in self._cleanup_tasks:
                 f()
 
     def __init__(self) -> None:
         self._analyses = ()
-        self._watchers = []
+        self._acquiring = False
+        self._watchers = {}  # type: MutableMapping[PendantAnalysisJob, IFTAnalysisProgressHelper._AnalysisWatcher]
+
+        self._status_counts = {status: 0 for status in PendantAnalysisJob.Status}
+        self._num_done = 0
+
+        self._time_start = math.inf
+        self._last_image_ready = -math.inf
+
+        # Moving averages of how long an analysis spends in each timed stage, and of the time between analyses
+        # leaving each timed stage (the inverse of its throughput).
+        self._stage_duration = {}  # type: MutableMapping[PendantAnalysisJob.Status, float]
+        self._stage_interval = {}  # type: MutableMapping[PendantAnalysisJob.Status, float]
+        self._stage_last_exit = {}  # type: MutableMapping[PendantAnalysisJob.Status, float]
+
         super().__init__()
 
     def _set_analyses(self, analyses: Iterable[PendantAnalysisJob]) -> None:
-        self._analyses = tuple(analyses)
-        self._update_watchers()
+        analyses = tuple(analyses)
+
+        # Analyses are usually only added (while streaming from a camera), avoid comparing all of them.
+        added = appended_items(self._analyses, analyses)
+        if added is not None:
+            to_watch = added
+            to_unwatch = ()
+        else:
+            watching = set(self._watchers)
+            to_watch = set(analyses) - watching
+            to_unwatch = watching - set(analyses)
+
+        self._analyses = analyses
+        self._update_watchers(to_watch, to_unwatch)
 
     analyses = GObject.Property(setter=_set_analyses, flags=GObject.ParamFlags.WRITABLE)
 
-    def _update_watchers(self) -> None:
-        analyses = self._analyses
-        watching = [watcher.analysis for watcher in self._watchers]
+    def _set_acquiring(self, acquiring: bool) -> None:
+        self._acquiring = acquiring
+        self.notify('status')
+        self.notify('est-complete')
 
-        to_watch = set(analyses) - set(watching)
-        for analysis in to_watch:
-            self._watchers.append(self._AnalysisWatcher(analysis, self))
+    # More analyses may still be added while images are being acquired.
+    acquiring = GObject.Property(type=bool, default=False, setter=_set_acquiring, flags=GObject.ParamFlags.WRITABLE)
 
-        to_unwatch = set(watching) - set(analyses)
+    def _update_watchers(
+            self,
+            to_watch: Iterable[PendantAnalysisJob],
+            to_unwatch: Iterable[PendantAnalysisJob],
+    ) -> None:
         for analysis in to_unwatch:
-            for w in tuple(self._watchers):
-                if w.analysis == analysis:
-                    self._watchers.remove(w)
-                    w.destroy()
+            watcher = self._watchers.pop(analysis)
+            watcher.destroy()
+            self._uncount(watcher.status)
+
+        for analysis in to_watch:
+            watcher = self._AnalysisWatcher(analysis, self)
+            self._watchers[analysis] = watcher
+            self._count(watcher.status)
+
+            self._time_start = min(self._time_start, analysis.bn_time_start.get())
+
+            image_ready = analysis.bn_time_est_complete.get()
+            if math.isfinite(image_ready):
+                self._last_image_ready = max(self._last_image_ready, image_ready)
+
+        if to_unwatch:
+            # The running minimum and maximum can't be undone, start over.
+            self._time_start = min((a.bn_time_start.get() for a in self._watchers), default=math.inf)
+            self._last_image_ready = max(
+                (a.bn_time_est_complete.get() for a in self._watchers
+                 if math.isfinite(a.bn_time_est_complete.get())),
+                default=-math.inf,
+            )
+
+        if not self._watchers:
+            self._stage_duration.clear()
+            self._stage_interval.clear()
+            self._stage_last_exit.clear()
 
         self.notify('status')
         self.notify('fraction')
         self.notify('time-start')
         self.notify('est-complete')
 
+    def _analysis_status_changed(self, watcher: _AnalysisWatcher) -> None:
+        old_status = watcher.status
+        new_status = watcher.analysis.bn_status.get()
+        if new_status is old_status:
+            return
+
+        now = time.time()
+
+        if old_status in self._TIMED_STAGES and new_status is not PendantAnalysisJob.Status.CANCELLED:
+            self._stage_exited(old_status, now - watcher.status_since, now)
+
+        self._uncount(old_status)
+        self._count(new_status)
+
+        watcher.status = new_status
+        watcher.status_since = now
+
+        self.notify('status')
+        if new_status.is_terminal != old_status.is_terminal:
+            self.notify('fraction')
+        self.notify('est-complete')
+
+    def _count(self, status: PendantAnalysisJob.Status) -> None:
+        self._status_counts[status] += 1
+        if status.is_terminal:
+            self._num_done += 1
+
+    def _uncount(self, status: PendantAnalysisJob.Status) -> None:
+        self._status_counts[status] -= 1
+        if status.is_terminal:
+            self._num_done -= 1
+
+    def _stage_exited(self, stage: PendantAnalysisJob.Status, duration: float, now: float) -> None:
+        self._stage_duration[stage] = _moving_average(self._stage_duration.get(stage), duration, self._SMOOTHING)
+
+        last_exit = self._stage_last_exit.get(stage)
+        if last_exit is not None:
+            interval = now - last_exit
+            self._stage_interval[stage] = _moving_average(self._stage_interval.get(stage), interval, self._SMOOTHING)
+
+        self._stage_last_exit[stage] = now
+
     @GObject.Property
     def status(self) -> Status:
-        analyses = self._analyses
+        num_analyses = len(self._watchers)
+        num_cancelled = self._status_counts[PendantAnalysisJob.Status.CANCELLED]
 
-        is_cancelled = any(
-            analysis.bn_is_cancelled.get()
-            for analysis in analyses
-        )
-        if is_cancelled:
+        if num_cancelled > 0:
             return self.Status.CANCELLED
 
-        is_finished = all(
-            analysis.bn_is_done.get() and not analysis.bn_is_cancelled.get()
-            for analysis in analyses
-        )
-        if is_finished:
+        if self._acquiring:
+            return self.Status.ANALYSING
+
+        if self._num_done == num_analyses:
             return self.Status.FINISHED
 
         return self.Status.ANALYSING
 
     @GObject.Property
     def time_start(self) -> Optional[float]:
-        analyses = self._analyses
-        if not analyses: return None
-
-        time_start = min(
-            analysis.bn_time_start.get()
-            for analysis in analyses
-        )
-
-        return time_start
+        if not self._watchers: return None
+        return self._time_start
 
     @GObject.Property
     def est_complete(self) -> Optional[float]:
-        analyses = self._analyses
-        if not analyses: return None
+        if not self._watchers: return None
 
         if self.status is not self.Status.ANALYSING: return None
 
-        time_est_complete = max(
-            analysis.bn_time_est_complete.get()
-            for analysis in analyses
-        )
+        # Not before the last image is ready and has gone through every stage.
+        est_complete = self._last_image_ready
+        if math.isfinite(est_complete):
+            est_complete += sum(self._stage_duration.values())
+
+        # Nor before the analyses still to go through each stage have done so, at the rate analyses have been going
+        # through it.
+        num_before = 0
+        for status in PendantAnalysisJob.Status:
+            if status.is_terminal:
+                continue
+
+            num_before += self._status_counts[status]
 
-        return time_est_complete
+            if status not in self._stage_interval:
+                continue
+
+            stage_complete = self._stage_last_exit[status] + num_before * self._stage_interval[status]
+            est_complete = max(est_complete, stage_complete)
+
+        if not math.isfinite(est_complete):
+            return None
+
+        return est_complete
 
     @GObject.Property(type=float)
     def fraction(self) -> float:
-        analyses = self._analyses
-        if not analyses: return 1.0
+        num_analyses = len(self._watchers)
+        if num_analyses == 0: return 1.0
+
+        return self._num_done/num_analyses
 
-        num_completed = len([
-            analysis
-            for analysis in analyses
-            if analysis.bn_is_done.get()
-        ])
 
-        completed_fraction = num_completed/len(analyses)
+def _moving_average(average: Optional[float], value: float, weight: float) -> float:
+    if average is None:
+        return value
 
-        return completed_fraction
+    return (1 - weight) * average + weight * value
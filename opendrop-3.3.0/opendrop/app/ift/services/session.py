@@ -27,19 +27,31 @@
 # with this software.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from typing import Sequence
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Sequence
 
 from gi.repository import GObject
 from injector import Binder, Module, inject, singleton
 
-from opendrop.app.common.services.acquisition import AcquirerType, ImageAcquisitionService
+from opendrop.analysis import ResultCache, TaskScheduler, default_cache_enabled
+from opendrop.app.common.services.acquisition import (
+    AcquirerType,
+    CameraAcquirer,
+    ImageAcquisitionService,
+    InputImage,
+)
 from opendrop.app.ift.analysis_saver import IFTAnalysisSaverOptions
 from opendrop.app.ift.analysis_saver.save_functions import save_drops
+from opendrop.utility.events import Event
 
 from .analysis import PendantAnalysisService, PendantAnalysisJob
 from .features import PendantFeaturesParamsFactory, PendantFeaturesService
+from .pipeline import PendantPipelineService
 from .quantities import PendantPhysicalParamsFactory
-from .younglaplace import YoungLaplaceFitService
+
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class IFTSessionModule(Module):
@@ -49,8 +61,10 @@ class IFTSessionModule(Module):
         binder.bind(PendantPhysicalParamsFactory, scope=singleton)
         binder.bind(PendantFeaturesParamsFactory, scope=singleton)
 
+        binder.bind(TaskScheduler, scope=singleton)
+        binder.bind(ResultCache, to=ResultCache(enabled=default_cache_enabled()), scope=singleton)
         binder.bind(PendantFeaturesService, scope=singleton)
-        binder.bind(YoungLaplaceFitService, scope=singleton)
+        binder.bind(PendantPipelineService, scope=singleton)
 
         binder.bind(PendantAnalysisService, scope=singleton)
 
@@ -62,17 +76,23 @@ class IFTSession(GObject.Object):
     def __init__(
             self,
             image_acquisition: ImageAcquisitionService,
-            features_service: PendantFeaturesService,
-            ylfit_service: YoungLaplaceFitService,
+            scheduler: TaskScheduler,
             analysis_service: PendantAnalysisService,
     ) -> None:
-        self._analyses = ()
+        self._analyses = []  # type: List[PendantAnalysisJob]
+        self._analyses_snapshot = ()  # type: Sequence[PendantAnalysisJob]
         self._analyses_saved = False
+        self._stream_task = None  # type: Optional[asyncio.Task]
+        self._stream_error = None  # type: Optional[BaseException]
+
+        # Analyses are added as each frame is captured when streaming from a camera, so notify 'analyses' at most
+        # once per main loop iteration.
+        self._analyses_changed = Event()
+        self._analyses_changed.connect(self._notify_analyses)
 
         self._image_acquisition = image_acquisition
 
-        self._features_service = features_service
-        self._ylfit_service = ylfit_service
+        self._scheduler = scheduler
 
         self._analysis_service = analysis_service
 
@@ -82,7 +102,17 @@ class IFTSession(GObject.Object):
 
     @GObject.Property(flags=GObject.ParamFlags.READABLE | GObject.ParamFlags.EXPLICIT_NOTIFY)
     def analyses(self) -> Sequence[PendantAnalysisJob]:
-        return self._analyses
+        return self._analyses_snapshot
+
+    @GObject.Property(type=bool, default=False, flags=GObject.ParamFlags.READABLE | GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def acquiring(self) -> bool:
+        """Whether images are still being acquired, and analyses may still be added."""
+        return self._stream_task is not None
+
+    @GObject.Property(flags=GObject.ParamFlags.READABLE | GObject.ParamFlags.EXPLICIT_NOTIFY)
+    def stream_error(self) -> Optional[BaseException]:
+        """The exception that stopped image acquisition early, if any."""
+        return self._stream_error
 
     @GObject.Property(flags=GObject.ParamFlags.READABLE | GObject.ParamFlags.EXPLICIT_NOTIFY)
     def analyses_saved(self) -> bool:
@@ -107,16 +137,54 @@ class IFTSession(GObject.Object):
     def start_analyses(self) -> None:
         assert not self._analyses
 
-        input_images = self._image_acquisition.acquire_images()
+        acquirer = self._image_acquisition.bn_acquirer.get()
+
+        if isinstance(acquirer, CameraAcquirer):
+            # Create analyses as frames are captured instead of all up front.
+            self._stream_task = asyncio.get_event_loop().create_task(
+                self._stream_analyses(self._image_acquisition.stream_images())
+            )
+            self._stream_task.add_done_callback(self._stream_done)
+        else:
+            input_images = self._image_acquisition.acquire_images()
+            self._analyses = [
+                self._analysis_service.analyse(im) for im in input_images
+            ]
 
-        self._analyses = tuple(
-            self._analysis_service.analyse(im) for im in input_images
-        )
         self._analyses_saved = False
-        self.notify('analyses')
+        self._stream_error = None
+        self._notify_analyses()
         self.notify('analyses_saved')
+        self.notify('acquiring')
+        self.notify('stream_error')
+
+    async def _stream_analyses(self, input_images: AsyncIterator[InputImage]) -> None:
+        async for im in input_images:
+            self._analyses.append(self._analysis_service.analyse(im))
+            self._analyses_changed.fire_soon()
+
+    def _stream_done(self, task: asyncio.Task) -> None:
+        if task is not self._stream_task:
+            return
+
+        self._stream_task = None
+
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            _LOGGER.error("Image acquisition failed", exc_info=error)
+            self._stream_error = error
+            self.notify('stream_error')
+
+        self.notify('acquiring')
+
+    def _notify_analyses(self) -> None:
+        self._analyses_snapshot = tuple(self._analyses)
+        self.notify('analyses')
 
     def cancel_analyses(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+
         keep_analyses = []
         for analysis in self._analyses:
             if analysis.bn_status.get() == PendantAnalysisJob.Status.WAITING_FOR_IMAGE:
@@ -126,14 +194,14 @@ class IFTSession(GObject.Object):
                 analysis.cancel()
                 keep_analyses.append(analysis)
 
-        self._analyses = tuple(keep_analyses)
-        self.notify('analyses')
+        self._analyses = keep_analyses
+        self._notify_analyses()
 
     def clear_analyses(self) -> None:
         self.cancel_analyses()
-        self._analyses = ()
+        self._analyses = []
         self._analyses_saved = True
-        self.notify('analyses')
+        self._notify_analyses()
         self.notify('analyses_saved')
 
     def save_analyses(self, options: IFTAnalysisSaverOptions) -> None:
@@ -148,5 +216,4 @@ class IFTSession(GObject.Object):
     def quit(self) -> None:
         self.clear_analyses()
         self._image_acquisition.destroy()
-        self._features_service.destroy()
-        self._ylfit_service.destroy()
+        self._scheduler.destroy()
@@ -0,0 +1,37 @@
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+
+# Largest magnitude of a Scharr derivative of a 16-bit image, the kernel's positive weights add up to 16.
+_UINT16_SCHARR_MAX = 16 * (2**16 - 1)
+
+# Scale of the derivatives of 16-bit images, so they fill the range of CV_16S.
+_UINT16_SCALE = np.iinfo(np.int16).max / _UINT16_SCHARR_MAX
+
+# Ratio between the maximum values of 16-bit and 8-bit images.
+_UINT16_PER_UINT8 = 257
+
+
+def blurred_gradient(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Return the x and y Scharr derivatives of `image` after a Gaussian blur, as CV_16S arrays suitable for
+    cv2.Canny(), and the size of a derivative of one 8-bit intensity level.
+
+    Derivatives of 16-bit images are scaled to use the full range of CV_16S, which keeps about 8 times more
+    precision than reducing them to 8-bit levels. Multiply absolute thresholds by the returned size, so they mean the
+    same for 8 and 16-bit images.
+    """
+    blur = cv2.GaussianBlur(image, ksize=(5, 5), sigmaX=0)
+
+    if blur.dtype == np.uint8:
+        dx = cv2.Scharr(blur, cv2.CV_16S, dx=1, dy=0)
+        dy = cv2.Scharr(blur, cv2.CV_16S, dx=0, dy=1)
+        return dx, dy, 1.0
+
+    dx = cv2.Scharr(blur, cv2.CV_32F, dx=1, dy=0, scale=_UINT16_SCALE)
+    dy = cv2.Scharr(blur, cv2.CV_32F, dx=0, dy=1, scale=_UINT16_SCALE)
+    dx = np.rint(dx, out=dx).astype(np.int16)
+    dy = np.rint(dy, out=dy).astype(np.int16)
+
+    return dx, dy, _UINT16_SCALE * _UINT16_PER_UINT8
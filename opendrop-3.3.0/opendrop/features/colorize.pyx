@@ -1,11 +1,12 @@
 cimport cython
 from libc.stdint cimport *
-from libc.string cimport memcpy
 from cpython cimport array
 import array
 
+import numpy as np
 
-__all__ = ('colorize_labels',)
+
+__all__ = ('colorize_labels', 'LabelOverlay')
 
 
 ctypedef fused integral:
@@ -21,32 +22,169 @@ ctypedef fused integral:
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def colorize_labels(integral[:, :] labels not None, uint8_t[:, ::1] colors not None):
+def colorize_labels(integral[:, :] labels not None, uint8_t[:, ::1] colors not None, uint32_t[:, ::1] out = None):
+    """Look up the color of each label in `colors`, an array of 4-byte colors. Colors are written to `out` (a 2D
+    array of 32-bit pixels the same shape as `labels`) if given, otherwise to a new array of bytes."""
     cdef size_t i, j, n
+    cdef integral label
+    cdef size_t num_colors = colors.shape[0]
+    cdef size_t max_label = 0
+    cdef int64_t min_label = 0
     cdef array.array arr
-    cdef uint8_t[:, :, :] view
-    
+    cdef uint32_t[::1] palette
+
     if colors.shape[1] != 4:
         raise ValueError(
             "axis 1 of colors array must equal 4, got {}"
             .format(colors.shape[1])
         )
-    
-    arr = array.array('B')
-    array.resize(arr, labels.shape[0]*labels.shape[1]*4)
-    
-    view = <uint8_t[:labels.shape[0], :labels.shape[1], :4]> arr.data.as_uchars
-
-    for i in range(labels.shape[0]):
-        for j in range(labels.shape[1]):
-            n = labels[i][j]
-            
-            if n >= colors.shape[0]:
-                raise IndexError(
-                    "index {} is out of bounds for axis 0 of colors array with shape {}"
-                    .format(n, (colors.shape[0], colors.shape[1]))
-                )
-            
-            memcpy(<void *>&view[i][j][0], <void *>&colors[n][0], 4)
-
-    return arr
+
+    if out is None:
+        arr = array.array('B')
+        array.resize(arr, labels.shape[0]*labels.shape[1]*4)
+        out = <uint32_t[:labels.shape[0], :labels.shape[1]]> <uint32_t *> arr.data.as_uchars
+    else:
+        arr = None
+        if out.shape[0] != labels.shape[0] or out.shape[1] != labels.shape[1]:
+            raise ValueError(
+                "out must have shape {}, got {}"
+                .format((labels.shape[0], labels.shape[1]), (out.shape[0], out.shape[1]))
+            )
+
+    # Copy the colors to an array of words, so each pixel is a single load and store.
+    palette = np.asarray(colors).view(np.uint32).ravel() if num_colors else np.zeros(1, dtype=np.uint32)
+
+    with nogil:
+        for i in range(labels.shape[0]):
+            for j in range(labels.shape[1]):
+                label = labels[i, j]
+                # Out of range labels are clamped while looping and reported afterwards. Check the sign before
+                # the cast, so negative labels are not reported as huge ones.
+                if label < 0:
+                    min_label = min(min_label, <int64_t>label)
+                    n = 0
+                else:
+                    n = <size_t>label
+                    if n >= num_colors:
+                        max_label = max(max_label, n)
+                        n = 0
+                out[i, j] = palette[n]
+
+    _check_labels(min_label, max_label, num_colors)
+
+    if arr is not None:
+        return arr
+    else:
+        return out.base
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _paint_labels(integral[:, :] labels, uint32_t[::1] palette, uint32_t[:, ::1] out, intptr_t[::1] painted):
+    """Paint the pixels of `out` with non-zero labels, and record their flat indices in `painted`. Return the number
+    of pixels painted, which may be more than the number recorded if `painted` is too small."""
+    cdef size_t i, j, n
+    cdef integral label
+    cdef size_t num_colors = palette.shape[0]
+    cdef size_t max_label = 0
+    cdef int64_t min_label = 0
+    cdef Py_ssize_t width = labels.shape[1]
+    cdef Py_ssize_t capacity = painted.shape[0]
+    cdef Py_ssize_t count = 0
+
+    with nogil:
+        for i in range(labels.shape[0]):
+            for j in range(labels.shape[1]):
+                label = labels[i, j]
+                if label == 0:
+                    continue
+
+                if label < 0:
+                    min_label = min(min_label, <int64_t>label)
+                    continue
+
+                n = <size_t>label
+                if n >= num_colors:
+                    max_label = max(max_label, n)
+                    continue
+
+                out[i, j] = palette[n]
+
+                if count < capacity:
+                    painted[count] = i*width + j
+                count += 1
+
+    _check_labels(min_label, max_label, num_colors)
+
+    return count
+
+
+def _check_labels(int64_t min_label, size_t max_label, size_t num_colors):
+    """Raise IndexError if a negative label or a label without a color was found."""
+    cdef object bad_label
+
+    if min_label < 0:
+        bad_label = min_label
+    elif max_label >= num_colors:
+        bad_label = max_label
+    else:
+        return
+
+    raise IndexError(
+        "index {} is out of bounds for axis 0 of colors array with shape {}"
+        .format(bad_label, (num_colors, 4))
+    )
+
+
+class LabelOverlay:
+    """Colorized labels in a 2D array of 32-bit pixels that is reused between updates.
+
+    Labels are usually almost all 0 (no feature), so only the pixels with a non-zero label are painted, and only the
+    pixels painted by the previous update are cleared.
+    """
+
+    def __init__(self, colors) -> None:
+        colors = np.ascontiguousarray(colors, dtype=np.uint8)
+        if colors.ndim != 2 or colors.shape[0] == 0 or colors.shape[1] != 4:
+            raise ValueError(
+                "colors must have shape (n, 4), got {}"
+                .format(colors.shape)
+            )
+
+        self._palette = colors.view(np.uint32).ravel()
+
+        self._data = None
+        # Flat indices of the pixels painted by the last update, and how many there are, or None if there were too
+        # many to record.
+        self._painted = None
+        self._num_painted = None
+
+    def update(self, labels: np.ndarray) -> np.ndarray:
+        """Colorize `labels` and return the array of pixels, which is overwritten by the next update."""
+        if labels.ndim != 2:
+            raise ValueError(
+                "labels must be two-dimensional, got shape {}"
+                .format(labels.shape)
+            )
+
+        background = self._palette[0]
+
+        if self._data is None or self._data.shape != labels.shape:
+            self._data = np.full(labels.shape, background, dtype=np.uint32)
+            # Clearing a pixel at a time is only worth it for a small fraction of the pixels.
+            self._painted = np.empty(max(labels.size//16, 1), dtype=np.intp)
+        elif self._num_painted is None:
+            self._data.fill(background)
+        else:
+            self._data.ravel()[self._painted[:self._num_painted]] = background
+
+        # If painting fails part way, the pixels painted so far are not all recorded, so clear everything next time.
+        self._num_painted = None
+
+        num_painted = _paint_labels(labels, self._palette, self._data, self._painted)
+        if num_painted <= len(self._painted):
+            self._num_painted = num_painted
+        else:
+            self._num_painted = None
+
+        return self._data
@@ -4,6 +4,7 @@ import cv2
 import numpy as np
 
 from opendrop.geometry import Line2, Rect2
+from ._gradient import blurred_gradient
 
 
 __all__ = ('ContactAngleFeatures', 'extract_contact_angle_features')
@@ -67,9 +68,7 @@ def extract_contact_angle_features(
     if len(subimage.shape) > 2:
         subimage = cv2.cvtColor(subimage, cv2.COLOR_RGB2GRAY)
 
-    blur = cv2.GaussianBlur(subimage, ksize=(5, 5), sigmaX=0)
-    dx = cv2.Scharr(blur, cv2.CV_16S, dx=1, dy=0)
-    dy = cv2.Scharr(blur, cv2.CV_16S, dx=0, dy=1)
+    dx, dy, _ = blurred_gradient(subimage)
 
     # Use magnitude of gradient squared to get sharper edges.
     mask = (dx.astype(float)**2 + dy.astype(float)**2)
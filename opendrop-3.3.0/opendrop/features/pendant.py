@@ -6,6 +6,7 @@ import numpy as np
 
 from opendrop.geometry import Rect2, Vector2
 from opendrop.utility.misc import rotation_mat2d
+from ._gradient import blurred_gradient
 
 
 __all__ = ('PendantFeatures', 'extract_pendant_features', 'find_pendant_apex')
@@ -90,9 +91,7 @@ def extract_pendant_features(
         if len(needle_image.shape) > 2:
             needle_image = cv2.cvtColor(needle_image, cv2.COLOR_RGB2GRAY)
 
-        blur = cv2.GaussianBlur(needle_image, ksize=(5, 5), sigmaX=0)
-        dx = cv2.Scharr(blur, cv2.CV_16S, dx=1, dy=0)
-        dy = cv2.Scharr(blur, cv2.CV_16S, dx=0, dy=1)
+        dx, dy, _ = blurred_gradient(needle_image)
 
         # Use magnitude of gradient squared to get sharper edges.
         mask = (dx.astype(float)**2 + dy.astype(float)**2)
@@ -191,9 +190,7 @@ def extract_pendant_features(
 
 
 def _extract_drop_edge(gray: np.ndarray, thresh1: float, thresh2: float) -> np.ndarray:
-    blur = cv2.GaussianBlur(gray, ksize=(5, 5), sigmaX=0)
-    dx = cv2.Scharr(blur, cv2.CV_16S, dx=1, dy=0)
-    dy = cv2.Scharr(blur, cv2.CV_16S, dx=0, dy=1)
+    dx, dy, level = blurred_gradient(gray)
 
     # Use magnitude of gradient squared to get sharper edges.
     grad = dx.astype(float)**2 + dy.astype(float)**2
@@ -212,7 +209,7 @@ def _extract_drop_edge(gray: np.ndarray, thresh1: float, thresh2: float) -> np.n
 
     # Hack: Use cv2.Canny() to do non-max suppression edge thinning.
     mask = _largest_connected_component(grad)
-    edges = cv2.Canny(dx*mask, dy*mask, thresh1, thresh2)
+    edges = cv2.Canny(dx*mask, dy*mask, thresh1*level, thresh2*level)
     points = np.array(edges.nonzero()[::-1])
 
     return points
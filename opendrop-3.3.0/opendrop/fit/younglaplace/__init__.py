@@ -1,4 +1,4 @@
-from typing import Sequence, Tuple, NamedTuple
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
 
 import numpy as np
 import scipy.optimize
@@ -33,14 +33,28 @@ class YoungLaplaceFitResult(NamedTuple):
     surface_area: float
 
 
-def young_laplace_fit(data: Tuple[np.ndarray, np.ndarray], verbose: bool = False):
+def young_laplace_fit(
+        data: Tuple[np.ndarray, np.ndarray],
+        verbose: bool = False,
+        *,
+        callback: Optional[Callable[[], Any]] = None,
+):
+    """Fit a Young-Laplace profile to `data`.
+
+    If given, `callback` is called before every evaluation of the model during the optimization, it may raise an
+    exception to abort the fit.
+    """
     model = YoungLaplaceModel(data)
 
     def fun(params: Sequence[float], model: YoungLaplaceModel) -> np.ndarray:
+        if callback is not None:
+            callback()
         model.set_params(params)
         return model.residuals
 
     def jac(params: Sequence[float], model: YoungLaplaceModel) -> np.ndarray:
+        if callback is not None:
+            callback()
         model.set_params(params)
         return model.jac
     
@@ -0,0 +1,193 @@
+"""Measure how long the application takes to show the main menu, run with `python -m opendrop benchmark-startup`.
+
+The application is launched a few times in new processes, each of which quits as soon as its first window has been
+drawn. One more launch with `python -X importtime` gives a breakdown of the time spent importing modules.
+
+This module must not import GTK (directly or indirectly) outside of the launched processes, so that it does not add to
+the imports being measured.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+
+# The main menu should appear within this many seconds of launching.
+STARTUP_BUDGET = 1.0
+
+# Environment variable that tells a launched application to report when its first window is drawn, and quit.
+ENV_VAR = 'OPENDROP_STARTUP_BENCHMARK'
+
+_FIRST_WINDOW_MARK = 'opendrop-first-window'
+
+_LAUNCH_TIMEOUT = 60
+
+
+ImportTime = NamedTuple('ImportTime', [
+    ('name', str),
+    ('depth', int),
+    ('self_us', int),
+    ('cumulative_us', int),
+])
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m opendrop benchmark-startup',
+        description="Measure the time taken to show the main menu.",
+    )
+    parser.add_argument(
+        '-n', '--runs',
+        type=int,
+        default=5,
+        help="Number of launches to time (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--budget',
+        type=float,
+        default=STARTUP_BUDGET,
+        help="Fail if the median time to show the main menu is longer than this many seconds "
+             "(default: %(default)s).",
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=15,
+        help="Number of imports to list in the breakdown (default: %(default)s).",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    try:
+        times = []
+        for i in range(args.runs):
+            t = _time_first_window()
+            times.append(t)
+            print("Run {}: {:.3f} s".format(i + 1, t))
+
+        _, import_output = _launch('-X', 'importtime')
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    median = statistics.median(times)
+    print("Main menu shown in {:.3f} s (median), {:.3f} s (best)".format(median, min(times)))
+    print()
+
+    _print_import_breakdown(_parse_import_times(import_output), args.top)
+
+    if median > args.budget:
+        print(file=sys.stderr)
+        print("Startup is over budget ({:.3f} s > {:.3f} s)".format(median, args.budget), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def report_first_window(app) -> None:
+    """Called by a launched application (`app` is the Gtk.Application) before it runs. Print the time at which its
+    first window is drawn, then quit."""
+    from gi.repository import GLib
+
+    def window_added(_app, window) -> None:
+        app.disconnect(window_added_id)
+        window.connect_after('draw', window_drawn)
+
+    def window_drawn(*_) -> bool:
+        # Only report the first frame.
+        if not reported:
+            reported.append(True)
+            print(_FIRST_WINDOW_MARK, repr(time.time()), flush=True)
+            GLib.idle_add(app.quit)
+        return False
+
+    reported = []
+    window_added_id = app.connect('window-added', window_added)
+
+
+def _time_first_window() -> float:
+    start = time.time()
+    first_window, _ = _launch()
+    return first_window - start
+
+
+def _launch(*python_args: str) -> Tuple[float, str]:
+    env = dict(os.environ)
+    env[ENV_VAR] = '1'
+
+    try:
+        proc = subprocess.run(
+            [sys.executable, *python_args, '-m', 'opendrop'],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=_LAUNCH_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("Application did not show a window within {} s".format(_LAUNCH_TIMEOUT))
+
+    for line in proc.stdout.splitlines():
+        if line.startswith(_FIRST_WINDOW_MARK):
+            return float(line.split()[1]), proc.stderr
+
+    raise RuntimeError(
+        "Application exited with code {} without showing a window:\n{}"
+        .format(proc.returncode, proc.stderr.strip())
+    )
+
+
+def _parse_import_times(output: str) -> List[ImportTime]:
+    # Lines look like "import time:       123 |        456 |   package.module", where the module name is indented
+    # by two spaces for each level of nesting.
+    import_times = []
+
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            self_us = int(self_us)
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            # Header line.
+            continue
+
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+
+        import_times.append(ImportTime(name.strip(), depth, self_us, cumulative_us))
+
+    return import_times
+
+
+def _print_import_breakdown(import_times: Sequence[ImportTime], top: int) -> None:
+    total_us = sum(t.cumulative_us for t in import_times if t.depth == 0)
+    print("Imports took {:.3f} s".format(total_us * 1e-6))
+    print()
+
+    print("Slowest top-level imports (including their own imports):")
+    _print_import_times(
+        sorted((t for t in import_times if t.depth == 0), key=lambda t: t.cumulative_us, reverse=True)[:top],
+        lambda t: t.cumulative_us,
+    )
+    print()
+
+    print("Slowest modules (excluding their own imports):")
+    _print_import_times(
+        sorted(import_times, key=lambda t: t.self_us, reverse=True)[:top],
+        lambda t: t.self_us,
+    )
+
+
+def _print_import_times(import_times: Sequence[ImportTime], key: Callable[[ImportTime], int]) -> None:
+    for t in import_times:
+        print("  {:8.1f} ms  {}".format(key(t) * 1e-3, t.name))
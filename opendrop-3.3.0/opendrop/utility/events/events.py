@@ -43,7 +43,7 @@ class EventConnection:
         DISCONNECTED = 1
 
     _handler = None  # type: Optional[Union[Callable[[], Callable], Callable]]
-    __invocation_count = 0
+    _invocation_count = 0
 
     # Callback for when the connection disconnects. For internal use.
     _on_disconnected = None  # type: Optional[Callable[[], Any]]
@@ -52,23 +52,24 @@ class EventConnection:
                  ignore_args: bool = False, weak_ref: bool = True, once: bool = False):
         self.status = EventConnection.Status.CONNECTED
         self.event = event
-        self._opts = dict(
-            ignore_args=ignore_args,
-            weak_ref=weak_ref,
-            once=once
-        )
+
+        # Plain attributes instead of a dict of options, these are read every time the event fires.
+        self._ignore_args = ignore_args
+        self._weak_ref = weak_ref
+        self._once = once
+
         self.handler = handler
 
     @property
     def handler(self) -> Callable:
-        if self._opts['weak_ref']:
+        if self._weak_ref:
             return self._handler()
         else:
             return self._handler
 
     @handler.setter
     def handler(self, value: Callable) -> None:
-        if self._opts['weak_ref']:
+        if self._weak_ref:
             if isinstance(value, types.MethodType):
                 wref = weakref.WeakMethod(value)
             else:
@@ -93,28 +94,21 @@ class EventConnection:
     def _invoke_handler(self, args: Iterable, kwargs: Mapping) -> None:
         if self.status is not EventConnection.Status.CONNECTED: return
 
-        if self.handler is None:
+        handler = self._handler() if self._weak_ref else self._handler
+        if handler is None:
             # Handler has been garbage collected, disconnect.
             self.disconnect()
             return
 
-        if self._opts['ignore_args']:
-            args, kwargs = (), {}
-
         self._invocation_count += 1
-        self.handler(*args, **kwargs)
-
-    @property
-    def _invocation_count(self) -> int:
-        return self.__invocation_count
-
-    @_invocation_count.setter
-    def _invocation_count(self, value: int) -> None:
-        self.__invocation_count = value
-
-        if self._opts['once'] and self._invocation_count > 0:
+        if self._once:
             self.disconnect()
 
+        if self._ignore_args:
+            handler()
+        else:
+            handler(*args, **kwargs)
+
     # Public read-only property
     @property
     def invocation_count(self) -> int:
@@ -124,6 +118,11 @@ class EventConnection:
 class Event:
     def __init__(self):
         self.__connections = []  # type: List[EventConnection]
+        # Immutable copy of the connections to iterate through when firing, only made again after connections change.
+        self.__snapshot = ()  # type: Tuple[EventConnection, ...]
+
+        self.__fire_soon_handle = None  # type: Optional[asyncio.Handle]
+        self.__fire_soon_args = ((), {})  # type: Tuple[Sequence[Any], Mapping[str, Any]]
 
     def connect(self, handler: Callable, **opts) -> EventConnection:
         """
@@ -199,7 +198,31 @@ class Event:
         :return:
             None
         """
-        self.fire_with_opts(args, kwargs)
+        # Inlined _invoke_connections(), this is called a lot.
+        for conn in self.__snapshot:
+            conn._invoke_handler(args, kwargs)
+
+    def fire_soon(self, *args, loop: Optional[asyncio.AbstractEventLoop] = None, **kwargs) -> None:
+        """Fire the event in the next iteration of `loop` (defaults to the current event loop). Calls made before
+        then are coalesced into a single fire, with the arguments of the latest call.
+
+        :return:
+            None
+        """
+        self.__fire_soon_args = (args, kwargs)
+
+        if self.__fire_soon_handle is not None:
+            return
+
+        loop = loop if loop is not None else asyncio.get_event_loop()
+        self.__fire_soon_handle = loop.call_soon(self.__fire_soon_callback)
+
+    def __fire_soon_callback(self) -> None:
+        args, kwargs = self.__fire_soon_args
+        self.__fire_soon_handle = None
+        self.__fire_soon_args = ((), {})
+
+        self._invoke_connections(args, kwargs)
 
     def is_func_connected(self, func: Callable) -> bool:
         """Return True if `func` is connected."""
@@ -211,10 +234,12 @@ class Event:
     def _add_connection(self, conn: EventConnection) -> None:
         assert conn not in self._connections
         self.__connections.append(conn)
+        self.__snapshot = tuple(self.__connections)
 
     def _remove_connection(self, conn: EventConnection) -> None:
         assert conn.status is not EventConnection.Status.CONNECTED
         self.__connections.remove(conn)
+        self.__snapshot = tuple(self.__connections)
 
     def _find_connection_by_func(self, func: Callable) -> Optional[EventConnection]:
         """Return an `EventConnection` object with handler equal (equality is tested using the `==` operator) to
@@ -239,19 +264,19 @@ class Event:
         access to the list of current connections. There is no guarantee that all connections in the tuple returned
         will always be connected during the tuple's lifetime, as it is after all only an immutable copy.
         """
-        return tuple(self.__connections)
+        return self.__snapshot
 
     @property
     def num_connections(self) -> int:
         """The number of connections this event has."""
-        return len(self._connections)
+        return len(self.__connections)
 
     def _invoke_connections(self, args: Iterable, kwargs: Mapping[str, Any],
                             block: Sequence[EventConnection] = tuple()) -> None:
-        for conn in self._connections:
-            # Ignore if connection has disconnected, this may have occurred during execution of some handlers.
-            if conn.status is not EventConnection.Status.CONNECTED: continue
-            if conn in block: continue
+        for conn in self.__snapshot:
+            if block and conn in block: continue
+            # Connections that have disconnected, possibly during execution of some handlers, are ignored by
+            # _invoke_handler().
             conn._invoke_handler(args, kwargs)
 
     def wait(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Any:
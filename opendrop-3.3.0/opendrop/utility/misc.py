@@ -33,7 +33,7 @@ import pkgutil
 import shutil
 from pathlib import Path
 from types import ModuleType
-from typing import Union, Type, List, Iterable, TypeVar
+from typing import Union, Type, List, Iterable, Optional, Sequence, TypeVar
 
 import numpy as np
 
@@ -91,6 +91,21 @@ def clamp(x: float, lower: float, upper: float) -> float:
     return max(min(x, upper), lower)
 
 
+def appended_items(old: Sequence[T], new: Sequence[T]) -> Optional[Sequence[T]]:
+    """If `new` is `old` with zero or more items appended, return the appended items, otherwise return None.
+
+    Lets a consumer of a sequence that usually only grows (e.g. analyses being added as frames are captured) handle
+    the new items alone instead of comparing the whole sequence.
+    """
+    if len(new) < len(old):
+        return None
+
+    if tuple(new[:len(old)]) != tuple(old):
+        return None
+
+    return tuple(new[len(old):])
+
+
 def clear_directory_contents(path: Path) -> None:
     if not path.is_dir():
         return
@@ -1,5 +1,6 @@
+import math
 import sys
-from typing import Optional
+from typing import Callable, List, MutableMapping, Optional, Set, Tuple
 
 import cairo
 import cv2
@@ -15,38 +16,102 @@ __all__ = ('ImageArtist',)
 
 
 class ImageArtist(Artist):
+    """Draws an image scaled to `extents`.
+
+    Images are not converted to a cairo surface up front. When drawn, a mipmap level close to the on-screen
+    resolution is picked (levels are built on demand, once per image), and only the tiles of it that are visible are
+    converted and uploaded, so large images drawn zoomed out or mostly scrolled out of view stay cheap to update.
+    """
+
+    # Side length of tiles in pixels of the mipmap level they belong to.
+    TILE_SIZE = 512
+
     _extents: Optional[Rect2[float]] = None
 
     _window: Optional[Gdk.Window] = None
-    _surface: Optional[cairo.ImageSurface] = None
-    _surface_for_current_window: bool = False
     _last_drawn_region: Optional[cairo.Region] = None
 
+    # Mipmap levels of the current image, level 0 is the image itself and each level is half the size of the previous
+    # one.
+    _levels: Optional[List[np.ndarray]] = None
+    _to_pixels: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    _format: Optional[cairo.Format] = None
+
+    def __init__(self, **properties) -> None:
+        # Tile surfaces by (level, column, row). Stale tiles still hold a previous image of the same size, and are
+        # overwritten instead of reallocated when next drawn.
+        self._tiles = {}  # type: MutableMapping[Tuple[int, int, int], cairo.ImageSurface]
+        self._stale_tiles = set()  # type: Set[Tuple[int, int, int]]
+
+        super().__init__(**properties)
+
     def map(self, window: Gdk.Window) -> None:
         self._window = window
-        self._surface_for_current_window = False
+        self._clear_tiles()
 
     def unmap(self) -> None:
         self._window = None
-        self._surface_for_current_window = False
+        self._clear_tiles()
 
     def draw(self, cr: cairo.Context) -> None:
-        if self._extents is None or self._surface is None:
+        if self._extents is None or self._levels is None:
             return
-        
+
         extents = self._extents
-        surface = self._surface
+        height, width = self._levels[0].shape[:2]
+
+        if extents.w <= 0 or extents.h <= 0 or width == 0 or height == 0:
+            return
+
+        # Size of an image pixel on the device, in device pixels.
+        matrix = cr.get_matrix()
+        device_scale = cr.get_target().get_device_scale()
+        pixel_size = min(
+            math.hypot(matrix.xx, matrix.yx) * device_scale[0] * extents.w/width,
+            math.hypot(matrix.xy, matrix.yy) * device_scale[1] * extents.h/height,
+        )
+        if pixel_size <= 0:
+            return
+
+        # Smallest level with at least one pixel per device pixel.
+        level = max(0, math.floor(-math.log2(pixel_size)))
+        level = min(level, int(math.log2(min(width, height))))
+        level_height, level_width = self._get_level(level).shape[:2]
 
-        matrix = cairo.Matrix()
-        matrix.scale(surface.get_width()/extents.w, surface.get_height()/extents.h)
-        matrix.translate(-extents.x, -extents.y)
+        # Visible part of the image, in pixels of the level.
+        clip_x0, clip_y0, clip_x1, clip_y1 = cr.clip_extents()
+        x0 = max(math.floor((clip_x0 - extents.x) * level_width/extents.w), 0)
+        y0 = max(math.floor((clip_y0 - extents.y) * level_height/extents.h), 0)
+        x1 = min(math.ceil((clip_x1 - extents.x) * level_width/extents.w), level_width)
+        y1 = min(math.ceil((clip_y1 - extents.y) * level_height/extents.h), level_height)
 
-        pattern = cairo.SurfacePattern(surface)
-        pattern.set_filter(cairo.Filter.FAST)
-        pattern.set_matrix(matrix)
+        # Without antialiasing, tiles are filled edge to edge without seams.
+        cr.set_antialias(cairo.Antialias.NONE)
 
-        cr.set_source(pattern)
-        cr.paint()
+        tile_size = self.TILE_SIZE
+        for row in range(y0 // tile_size, (y1 - 1) // tile_size + 1):
+            for column in range(x0 // tile_size, (x1 - 1) // tile_size + 1):
+                surface = self._get_tile(level, column, row)
+
+                matrix = cairo.Matrix(
+                    xx=level_width/extents.w,
+                    yy=level_height/extents.h,
+                    x0=-extents.x * level_width/extents.w - column*tile_size,
+                    y0=-extents.y * level_height/extents.h - row*tile_size,
+                )
+
+                pattern = cairo.SurfacePattern(surface)
+                pattern.set_filter(cairo.Filter.FAST)
+                pattern.set_matrix(matrix)
+
+                cr.set_source(pattern)
+                cr.rectangle(
+                    extents.x + column*tile_size * extents.w/level_width,
+                    extents.y + row*tile_size * extents.h/level_height,
+                    surface.get_width() * extents.w/level_width,
+                    surface.get_height() * extents.h/level_height,
+                )
+                cr.fill()
 
         self._last_drawn_region = cairo.Region(cairo.RectangleInt(
             int(extents.x - 1),
@@ -55,61 +120,107 @@ class ImageArtist(Artist):
             int(extents.h + 2)
         ))
 
+    def _get_level(self, level: int) -> np.ndarray:
+        levels = self._levels
+
+        while len(levels) <= level:
+            prev = levels[-1]
+            size = ((prev.shape[1] + 1)//2, (prev.shape[0] + 1)//2)
+
+            if prev.dtype == np.uint32:
+                # Premultiplied 32-bit pixels, average each byte.
+                prev = prev.view(np.uint8).reshape(*prev.shape, 4)
+                levels.append(cv2.resize(prev, size, interpolation=cv2.INTER_AREA).view(np.uint32)[..., 0])
+            else:
+                levels.append(cv2.resize(prev, size, interpolation=cv2.INTER_AREA))
+
+        return levels[level]
+
+    def _get_tile(self, level: int, column: int, row: int) -> cairo.ImageSurface:
+        key = (level, column, row)
+
+        surface = self._tiles.get(key)
+        if surface is not None and key not in self._stale_tiles:
+            return surface
+
+        tile_size = self.TILE_SIZE
+        tile = self._get_level(level)[row*tile_size:(row + 1)*tile_size, column*tile_size:(column + 1)*tile_size]
+        # May be a strided view, it is copied into the surface row by row.
+        data = self._to_pixels(tile)
+        height, width = data.shape
+
+        if surface is None:
+            if self._window is not None:
+                surface = Gdk.Window.create_similar_image_surface(self._window, self._format, width, height, scale=1)
+            else:
+                surface = cairo.ImageSurface(self._format, width, height)
+
+        surface.flush()
+        np.ndarray(
+            (height, width),
+            np.uint32,
+            buffer=surface.get_data(),
+            strides=(surface.get_stride(), 4),
+        )[:] = data
+        surface.mark_dirty()
+
+        self._tiles[key] = surface
+        self._stale_tiles.discard(key)
+
+        return surface
+
+    def _clear_tiles(self) -> None:
+        self._tiles = {}
+        self._stale_tiles = set()
+
     def set_array(self, arr: np.ndarray) -> None:
         """If arr is a 2D array, it is interpreted as a grayscale image. If arr is a 3D array, it is
-        interpreted as an RGB (if last axis has length 3) or RGBA (if last axis has length 4).
+        interpreted as an RGB (if last axis has length 3) or RGBA (if last axis has length 4). 16-bit arrays are
+        displayed at 8-bit.
         """
         if len(arr.shape) == 2:
-            data = cv2.cvtColor(arr, cv2.COLOR_GRAY2BGRA).view(np.uint32)
-            if sys.byteorder == 'big':
-                data.byteswap(inplace=True)
+            to_pixels = _gray_to_pixels
         elif len(arr.shape) == 3:
             if arr.shape[2] == 3:
-                data = cv2.cvtColor(arr, cv2.COLOR_RGB2BGRA).view(np.uint32)
-                if sys.byteorder == 'big':
-                    data.byteswap(inplace=True)
+                to_pixels = _rgb_to_pixels
             elif arr.shape[2] == 4:
-                data = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGRA).view(np.uint32)
-                if sys.byteorder == 'big':
-                    data.byteswap(inplace=True)
+                to_pixels = _rgba_to_pixels
             else:
                 raise ValueError(f"Unrecognized array shape, got {arr.shape}")
         else:
             raise ValueError(f"Array must be two or three-dimensional, got shape {arr.shape}")
 
-        width = data.shape[1]
-        height = data.shape[0]
-        self.set_data(data, cairo.Format.ARGB32, width, height)
+        if arr.dtype == np.uint16:
+            to_pixels = _from_uint16(to_pixels)
+
+        self._set_image(arr, to_pixels, cairo.Format.ARGB32)
 
     def set_data(self, data: memoryview, fmt: cairo.Format, width: int, height: int):
-        if self._surface is not None and \
-                self._surface_for_current_window \
-                and self._surface.get_format() == fmt \
-                and self._surface.get_width() == width \
-                and self._surface.get_height() == height:
-            surface = self._surface
-        elif self._window is not None:
-            surface = Gdk.Window.create_similar_image_surface(
-                self._window,
-                fmt,
-                width,
-                height,
-                scale=1,
-            )
-            self._surface_for_current_window = True
+        """Set the image to 32-bit pixel data in the native byte order of cairo, `fmt` must be ARGB32 or RGB24. The
+        data is not copied, so should not be modified afterwards."""
+        if fmt not in (cairo.Format.ARGB32, cairo.Format.RGB24):
+            raise ValueError(f"Unsupported format, got {fmt}")
+
+        arr = np.frombuffer(memoryview(data).cast('B'), np.uint32).reshape(height, width)
+        # Already in the pixel format of the surfaces, tiles are copied straight from the data.
+        self._set_image(arr, _identity, fmt)
+
+    def _set_image(self, arr: np.ndarray, to_pixels: Callable[[np.ndarray], np.ndarray], fmt: cairo.Format) -> None:
+        if self._levels is not None and self._levels[0].shape[:2] == arr.shape[:2] and self._format == fmt:
+            self._stale_tiles = set(self._tiles)
         else:
-            surface = cairo.ImageSurface(fmt, width, height)
-            self._surface_for_current_window = False
+            self._clear_tiles()
 
-        surface.flush()
-        surface.get_data()[:] = memoryview(data).cast('B')
-        surface.mark_dirty()
+        self._levels = [arr]
+        self._to_pixels = to_pixels
+        self._format = fmt
 
-        self._surface = surface
         self.invalidate(self._last_drawn_region)
 
     def clear_data(self) -> None:
-        self._surface = None
+        self._levels = None
+        self._to_pixels = None
+        self._clear_tiles()
         self.invalidate(self._last_drawn_region)
 
     @GObject.Property
@@ -136,3 +247,33 @@ class ImageArtist(Artist):
 
         if inv_region is not None:
             self.invalidate(inv_region)
+
+
+def _identity(arr: np.ndarray) -> np.ndarray:
+    return arr
+
+
+def _native_pixels(bgra: np.ndarray) -> np.ndarray:
+    data = bgra.view(np.uint32)[..., 0]
+    if sys.byteorder == 'big':
+        data.byteswap(inplace=True)
+    return data
+
+
+def _gray_to_pixels(arr: np.ndarray) -> np.ndarray:
+    return _native_pixels(cv2.cvtColor(arr, cv2.COLOR_GRAY2BGRA))
+
+
+def _rgb_to_pixels(arr: np.ndarray) -> np.ndarray:
+    return _native_pixels(cv2.cvtColor(arr, cv2.COLOR_RGB2BGRA))
+
+
+def _rgba_to_pixels(arr: np.ndarray) -> np.ndarray:
+    return _native_pixels(cv2.cvtColor(arr, cv2.COLOR_RGBA2BGRA))
+
+
+def _from_uint16(to_pixels: Callable[[np.ndarray], np.ndarray]) -> Callable[[np.ndarray], np.ndarray]:
+    def from_uint16(arr: np.ndarray) -> np.ndarray:
+        arr = np.right_shift(arr, 8, out=np.empty(arr.shape, np.uint8), casting='unsafe')
+        return to_pixels(arr)
+    return from_uint16
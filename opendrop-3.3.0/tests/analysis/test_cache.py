@@ -0,0 +1,195 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from opendrop.analysis import cache as cache_module
+from opendrop.analysis.cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path))
+
+
+@pytest.fixture
+def image():
+    return np.arange(100, dtype=np.uint8).reshape(10, 10)
+
+
+def entry_paths(cache: ResultCache):
+    return sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(cache.directory)
+        for name in names
+        if name.endswith('.pickle')
+    )
+
+
+def test_key_same_for_same_input(cache, image):
+    assert cache.key('pendant', image, 1, 2.0) == cache.key('pendant', image.copy(), 1, 2.0)
+
+
+def test_key_depends_on_kind(cache, image):
+    assert cache.key('pendant', image) != cache.key('conan', image)
+
+
+def test_key_depends_on_params(cache, image):
+    assert cache.key('pendant', image, 80.0, 160.0) != cache.key('pendant', image, 80.0, 161.0)
+    assert cache.key('pendant', image, None) != cache.key('pendant', image, (0, 0, 10, 10))
+
+
+def test_key_depends_on_image_content(cache, image):
+    other = image.copy()
+    other[0, 0] += 1
+
+    assert cache.key('pendant', image) != cache.key('pendant', other)
+
+
+def test_key_depends_on_dtype(cache, image):
+    # Same bytes, different interpretation.
+    assert cache.key('pendant', image) != cache.key('pendant', image.view(np.int8))
+
+
+def test_key_depends_on_shape(cache, image):
+    assert cache.key('pendant', image) != cache.key('pendant', image.reshape(20, 5))
+
+
+def test_key_depends_on_version(cache, image, monkeypatch):
+    key = cache.key('pendant', image)
+
+    monkeypatch.setattr(cache_module, '__version__', 'another version')
+
+    assert cache.key('pendant', image) != key
+
+
+def test_key_of_non_contiguous_image(cache, image):
+    assert cache.key('pendant', image[:, ::2]) == cache.key('pendant', image[:, ::2].copy())
+
+
+def test_round_trip(cache, image):
+    key = cache.key('pendant', image)
+    value = (np.array([[1.0, 2.0], [3.0, 4.0]]), 12.5, None)
+
+    cache.put(key, value)
+    cached = cache.get(key)
+
+    np.testing.assert_array_equal(cached[0], value[0])
+    assert cached[1:] == value[1:]
+
+
+def test_miss(cache, image):
+    assert cache.get(cache.key('pendant', image)) is None
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'not a pickle',
+    pickle.dumps(list(range(1000)))[:100],
+])
+def test_corrupt_entry_is_miss(cache, image, data):
+    key = cache.key('pendant', image)
+    cache.put(key, 'value')
+
+    path, = entry_paths(cache)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    assert cache.get(key) is None
+
+
+def test_put_leaves_no_temporary_files(cache, image):
+    cache.put(cache.key('pendant', image), 'value')
+
+    names = [name for _, _, names in os.walk(cache.directory) for name in names]
+
+    assert not any(name.endswith('.tmp') for name in names)
+
+
+def test_disabled(tmp_path, image):
+    cache = ResultCache(str(tmp_path), enabled=False)
+    key = cache.key('pendant', image)
+
+    cache.put(key, 'value')
+
+    assert cache.get(key) is None
+    assert entry_paths(cache) == []
+
+
+def test_prune_least_recently_used(tmp_path, image):
+    cache = ResultCache(str(tmp_path), max_entries=5)
+    cache.PRUNE_INTERVAL = 1e9
+
+    keys = [cache.key('pendant', image, i) for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, i)
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+    # A hit marks the entry as recently used.
+    assert cache.get(keys[0]) == 0
+
+    cache.prune()
+
+    remaining = [i for i, key in enumerate(keys) if os.path.exists(cache._path(key))]
+    assert remaining == [0, 7, 8, 9]
+
+
+def test_prune_by_size(tmp_path, image):
+    cache = ResultCache(str(tmp_path), max_bytes=10000)
+    cache.PRUNE_INTERVAL = 1e9
+
+    for i in range(10):
+        cache.put(cache.key('pendant', image, i), bytes(2000))
+
+    cache.prune()
+
+    assert sum(os.path.getsize(path) for path in entry_paths(cache)) <= 10000
+
+
+def test_put_prunes_at_most_every_interval(tmp_path, image):
+    cache = ResultCache(str(tmp_path), max_entries=2)
+
+    # Only the first put checks the size, when there is nothing to prune yet.
+    for i in range(5):
+        cache.put(cache.key('pendant', image, i), i)
+    assert len(entry_paths(cache)) == 5
+
+    cache.PRUNE_INTERVAL = 0
+    cache.put(cache.key('pendant', image, 5), 5)
+    assert len(entry_paths(cache)) <= 2
+
+
+def test_prune_empty_cache(cache):
+    os.makedirs(cache.directory, exist_ok=True)
+    cache.prune()
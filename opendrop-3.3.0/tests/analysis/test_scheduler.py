@@ -0,0 +1,261 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from opendrop.analysis import scheduler
+from opendrop.analysis.scheduler import TaskPriority, TaskScheduler
+
+
+class StubExecutor:
+    """Stands in for the process pool, tasks are only run when the test says so."""
+
+    def __init__(self, max_workers: int, **_) -> None:
+        self.max_workers = max_workers
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        cfut = concurrent.futures.Future()
+        self.submitted.append((fn, args, kwargs, cfut))
+        return cfut
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+def task(name, **_):
+    return name
+
+
+async def finish(executor: StubExecutor, index: int = 0) -> None:
+    fn, args, kwargs, cfut = executor.submitted.pop(index)
+    cfut.set_result(fn(*args, **kwargs))
+
+    # Let the scheduler handle the result and dispatch queued tasks.
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+def submitted_names(executor: StubExecutor):
+    return [args[0] for _, args, _, _ in executor.submitted]
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch, event_loop):
+    monkeypatch.setattr(scheduler, 'ProcessPoolExecutor', StubExecutor)
+    schedulers = []
+
+    def make_scheduler(max_workers: int) -> TaskScheduler:
+        s = TaskScheduler(max_workers, loop=event_loop)
+        schedulers.append(s)
+        return s
+
+    yield make_scheduler
+
+    for s in schedulers:
+        s.destroy()
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_task(make_scheduler):
+    s = make_scheduler(1)
+
+    fut = s.submit(task, 'a')
+    await finish(s._executor)
+
+    assert fut.result() == 'a'
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit(make_scheduler):
+    s = make_scheduler(2)
+
+    futs = [s.submit(task, i) for i in range(5)]
+    assert submitted_names(s._executor) == [0, 1]
+
+    await finish(s._executor)
+    assert submitted_names(s._executor) == [1, 2]
+
+    await finish(s._executor)
+    await finish(s._executor)
+    await finish(s._executor)
+    assert submitted_names(s._executor) == [4]
+
+    await finish(s._executor)
+    assert [fut.result() for fut in futs] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_priority_order(make_scheduler):
+    s = make_scheduler(1)
+
+    s.submit(task, 'running')
+    s.submit(task, 'preview0', priority=TaskPriority.PREVIEW)
+    s.submit(task, 'analysis0', priority=TaskPriority.ANALYSIS)
+    s.submit(task, 'preview1', priority=TaskPriority.PREVIEW)
+    s.submit(task, 'analysis1', priority=TaskPriority.ANALYSIS)
+
+    order = []
+    while s._executor.submitted:
+        order.extend(submitted_names(s._executor))
+        await finish(s._executor)
+
+    # Higher priority first, then in submission order.
+    assert order == ['running', 'analysis0', 'analysis1', 'preview0', 'preview1']
+
+
+@pytest.mark.asyncio
+async def test_coalesce_same_key(make_scheduler):
+    s = make_scheduler(1)
+
+    s.submit(task, 'running')
+    fut0 = s.submit(task, 'first', key='source')
+    fut1 = s.submit(task, 'second', key='source')
+    fut2 = s.submit(task, 'other', key='other source')
+
+    # Superseded before it started.
+    assert fut0.cancelled()
+
+    await finish(s._executor)
+    assert submitted_names(s._executor) == ['second']
+    await finish(s._executor)
+    assert submitted_names(s._executor) == ['other']
+    await finish(s._executor)
+
+    assert fut1.result() == 'second'
+    assert fut2.result() == 'other'
+
+
+@pytest.mark.asyncio
+async def test_same_key_does_not_replace_started_task(make_scheduler):
+    s = make_scheduler(2)
+
+    fut0 = s.submit(task, 'first', key='source')
+    fut1 = s.submit(task, 'second', key='source')
+
+    assert not fut0.cancelled()
+    assert submitted_names(s._executor) == ['first', 'second']
+
+    await finish(s._executor)
+    await finish(s._executor)
+
+    assert fut0.result() == 'first'
+    assert fut1.result() == 'second'
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_task(make_scheduler):
+    s = make_scheduler(1)
+
+    s.submit(task, 'running')
+    fut = s.submit(task, 'cancelled')
+    fut.cancel()
+    await asyncio.sleep(0)
+
+    await finish(s._executor)
+
+    # Never reached a worker.
+    assert s._executor.submitted == []
+    assert not s._queue
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_tasks_are_purged(make_scheduler):
+    s = make_scheduler(1)
+
+    s.submit(task, 'running')
+    futs = [s.submit(task, i, data=bytes(1000)) for i in range(10)]
+
+    for fut in futs[:4]:
+        fut.cancel()
+    await asyncio.sleep(0)
+
+    # Arguments of cancelled tasks are dropped straight away, but the entries stay queued until there are many.
+    assert len(s._queue) == 10
+    assert all(not entry.kwargs for _, _, entry in s._queue if entry.future.cancelled())
+
+    for fut in futs[4:6]:
+        fut.cancel()
+    await asyncio.sleep(0)
+
+    # More than half of the queue was cancelled.
+    assert len(s._queue) == 4
+    assert not any(entry.future.cancelled() for _, _, entry in s._queue)
+
+    order = []
+    while s._executor.submitted:
+        order.extend(submitted_names(s._executor))
+        await finish(s._executor)
+
+    assert order == ['running', 6, 7, 8, 9]
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_cancellable_task(make_scheduler):
+    s = make_scheduler(1)
+
+    fut = s.submit(task, 'running', cancellable=True)
+    _, _, kwargs, _ = s._executor.submitted[0]
+    token = kwargs['cancel']
+
+    assert s._cancel_flags.array[token.slot] == 0
+
+    fut.cancel()
+    await asyncio.sleep(0)
+
+    assert s._cancel_flags.array[token.slot] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_frees_its_worker_when_done(make_scheduler):
+    s = make_scheduler(1)
+
+    fut = s.submit(task, 'running')
+    s.submit(task, 'queued')
+    fut.cancel()
+    await asyncio.sleep(0)
+
+    # Still running in the worker, so the queued task has to wait.
+    assert submitted_names(s._executor) == ['running']
+
+    await finish(s._executor)
+    assert submitted_names(s._executor) == ['queued']
+
+
+@pytest.mark.asyncio
+async def test_submit_after_destroy(make_scheduler):
+    s = make_scheduler(1)
+    s.destroy()
+
+    with pytest.raises(RuntimeError):
+        s.submit(task, 'a')
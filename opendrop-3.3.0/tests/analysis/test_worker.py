@@ -0,0 +1,111 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import asyncio
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from opendrop.analysis.worker import CancelFlags, StatusListener, TaskCancelled, worker_executor_kwargs
+
+
+def check_token(token):
+    token.check()
+    return token.cancelled()
+
+
+@pytest.fixture
+def flags():
+    return CancelFlags(2)
+
+
+@pytest.fixture
+def executor(flags):
+    listener = StatusListener(loop=asyncio.new_event_loop())
+    executor = ProcessPoolExecutor(max_workers=1, **worker_executor_kwargs(listener, flags))
+    yield executor
+    executor.shutdown()
+    listener.close()
+
+
+def test_token_survives_pickling(flags):
+    token = flags.acquire()
+
+    assert pickle.loads(pickle.dumps(token)).slot == token.slot
+
+
+def test_token_not_cancelled(flags, executor):
+    token = flags.acquire()
+
+    assert executor.submit(check_token, token).result() is False
+
+
+def test_cancelled_token_raises_at_check(flags, executor):
+    token = flags.acquire()
+    flags.cancel(token)
+
+    with pytest.raises(TaskCancelled):
+        executor.submit(check_token, token).result()
+
+
+def test_cancel_only_affects_own_token(flags, executor):
+    token0 = flags.acquire()
+    token1 = flags.acquire()
+    flags.cancel(token0)
+
+    assert executor.submit(check_token, token1).result() is False
+
+
+def test_released_slot_is_reset(flags, executor):
+    token = flags.acquire()
+    flags.cancel(token)
+    flags.release(token)
+
+    token = flags.acquire()
+
+    assert executor.submit(check_token, token).result() is False
+
+
+def test_acquire_more_than_size(flags):
+    flags.acquire()
+    flags.acquire()
+
+    with pytest.raises(RuntimeError):
+        flags.acquire()
+
+
+def test_token_outside_worker_is_never_cancelled(flags):
+    token = flags.acquire()
+    flags.cancel(token)
+
+    # Only worker processes see the flags.
+    assert not token.cancelled()
+    token.check()
@@ -0,0 +1,274 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import queue
+import weakref
+from typing import Optional, Tuple
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.services.acquisition._acquirer.camera import CameraCaptureError
+from opendrop.app.common.services.acquisition._acquirer.capture_thread import CaptureThread, FramePool
+
+
+SHAPE = (3, 4)
+
+
+class FakeCamera:
+    """A grab function that captures the frames given to capture(), each filled with a value."""
+
+    def __init__(self) -> None:
+        self._queue = queue.Queue()
+        # Only ids, so the frames aren't kept alive.
+        self.out_ids = []
+
+    def capture(self, value: int, timestamp: float) -> None:
+        self._queue.put((value, timestamp))
+
+    def fail(self, error: BaseException) -> None:
+        self._queue.put(error)
+
+    def grab(self, out: Optional[np.ndarray]) -> Optional[Tuple[np.ndarray, float]]:
+        try:
+            item = self._queue.get(timeout=0.01)
+        except queue.Empty:
+            return None
+
+        if isinstance(item, BaseException):
+            raise item
+
+        value, timestamp = item
+
+        self.out_ids.append(id(out))
+        if out is None:
+            out = np.empty(SHAPE, np.uint8)
+        out[...] = value
+
+        return out, timestamp
+
+
+@pytest.fixture
+def camera():
+    return FakeCamera()
+
+
+@pytest.fixture
+def thread(camera):
+    thread = CaptureThread(camera.grab, size=4)
+    yield thread
+    thread.stop()
+
+
+def capture(camera: FakeCamera, thread: CaptureThread, *timestamps: float) -> None:
+    """Capture a frame for each timestamp (filled with the timestamp) and wait for the last one."""
+    seq = thread.seq
+    for timestamp in timestamps:
+        camera.capture(int(timestamp), timestamp)
+    thread.wait_newer(seq + len(timestamps) - 1, timeout=5)
+
+
+def test_size_too_small(camera):
+    with pytest.raises(ValueError):
+        CaptureThread(camera.grab, size=1)
+
+
+def test_latest(camera, thread):
+    capture(camera, thread, 1, 2, 3)
+
+    frame, timestamp, seq = thread.latest()
+
+    assert (frame == 3).all()
+    assert timestamp == 3
+    assert seq == thread.seq == 3
+
+
+def test_latest_returns_copy(camera, thread):
+    capture(camera, thread, 1)
+
+    frame, _, _ = thread.latest()
+    frame[...] = 7
+
+    assert (thread.latest()[0] == 1).all()
+
+
+def test_wait_newer(camera, thread):
+    capture(camera, thread, 1)
+
+    camera.capture(2, 2.0)
+    frame, timestamp, seq = thread.wait_newer(1, timeout=5)
+
+    assert (frame == 2).all()
+    assert timestamp == 2.0
+    assert seq == 2
+
+
+def test_frame_at(camera, thread):
+    # Slots 0-2 hold frames 1-3, slot 3 is being written.
+    capture(camera, thread, 1, 2, 3)
+
+    frame, timestamp = thread.frame_at(1.5)
+    assert (frame == 2).all() and timestamp == 2
+
+    # The earliest buffered frame.
+    assert thread.frame_at(0)[1] == 1
+
+    # Nothing captured that late, the latest frame.
+    assert thread.frame_at(10)[1] == 3
+
+
+def test_frame_at_skips_slot_being_written(camera, thread):
+    # Slot 0 holds frame 5, slot 1 (being written) holds frame 2, slots 2 and 3 hold frames 3 and 4.
+    capture(camera, thread, 1, 2, 3, 4, 5)
+
+    frame, timestamp = thread.frame_at(0)
+
+    assert (frame == 3).all()
+    assert timestamp == 3
+
+
+def test_latest_times_out(thread):
+    with pytest.raises(CameraCaptureError):
+        thread.latest(timeout=0.05)
+
+    with pytest.raises(CameraCaptureError):
+        thread.frame_at(0, timeout=0.05)
+
+
+def test_wait_newer_times_out(camera, thread):
+    capture(camera, thread, 1)
+
+    with pytest.raises(CameraCaptureError):
+        thread.wait_newer(1, timeout=0.05)
+
+
+def test_grab_error(camera, thread):
+    capture(camera, thread, 1)
+
+    error = OSError('camera unplugged')
+    camera.fail(error)
+
+    with pytest.raises(CameraCaptureError) as exc_info:
+        thread.wait_newer(1, timeout=5)
+    assert exc_info.value.__cause__ is error
+    assert thread.failed
+
+    # Frames captured before the error are not returned either.
+    with pytest.raises(CameraCaptureError):
+        thread.latest()
+
+
+def test_stopped(camera, thread):
+    capture(camera, thread, 1)
+    thread.stop()
+
+    with pytest.raises(CameraCaptureError):
+        thread.wait_newer(1, timeout=5)
+
+
+def test_frame_pool_recycles_unused_frame():
+    pool = FramePool()
+
+    frame = pool.take(SHAPE, np.uint8)
+    frame_id = id(frame)
+    del frame
+
+    assert id(pool.take(SHAPE, np.uint8)) == frame_id
+
+
+def test_frame_pool_never_recycles_held_frame():
+    pool = FramePool()
+
+    frame = pool.take(SHAPE, np.uint8)
+    assert pool.take(SHAPE, np.uint8) is not frame
+
+    # A view also keeps the frame in use.
+    view = frame[1:]
+    frame_id = id(frame)
+    del frame
+    assert id(pool.take(SHAPE, np.uint8)) != frame_id
+
+    del view
+    assert id(pool.take(SHAPE, np.uint8)) == frame_id
+
+
+def test_frame_pool_replaces_frames_of_other_shape():
+    pool = FramePool()
+
+    pool.take(SHAPE, np.uint8)
+    frame = pool.take((5, 6), np.uint16)
+
+    assert frame.shape == (5, 6) and frame.dtype == np.uint16
+    assert len(pool._frames) == 1
+
+
+def test_frame_pool_max_size():
+    pool = FramePool(max_size=2)
+
+    frames = [pool.take(SHAPE, np.uint8) for _ in range(3)]
+
+    assert len({id(frame) for frame in frames}) == 3
+    assert len(pool._frames) == 2
+
+
+def test_capture_thread_never_overwrites_held_frame(camera):
+    pool = FramePool()
+    thread = CaptureThread(camera.grab, size=2, pool=pool)
+    try:
+        # Hand out frames until the buffer holds frames from the pool.
+        timestamp = 0
+        while True:
+            timestamp += 1
+            capture(camera, thread, timestamp)
+            held, _, _ = thread.latest()
+            if any(frame is held for frame in pool._frames):
+                break
+            del held
+
+        held_ref = weakref.ref(held)
+        assert not held.flags.writeable
+
+        # Go round the ring buffer several times.
+        num_grabs = len(camera.out_ids)
+        capture(camera, thread, *range(timestamp + 1, timestamp + 9))
+
+        assert id(held) not in camera.out_ids[num_grabs:]
+        assert (held == timestamp).all()
+
+        # Once released, the frame is reused. The pool keeps it alive, so its id is not reused by another frame.
+        del held
+        num_grabs = len(camera.out_ids)
+        capture(camera, thread, *range(timestamp + 9, timestamp + 19))
+
+        assert held_ref() is not None
+        assert id(held_ref()) in camera.out_ids[num_grabs:]
+    finally:
+        thread.stop()
@@ -0,0 +1,142 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.services.acquisition import DecodePool, LazyImageSequence
+
+
+class BlockingImageSequence(LazyImageSequence):
+    """Decoding image 0 blocks until `unblock` is set, so later decodes queue up behind it in a one thread pool."""
+
+    def __init__(self, n: int) -> None:
+        self.pool = DecodePool(max_workers=1)
+        super().__init__(prefetch=0, pool=self.pool)
+        self.keys = tuple(range(n))
+        self.unblock = threading.Event()
+        self.decoded = []
+
+    def _decode(self, index: int) -> np.ndarray:
+        if index == 0:
+            self.unblock.wait(5)
+        self.decoded.append(index)
+        return np.full((2, 2), index, np.uint8)
+
+
+@pytest.fixture
+def images():
+    images = BlockingImageSequence(5)
+    yield images
+    images.unblock.set()
+    images.pool.shutdown()
+
+
+async def queue_read(images: BlockingImageSequence, index: int) -> asyncio.Task:
+    task = asyncio.ensure_future(images.read(index))
+    # Let the task start and submit its decode.
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_getitem_does_not_cancel_awaited_decode(images):
+    blocker = await queue_read(images, 0)
+    reader = await queue_read(images, 3)
+
+    # Decoded in this thread while the read of image 3 is still queued.
+    assert (images[3] == 3).all()
+
+    images.unblock.set()
+
+    assert (await reader == 3).all()
+    assert (await blocker == 0).all()
+
+
+@pytest.mark.asyncio
+async def test_discard_does_not_cancel_awaited_decode(images):
+    blocker = await queue_read(images, 0)
+    reader = await queue_read(images, 3)
+
+    images.discard(3)
+    images.unblock.set()
+
+    assert (await reader == 3).all()
+    await blocker
+
+
+@pytest.mark.asyncio
+async def test_discard_cancels_unread_decode(images):
+    blocker = await queue_read(images, 0)
+    images._load(3)
+
+    images.discard(3)
+    images.unblock.set()
+    await blocker
+
+    # Make sure the worker has moved past where image 3 was queued.
+    await images.read(4)
+    assert 3 not in images.decoded
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_reader_keeps_decode_for_others(images):
+    blocker = await queue_read(images, 0)
+    reader1 = await queue_read(images, 3)
+    reader2 = await queue_read(images, 3)
+
+    reader1.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await reader1
+
+    images.unblock.set()
+
+    assert (await reader2 == 3).all()
+    await blocker
+
+
+@pytest.mark.asyncio
+async def test_cancelling_last_reader_cancels_decode(images):
+    blocker = await queue_read(images, 0)
+    reader = await queue_read(images, 3)
+
+    reader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await reader
+
+    images.unblock.set()
+    await blocker
+
+    await images.read(4)
+    assert 3 not in images.decoded
@@ -0,0 +1,229 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.image_processing.plugins.preview import FeaturesCache, ImageSequenceAcquirerController
+from opendrop.app.common.services.acquisition import LazyImageSequence
+from opendrop.utility.bindable import VariableBindable
+
+
+def finished_future(result) -> asyncio.Future:
+    fut = asyncio.get_event_loop().create_future()
+    fut.set_result(result)
+    return fut
+
+
+async def run_callbacks() -> None:
+    # Done callbacks of futures are scheduled with call_soon().
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_features_cache_max_entries():
+    cache = FeaturesCache(max_entries=3)
+    futs = [asyncio.get_event_loop().create_future() for _ in range(4)]
+
+    for i, fut in enumerate(futs[:3]):
+        cache.put(i, fut)
+
+    # Use 0, so 1 is the least recently used.
+    assert cache.get(0) is futs[0]
+
+    cache.put(3, futs[3])
+
+    assert len(cache) == 3
+    assert 1 not in cache
+    assert futs[1].cancelled()
+    assert all(i in cache for i in (0, 2, 3))
+    assert not any(futs[i].cancelled() for i in (0, 2, 3))
+
+
+@pytest.mark.asyncio
+async def test_features_cache_max_bytes():
+    cache = FeaturesCache(max_bytes=250)
+
+    cache.put('a', finished_future(np.zeros(100, np.uint8)))
+    cache.put('b', finished_future(np.zeros(100, np.uint8)))
+    await run_callbacks()
+
+    assert 'a' in cache and 'b' in cache
+    assert cache._total_bytes == 200
+
+    cache.get('a')
+    cache.put('c', finished_future(np.zeros(100, np.uint8)))
+    await run_callbacks()
+
+    # Over the limit once 'c' finishes, so the least recently used result is evicted.
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache._total_bytes == 200
+
+
+@pytest.mark.asyncio
+async def test_features_cache_pending_futures_have_no_size():
+    cache = FeaturesCache(max_bytes=150)
+
+    cache.put('a', finished_future(np.zeros(100, np.uint8)))
+    await run_callbacks()
+
+    # Not counted until it finishes.
+    fut = asyncio.get_event_loop().create_future()
+    cache.put('b', fut)
+    await run_callbacks()
+
+    assert 'a' in cache and 'b' in cache
+
+    fut.set_result(np.zeros(100, np.uint8))
+    await run_callbacks()
+
+    assert 'a' not in cache and 'b' in cache
+
+
+@pytest.mark.asyncio
+async def test_features_cache_keeps_most_recent_entry():
+    cache = FeaturesCache(max_bytes=10)
+
+    cache.put('a', finished_future(np.zeros(100, np.uint8)))
+    await run_callbacks()
+
+    assert 'a' in cache
+
+
+@pytest.mark.asyncio
+async def test_features_cache_counts_arrays_in_tuples():
+    cache = FeaturesCache()
+
+    cache.put('a', finished_future((np.zeros(100, np.uint8), np.zeros(10, np.float64), 'not an array')))
+    await run_callbacks()
+
+    assert cache._total_bytes == 180
+
+
+@pytest.mark.asyncio
+async def test_features_cache_discard():
+    cache = FeaturesCache()
+    fut = finished_future(np.zeros(100, np.uint8))
+
+    cache.put('a', fut)
+    await run_callbacks()
+    cache.discard('a')
+
+    assert 'a' not in cache
+    assert cache._total_bytes == 0
+
+    # Replacing an entry discards the old one.
+    old = asyncio.get_event_loop().create_future()
+    new = asyncio.get_event_loop().create_future()
+    cache.put('b', old)
+    cache.put('b', new)
+
+    assert old.cancelled()
+    assert cache.get('b') is new
+
+
+@pytest.mark.asyncio
+async def test_features_cache_drops_cancelled_futures():
+    cache = FeaturesCache()
+    fut = asyncio.get_event_loop().create_future()
+
+    cache.put('a', fut)
+    fut.cancel()
+    await run_callbacks()
+
+    assert 'a' not in cache
+
+
+class FakeAcquirer:
+    def __init__(self, images) -> None:
+        self.bn_images = VariableBindable(images)
+
+
+class FakeLazyImageSequence(LazyImageSequence):
+    def __init__(self, n: int) -> None:
+        super().__init__()
+        self.keys = tuple('image {}'.format(i) for i in range(n))
+
+    def _decode(self, index: int) -> np.ndarray:
+        return np.full((2, 2), index, np.uint8)
+
+
+def make_controller(images) -> ImageSequenceAcquirerController:
+    return ImageSequenceAcquirerController(
+        acquirer=FakeAcquirer(images),
+        source_image_out=VariableBindable(None),
+    )
+
+
+def test_upcoming_image_ids_follow_step_direction():
+    images = FakeLazyImageSequence(10)
+    controller = make_controller(images)
+
+    # Forward by default.
+    assert controller._get_upcoming_image_ids(2) == [images.keys[1], images.keys[2]]
+
+    controller.bn_showing_image_index.set(5)
+    assert controller._get_upcoming_image_ids(2) == [images.keys[6], images.keys[7]]
+
+    controller.bn_showing_image_index.set(4)
+    assert controller._get_upcoming_image_ids(2) == [images.keys[3], images.keys[2]]
+
+    # Setting the same index again does not change direction.
+    controller.bn_showing_image_index.set(4)
+    assert controller._get_upcoming_image_ids(2) == [images.keys[3], images.keys[2]]
+
+    controller.bn_showing_image_index.set(8)
+    assert controller._get_upcoming_image_ids(2) == [images.keys[9]]
+
+
+def test_upcoming_image_ids_stop_at_ends():
+    images = FakeLazyImageSequence(5)
+    controller = make_controller(images)
+
+    controller.bn_showing_image_index.set(4)
+    assert controller._get_upcoming_image_ids(3) == []
+
+    controller.bn_showing_image_index.set(1)
+    assert controller._get_upcoming_image_ids(3) == [images.keys[0]]
+
+
+def test_upcoming_image_ids_of_arrays():
+    images = [np.full((2, 2), i, np.uint8) for i in range(5)]
+    controller = make_controller(images)
+
+    controller.bn_showing_image_index.set(3)
+    controller.bn_showing_image_index.set(2)
+
+    assert controller._get_upcoming_image_ids(2) == [
+        controller._get_image_digest(images[1]),
+        controller._get_image_digest(images[0]),
+    ]
@@ -0,0 +1,230 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import csv
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.services.acquisition import FrameRecorder, InputImage, RecordedFrameSequence
+from opendrop.app.common.services.acquisition._acquirer.recording import INDEX_FILENAME, INDEX_HEADER, \
+    _truncate_npy
+from opendrop.app.common.services.acquisition._acquisition import _RecordingInputImage
+
+
+class FakeInputImage(InputImage):
+    def __init__(self, image: np.ndarray, timestamp: float) -> None:
+        self._image = image
+        self._timestamp = timestamp
+
+    async def read(self) -> Tuple[np.ndarray, float]:
+        return self._image, self._timestamp
+
+
+class DroppingRecorder:
+    """Recorder that is never able to keep up."""
+
+    closed = False
+
+    def record(self, image: np.ndarray, timestamp: float) -> bool:
+        return False
+
+
+def make_frame(value: int) -> np.ndarray:
+    return np.full((4, 5), value, np.uint8)
+
+
+@pytest.mark.asyncio
+async def test_recording_input_image_replicated_once_recorded(tmp_path):
+    recorder = FrameRecorder(tmp_path/'rec')
+    done_calls = []
+    im = _RecordingInputImage(FakeInputImage(make_frame(1), 2.0), recorder, lambda: done_calls.append(None))
+
+    # Not known to be replicated until it has been recorded.
+    assert not im.is_replicated
+
+    image, timestamp = await im.read()
+
+    assert im.is_replicated
+    assert (image == 1).all() and timestamp == 2.0
+    assert done_calls == [None]
+    assert recorder.bn_stats.get().num_recorded == 1
+
+    recorder.close()
+    assert recorder.join(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_recording_input_image_not_replicated_if_dropped():
+    done_calls = []
+    im = _RecordingInputImage(FakeInputImage(make_frame(1), 2.0), DroppingRecorder(), lambda: done_calls.append(None))
+
+    await im.read()
+
+    assert not im.is_replicated
+    assert done_calls == [None]
+
+
+@pytest.mark.asyncio
+async def test_recording_input_image_not_replicated_if_recorder_closed(tmp_path):
+    recorder = FrameRecorder(tmp_path/'rec')
+    recorder.close()
+    assert recorder.join(timeout=5)
+
+    im = _RecordingInputImage(FakeInputImage(make_frame(1), 2.0), recorder, lambda: None)
+    image, _ = await im.read()
+
+    assert not im.is_replicated
+    assert (image == 1).all()
+    assert recorder.bn_stats.get().num_recorded == 0
+
+
+def make_frames():
+    rng = np.random.default_rng(0)
+    frames = []
+    frames += [rng.integers(0, 256, (4, 5), np.uint8) for _ in range(7)]
+    frames += [rng.integers(0, 2**16, (4, 5), np.uint16) for _ in range(2)]
+    frames += [rng.integers(0, 256, (6, 3), np.uint8) for _ in range(3)]
+    timestamps = [0.1 * i + 1/3 for i in range(len(frames))]
+    return frames, timestamps
+
+
+async def record(directory, frames, timestamps) -> None:
+    # Room for 3 frames of 4x5 bytes in a chunk.
+    recorder = FrameRecorder(directory, chunk_bytes=60)
+    for frame, timestamp in zip(frames, timestamps):
+        assert recorder.record(frame, timestamp)
+    recorder.close()
+    assert recorder.join(timeout=5)
+
+    stats = recorder.bn_stats.get()
+    assert stats.num_recorded == len(frames)
+    assert stats.num_dropped == 0
+    assert stats.error is None
+
+
+@pytest.mark.asyncio
+async def test_recording_round_trip(tmp_path):
+    frames, timestamps = make_frames()
+    await record(tmp_path/'rec', frames, timestamps)
+
+    images = RecordedFrameSequence(tmp_path/'rec')
+
+    assert len(images) == len(frames)
+    assert images.timestamps == tuple(timestamps)
+    assert images.keys == tuple((tmp_path/'rec', i) for i in range(len(frames)))
+    assert images.size_hint() == (5, 4)
+
+    for i, frame in enumerate(frames):
+        image = images[i]
+        assert image.dtype == frame.dtype
+        np.testing.assert_array_equal(image, frame)
+
+    for i in (0, 8, 11):
+        np.testing.assert_array_equal(await images.read(i), frames[i])
+
+    images.close()
+
+
+@pytest.mark.asyncio
+async def test_recording_chunks(tmp_path):
+    frames, timestamps = make_frames()
+    await record(tmp_path/'rec', frames, timestamps)
+
+    # 7 small uint8 frames fill two chunks of 3 and a truncated one, a 40 byte uint16 frame is too big to share a
+    # chunk, and a change of shape starts a new chunk.
+    chunk_lengths = [len(np.load(path, mmap_mode='r')) for path in sorted((tmp_path/'rec').glob('*.npy'))]
+    assert chunk_lengths == [3, 3, 1, 1, 1, 3]
+
+    with open(tmp_path/'rec'/INDEX_FILENAME, newline='') as f:
+        rows = list(csv.reader(f))
+
+    assert tuple(rows[0]) == INDEX_HEADER
+    assert [(int(chunk), int(position)) for chunk, position, _ in rows[1:]] == [
+        (0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (3, 0), (4, 0), (5, 0), (5, 1), (5, 2),
+    ]
+    assert [float(timestamp) for _, _, timestamp in rows[1:]] == timestamps
+
+
+@pytest.mark.asyncio
+async def test_recording_directory_in_use(tmp_path):
+    await record(tmp_path/'rec', *make_frames())
+
+    with pytest.raises(ValueError):
+        FrameRecorder(tmp_path/'rec')
+
+
+@pytest.mark.asyncio
+async def test_record_after_close(tmp_path):
+    recorder = FrameRecorder(tmp_path/'rec')
+    recorder.close()
+
+    with pytest.raises(ValueError):
+        recorder.record(make_frame(1), 0.0)
+
+    assert recorder.join(timeout=5)
+
+
+def test_recorded_frame_sequence_not_a_recording(tmp_path):
+    with pytest.raises(ValueError):
+        RecordedFrameSequence(tmp_path)
+
+    (tmp_path/INDEX_FILENAME).write_text('not,a,recording\n')
+    with pytest.raises(ValueError):
+        RecordedFrameSequence(tmp_path)
+
+
+@pytest.mark.parametrize('version', [(1, 0), (2, 0)])
+def test_truncate_npy(tmp_path, version):
+    path = tmp_path/'frames.npy'
+    frames = np.arange(10 * 3 * 2, dtype=np.uint16).reshape(10, 3, 2)
+
+    with open(path, 'wb') as f:
+        np.lib.format.write_array(f, frames, version=version)
+
+    _truncate_npy(path, 4)
+
+    truncated = np.load(path)
+    assert truncated.dtype == frames.dtype
+    np.testing.assert_array_equal(truncated, frames[:4])
+
+    # The data is not moved and nothing is left after it.
+    with open(path, 'rb') as f:
+        np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, _ = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+
+    assert shape == (4, 3, 2)
+    assert path.stat().st_size == data_offset + frames[:4].nbytes
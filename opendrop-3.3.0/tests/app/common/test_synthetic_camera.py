@@ -0,0 +1,143 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import numpy as np
+import pytest
+
+from opendrop.app.common.services.acquisition import SyntheticCamera, SyntheticDrop
+
+
+WIDTH, HEIGHT = 160, 120
+
+
+@pytest.fixture
+def make_camera():
+    cameras = []
+
+    def make_camera(**options) -> SyntheticCamera:
+        options.setdefault('resolution', (WIDTH, HEIGHT))
+        # Render rarely in the background, the tests render frames themselves.
+        options.setdefault('fps', 1.0)
+        camera = SyntheticCamera(**options, seed=0)
+        cameras.append(camera)
+        return camera
+
+    yield make_camera
+
+    for camera in cameras:
+        camera.release()
+
+
+@pytest.mark.parametrize('drop', list(SyntheticDrop))
+@pytest.mark.parametrize('bond', SyntheticCamera._BOND_RANGE)
+def test_render(make_camera, drop, bond):
+    camera = make_camera(drop=drop, bond=bond, noise=0.0, blur=0.0)
+
+    image = camera.render(bond)
+
+    assert image.shape == (HEIGHT, WIDTH)
+    assert image.dtype == np.uint8
+
+    drop_level = SyntheticCamera._DROP_LEVEL
+    background_level = SyntheticCamera._BACKGROUND_LEVEL
+    assert image.min() == drop_level and image.max() == background_level
+
+    if drop is SyntheticDrop.PENDANT:
+        # Hanging from a needle, with background below.
+        assert image[0, WIDTH//2] == drop_level
+        assert (image[-1] == background_level).all()
+    else:
+        # Sitting on a substrate, with background above.
+        assert (image[0] == background_level).all()
+        assert (image[-1] == drop_level).all()
+
+
+def test_render_noise_and_blur(make_camera):
+    camera = make_camera(noise=5.0, blur=2.0)
+
+    image = camera.render(0.2)
+
+    assert image.shape == (HEIGHT, WIDTH)
+    assert image.dtype == np.uint8
+    # Noise makes the background uneven.
+    assert len(np.unique(image[-1])) > 1
+
+
+def test_render_reuses_out(make_camera):
+    camera = make_camera()
+
+    out = np.empty((HEIGHT, WIDTH), np.uint8)
+    assert camera.render(0.2, out) is out
+
+    wrong_shape = np.empty((HEIGHT, WIDTH + 1), np.uint8)
+    assert camera.render(0.2, wrong_shape) is not wrong_shape
+
+    wrong_dtype = np.empty((HEIGHT, WIDTH), np.uint16)
+    assert camera.render(0.2, wrong_dtype) is not wrong_dtype
+
+
+def test_bond_at(make_camera):
+    low, high = SyntheticCamera._BOND_RANGE
+
+    camera = make_camera(bond=0.2, bond_drift=0.01)
+    assert camera.bond_at(0) == 0.2
+    assert camera.bond_at(10) == pytest.approx(0.3)
+    assert camera.bond_at(1000) == high
+
+    camera = make_camera(bond=0.2, bond_drift=-0.01)
+    assert camera.bond_at(1000) == low
+
+
+def test_capture(make_camera):
+    camera = make_camera(fps=0.0)
+
+    image, timestamp = camera.capture_timestamped()
+
+    assert image.shape == (HEIGHT, WIDTH)
+    assert image.dtype == np.uint8
+    assert camera.get_image_size_hint() == (WIDTH, HEIGHT)
+
+    camera.release()
+    assert not camera.bn_alive.get()
+
+
+@pytest.mark.parametrize('options', [
+    dict(resolution=(8, 100)),
+    dict(resolution=(100, 8)),
+    dict(fps=-1.0),
+    dict(bond=SyntheticCamera._BOND_RANGE[0] / 2),
+    dict(bond=SyntheticCamera._BOND_RANGE[1] + 0.1),
+    dict(noise=-1.0),
+    dict(blur=-1.0),
+])
+def test_invalid_settings(make_camera, options):
+    with pytest.raises(ValueError):
+        make_camera(**options)
@@ -0,0 +1,180 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import cv2
+import numpy as np
+import pytest
+
+from opendrop.app.common.services.acquisition import VideoFileAcquirer, VideoFrameSequence
+
+
+NUM_FRAMES = 40
+FPS = 10
+# Brightness step between frames, uniform frames survive lossy compression.
+STEP = 6
+
+
+@pytest.fixture(scope='module')
+def video_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('video')/'frames.avi'
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), FPS, (32, 24), isColor=False)
+    if not writer.isOpened():
+        pytest.skip("No video writer available")
+
+    try:
+        for i in range(NUM_FRAMES):
+            writer.write(np.full((24, 32), i * STEP, np.uint8))
+    finally:
+        writer.release()
+
+    return path
+
+
+def frame_number(image: np.ndarray) -> int:
+    return int(round(image.mean() / STEP))
+
+
+class CaptureSpy:
+    """Wraps a cv2.VideoCapture, recording seeks and optionally failing grabs."""
+
+    def __init__(self, capture: cv2.VideoCapture) -> None:
+        self._capture = capture
+        self.seeks = []
+        self.fail_grab = False
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.seeks.append(value)
+        return self._capture.set(prop, value)
+
+    def grab(self) -> bool:
+        if self.fail_grab:
+            return False
+        return self._capture.grab()
+
+    def __getattr__(self, name):
+        return getattr(self._capture, name)
+
+
+def make_sequence(path, frames) -> VideoFrameSequence:
+    images = VideoFrameSequence(path, frames)
+    images._capture = CaptureSpy(images._capture)
+    return images
+
+
+def test_frames_read_in_order(video_path):
+    images = make_sequence(video_path, range(NUM_FRAMES))
+
+    assert images.size_hint() == (32, 24)
+    assert [frame_number(images[i]) for i in range(len(images))] == list(range(NUM_FRAMES))
+    assert images._capture.seeks == []
+
+    images.close()
+
+
+def test_grab_ahead_and_seek(video_path):
+    images = make_sequence(video_path, range(NUM_FRAMES))
+
+    assert frame_number(images[0]) == 0
+
+    # Short skips forward are grabbed.
+    assert frame_number(images[5]) == 5
+    assert images._capture.seeks == []
+
+    # Long skips forward and any skip backward seek.
+    assert frame_number(images[30]) == 30
+    assert frame_number(images[10]) == 10
+    assert images._capture.seeks == [30, 10]
+
+    images.close()
+
+
+def test_failed_grab_raises_and_next_decode_seeks(video_path):
+    images = make_sequence(video_path, range(NUM_FRAMES))
+    assert frame_number(images[0]) == 0
+
+    images._capture.fail_grab = True
+    with pytest.raises(ValueError):
+        images[3]
+
+    images._capture.fail_grab = False
+
+    # The position is unknown after the failure, so even a nearby frame is sought.
+    assert frame_number(images[3]) == 3
+    assert images._capture.seeks == [3]
+
+    images.close()
+
+
+@pytest.mark.asyncio
+async def test_timestamps(video_path):
+    images = make_sequence(video_path, range(2, 30, 4))
+
+    for i, frame in enumerate(images.frames):
+        assert await images.read_timestamp(i) == pytest.approx(frame / FPS)
+
+    images.close()
+
+
+def test_acquirer_selects_subrange_with_stride(video_path):
+    acquirer = VideoFileAcquirer()
+    acquirer.load_video(video_path)
+
+    assert acquirer.bn_num_video_frames.get() == NUM_FRAMES
+    assert acquirer.bn_fps.get() == FPS
+    assert acquirer.get_selected_frames() == range(NUM_FRAMES)
+
+    acquirer.bn_first_frame.set(5)
+    acquirer.bn_last_frame.set(100)
+    acquirer.bn_frame_stride.set(7)
+
+    assert acquirer.get_selected_frames() == range(5, NUM_FRAMES, 7)
+
+    images = acquirer.bn_images.get()
+    assert [frame_number(image) for image in images] == list(range(5, NUM_FRAMES, 7))
+
+    acquirer.destroy()
+
+
+@pytest.mark.asyncio
+async def test_acquired_timestamps_relative_to_first_frame(video_path):
+    acquirer = VideoFileAcquirer()
+    acquirer.load_video(video_path)
+    acquirer.bn_first_frame.set(10)
+    acquirer.bn_frame_stride.set(5)
+
+    results = [await input_image.read() for input_image in acquirer.acquire_images()]
+
+    assert [frame_number(image) for image, _ in results] == list(range(10, NUM_FRAMES, 5))
+    assert [timestamp for _, timestamp in results] == pytest.approx([i * 5 / FPS for i in range(len(results))])
+
+    acquirer.destroy()
@@ -0,0 +1,127 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+
+from gi.repository import GObject
+
+from opendrop.app.conan.services.analysis import ConanAnalysisStatus
+from opendrop.app.conan.services.progress import ConanAnalysisProgressHelper
+
+
+STATUSES = [status for status in ConanAnalysisStatus if status is not ConanAnalysisStatus.TERMINAL]
+
+
+class FakeAnalysis(GObject.Object):
+    status = GObject.Property(type=object)
+    job_start = GObject.Property(type=float)
+
+    def __init__(self, job_start: float, status: ConanAnalysisStatus = ConanAnalysisStatus.WAITING_FOR_IMAGE):
+        super().__init__(status=status, job_start=job_start)
+
+
+def assert_matches_recount(helper: ConanAnalysisProgressHelper, analyses, acquiring: bool = False) -> None:
+    statuses = [analysis.status for analysis in analyses]
+    num_done = sum(bool(status & ConanAnalysisStatus.TERMINAL) for status in statuses)
+    num_cancelled = statuses.count(ConanAnalysisStatus.CANCELLED)
+
+    assert helper._num_done == num_done
+    assert helper._num_cancelled == num_cancelled
+    assert helper.fraction == (num_done/len(analyses) if analyses else 1.0)
+
+    if num_cancelled:
+        expected_status = ConanAnalysisProgressHelper.Status.CANCELLED
+    elif acquiring or num_done < len(analyses):
+        expected_status = ConanAnalysisProgressHelper.Status.ANALYSING
+    else:
+        expected_status = ConanAnalysisProgressHelper.Status.FINISHED
+    assert helper.status is expected_status
+
+    if analyses:
+        assert helper.time_start == min(analysis.job_start for analysis in analyses)
+    else:
+        assert helper.time_start is None
+
+
+def test_empty():
+    helper = ConanAnalysisProgressHelper()
+
+    assert_matches_recount(helper, [])
+
+
+def test_counts_match_recount():
+    rng = random.Random(0)
+    helper = ConanAnalysisProgressHelper()
+    analyses = []
+
+    for _ in range(500):
+        action = rng.random()
+
+        if action < 0.3 or not analyses:
+            # Append, like a stream of captured frames.
+            analyses = analyses + [FakeAnalysis(job_start=rng.uniform(0, 100)) for _ in range(rng.randint(1, 3))]
+        elif action < 0.4:
+            # Remove some.
+            analyses = [analysis for analysis in analyses if rng.random() < 0.8]
+        elif action < 0.45:
+            # Replace with some old and some new.
+            analyses = rng.sample(analyses, len(analyses)//2) + [FakeAnalysis(job_start=rng.uniform(0, 100))]
+        else:
+            rng.choice(analyses).status = rng.choice(STATUSES)
+
+        helper.analyses = tuple(analyses)
+
+        assert_matches_recount(helper, analyses)
+
+
+def test_removed_analysis_is_not_watched():
+    helper = ConanAnalysisProgressHelper()
+    a, b = FakeAnalysis(job_start=1.0), FakeAnalysis(job_start=2.0)
+
+    helper.analyses = (a, b)
+    helper.analyses = (b,)
+    a.status = ConanAnalysisStatus.CANCELLED
+
+    assert_matches_recount(helper, [b])
+
+    # Time start is recomputed without the removed analysis.
+    assert helper.time_start == 2.0
+
+
+def test_acquiring():
+    helper = ConanAnalysisProgressHelper()
+    a = FakeAnalysis(job_start=0.0, status=ConanAnalysisStatus.FINISHED)
+    helper.analyses = (a,)
+    helper.acquiring = True
+
+    assert_matches_recount(helper, [a], acquiring=True)
+
+    helper.acquiring = False
+
+    assert_matches_recount(helper, [a])
@@ -0,0 +1,175 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+
+import numpy as np
+
+from opendrop.app.ift.report.graphs.services.graphs import TimeSeries
+
+
+def assert_series_equal(series: TimeSeries, points) -> None:
+    """Check `series` against `points`, a mapping of key to (timestamp, value)."""
+    t, v = series.data
+
+    assert len(series) == len(points)
+    assert all(key in series for key in points)
+
+    # Points with equal timestamps may be in any order, compare each timestamp's values as a set.
+    expected = sorted(points.values())
+    assert np.array_equal(t, [timestamp for timestamp, _ in expected])
+    assert sorted(zip(t, v)) == expected
+
+
+def test_in_order():
+    series = TimeSeries()
+    for i in range(10):
+        assert series.set(i, float(i), 10.0*i)
+
+    t, v = series.data
+
+    assert np.array_equal(t, np.arange(10.0))
+    assert np.array_equal(v, 10.0*np.arange(10.0))
+
+
+def test_out_of_order():
+    series = TimeSeries()
+    series.set('c', 3.0, 30.0)
+    series.set('a', 1.0, 10.0)
+    series.set('d', 4.0, 40.0)
+    series.set('b', 2.0, 20.0)
+
+    t, v = series.data
+
+    assert np.array_equal(t, [1.0, 2.0, 3.0, 4.0])
+    assert np.array_equal(v, [10.0, 20.0, 30.0, 40.0])
+
+
+def test_equal_timestamps_keep_insertion_order():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 1.0, 20.0)
+    series.set('c', 0.0, 0.0)
+    series.set('d', 1.0, 30.0)
+
+    _, v = series.data
+
+    assert np.array_equal(v, [0.0, 10.0, 20.0, 30.0])
+
+
+def test_update_value():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 2.0, 20.0)
+
+    assert series.set('a', 1.0, 15.0)
+    assert not series.set('a', 1.0, 15.0)
+
+    assert_series_equal(series, {'a': (1.0, 15.0), 'b': (2.0, 20.0)})
+
+
+def test_update_timestamp_moves_point():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 2.0, 20.0)
+    series.set('c', 3.0, 30.0)
+
+    assert series.set('a', 5.0, 10.0)
+
+    t, v = series.data
+    assert np.array_equal(t, [2.0, 3.0, 5.0])
+    assert np.array_equal(v, [20.0, 30.0, 10.0])
+
+    assert series.set('a', 0.0, 10.0)
+
+    t, v = series.data
+    assert np.array_equal(t, [0.0, 2.0, 3.0])
+    assert np.array_equal(v, [10.0, 20.0, 30.0])
+
+
+def test_discard():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 2.0, 20.0)
+    series.set('c', 3.0, 30.0)
+
+    series.discard('b')
+    # Discarding a key that isn't there does nothing.
+    series.discard('b')
+    series.discard('x')
+
+    assert 'b' not in series
+    assert_series_equal(series, {'a': (1.0, 10.0), 'c': (3.0, 30.0)})
+
+
+def test_discard_with_equal_timestamps():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+    series.set('b', 1.0, 20.0)
+    series.set('c', 1.0, 30.0)
+
+    series.discard('b')
+
+    _, v = series.data
+    assert np.array_equal(v, [10.0, 30.0])
+
+
+def test_data_is_a_copy():
+    series = TimeSeries()
+    series.set('a', 1.0, 10.0)
+
+    t, v = series.data
+    t[0] = 5.0
+    v[0] = 50.0
+
+    assert_series_equal(series, {'a': (1.0, 10.0)})
+
+
+def test_matches_brute_force():
+    rng = random.Random(0)
+    series = TimeSeries()
+    points = {}
+
+    # Enough points to grow the arrays a few times.
+    for _ in range(2000):
+        action = rng.random()
+        key = rng.randrange(300)
+
+        if action < 0.7:
+            # Mostly increasing timestamps, with some out of order and repeated.
+            timestamp = float(rng.choice([len(points), rng.randrange(len(points) + 1)]))
+            value = float(rng.randrange(5))
+            changed = series.set(key, timestamp, value)
+            assert changed == (points.get(key) != (timestamp, value))
+            points[key] = (timestamp, value)
+        else:
+            series.discard(key)
+            points.pop(key, None)
+
+        assert_series_equal(series, points)
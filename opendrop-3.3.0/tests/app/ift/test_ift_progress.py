@@ -0,0 +1,205 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from opendrop.app.ift.services import progress
+from opendrop.app.ift.services.analysis import PendantAnalysisJob
+from opendrop.app.ift.services.progress import IFTAnalysisProgressHelper
+from opendrop.utility.bindable import VariableBindable
+
+
+Status = PendantAnalysisJob.Status
+
+
+class FakeAnalysis:
+    def __init__(self, time_start: float, image_ready: float = math.nan, status: Status = Status.WAITING_FOR_IMAGE):
+        self.bn_status = VariableBindable(status)
+        self.bn_time_start = VariableBindable(time_start)
+        self.bn_time_est_complete = VariableBindable(image_ready)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(progress.time, 'time', clock)
+    return clock
+
+
+def assert_matches_recount(helper: IFTAnalysisProgressHelper, analyses, acquiring: bool = False) -> None:
+    statuses = [analysis.bn_status.get() for analysis in analyses]
+    counts = Counter(statuses)
+    num_done = sum(status.is_terminal for status in statuses)
+
+    assert helper._status_counts == {status: counts[status] for status in Status}
+    assert helper.fraction == (num_done/len(analyses) if analyses else 1.0)
+
+    if counts[Status.CANCELLED]:
+        expected_status = IFTAnalysisProgressHelper.Status.CANCELLED
+    elif acquiring or num_done < len(analyses):
+        expected_status = IFTAnalysisProgressHelper.Status.ANALYSING
+    else:
+        expected_status = IFTAnalysisProgressHelper.Status.FINISHED
+    assert helper.status is expected_status
+
+    if analyses:
+        assert helper.time_start == min(analysis.bn_time_start.get() for analysis in analyses)
+    else:
+        assert helper.time_start is None
+
+
+def test_empty():
+    helper = IFTAnalysisProgressHelper()
+
+    assert_matches_recount(helper, [])
+    assert helper.est_complete is None
+
+
+def test_counts_match_recount(clock):
+    rng = random.Random(0)
+    helper = IFTAnalysisProgressHelper()
+    analyses = []
+
+    for step in range(500):
+        clock.now = float(step)
+        action = rng.random()
+
+        if action < 0.3 or not analyses:
+            # Append, like a stream of captured frames.
+            analyses = analyses + [FakeAnalysis(time_start=rng.uniform(0, 100)) for _ in range(rng.randint(1, 3))]
+        elif action < 0.4:
+            # Remove some.
+            analyses = [analysis for analysis in analyses if rng.random() < 0.8]
+        elif action < 0.45:
+            # Replace with some old and some new.
+            analyses = rng.sample(analyses, len(analyses)//2) + [FakeAnalysis(time_start=rng.uniform(0, 100))]
+        else:
+            rng.choice(analyses).bn_status.set(rng.choice(list(Status)))
+
+        helper.props.analyses = tuple(analyses)
+
+        assert_matches_recount(helper, analyses)
+
+
+def test_removed_analysis_is_not_watched():
+    helper = IFTAnalysisProgressHelper()
+    a, b = FakeAnalysis(time_start=1.0), FakeAnalysis(time_start=2.0)
+
+    helper.props.analyses = (a, b)
+    helper.props.analyses = (b,)
+    a.bn_status.set(Status.FINISHED)
+
+    assert_matches_recount(helper, [b])
+
+    # Time start is recomputed without the removed analysis.
+    assert helper.time_start == 2.0
+
+
+def test_acquiring():
+    helper = IFTAnalysisProgressHelper()
+    a = FakeAnalysis(time_start=0.0, status=Status.FINISHED)
+    helper.props.analyses = (a,)
+    helper.props.acquiring = True
+
+    assert_matches_recount(helper, [a], acquiring=True)
+
+    helper.props.acquiring = False
+
+    assert_matches_recount(helper, [a])
+
+
+def test_est_complete_waits_for_last_image(clock):
+    helper = IFTAnalysisProgressHelper()
+    a = FakeAnalysis(time_start=0.0, image_ready=0.0)
+    b = FakeAnalysis(time_start=0.0, image_ready=10.0)
+    helper.props.analyses = (a, b)
+
+    # Nothing timed yet, so only when the last image is ready is known.
+    assert helper.est_complete == 10.0
+
+    clock.now = 1.0
+    a.bn_status.set(Status.EXTRACTING_FEATURES)
+    clock.now = 3.0
+    a.bn_status.set(Status.FITTING)
+    clock.now = 4.0
+    a.bn_status.set(Status.FINISHED)
+
+    # Plus the time an analysis has taken to go through each stage.
+    assert helper.est_complete == pytest.approx(10.0 + 2.0 + 1.0)
+
+
+def test_est_complete_uses_throughput(clock):
+    helper = IFTAnalysisProgressHelper()
+    analyses = [FakeAnalysis(time_start=0.0, image_ready=0.0) for _ in range(5)]
+    helper.props.analyses = tuple(analyses)
+
+    # Analyses leave feature extraction every 2 s, and each spends 1 s in it.
+    for i, analysis in enumerate(analyses[:3]):
+        clock.now = 2.0*i
+        analysis.bn_status.set(Status.EXTRACTING_FEATURES)
+        clock.now = 2.0*i + 1.0
+        analysis.bn_status.set(Status.FITTING)
+
+    assert helper._stage_duration[Status.EXTRACTING_FEATURES] == pytest.approx(1.0)
+    assert helper._stage_interval[Status.EXTRACTING_FEATURES] == pytest.approx(2.0)
+
+    # The last exit was at 5 s and two analyses are still to go through feature extraction, which is slower than
+    # the images being ready.
+    assert helper.est_complete == pytest.approx(5.0 + 2*2.0)
+
+    # Cancelled analyses don't count towards the stage timings.
+    clock.now = 100.0
+    analyses[3].bn_status.set(Status.EXTRACTING_FEATURES)
+    clock.now = 200.0
+    analyses[3].bn_status.set(Status.CANCELLED)
+
+    assert helper._stage_duration[Status.EXTRACTING_FEATURES] == pytest.approx(1.0)
+
+
+def test_est_complete_none_when_finished(clock):
+    helper = IFTAnalysisProgressHelper()
+    a = FakeAnalysis(time_start=0.0, image_ready=0.0)
+    helper.props.analyses = (a,)
+
+    a.bn_status.set(Status.FINISHED)
+
+    assert helper.status is IFTAnalysisProgressHelper.Status.FINISHED
+    assert helper.est_complete is None
@@ -0,0 +1,164 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+
+import numpy as np
+import pytest
+
+from opendrop.features import LabelOverlay, colorize_labels
+
+
+COLORS = np.array([
+    (0, 0, 0, 0),
+    (255, 0, 0, 255),
+    (0, 255, 0, 255),
+    (0, 0, 255, 128),
+], dtype=np.uint8)
+
+SHAPE = (48, 64)
+
+
+def expected(labels: np.ndarray) -> np.ndarray:
+    return COLORS.view(np.uint32).ravel()[labels]
+
+
+def sparse_labels(seed: int, dtype=np.uint8) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    labels = np.zeros(SHAPE, dtype)
+    # Far fewer than 1/16 of the pixels, so the painted pixels are all recorded.
+    rows = rng.integers(0, SHAPE[0], 20)
+    cols = rng.integers(0, SHAPE[1], 20)
+    labels[rows, cols] = rng.integers(1, len(COLORS), 20)
+    return labels
+
+
+def dense_labels(seed: int, dtype=np.uint8) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, len(COLORS), SHAPE).astype(dtype)
+
+
+@pytest.mark.parametrize('dtype', [np.uint8, np.int16, np.uint32, np.int64])
+def test_colorize_labels(dtype):
+    labels = dense_labels(0, dtype)
+
+    result = np.frombuffer(colorize_labels(labels, COLORS), np.uint32).reshape(SHAPE)
+    np.testing.assert_array_equal(result, expected(labels))
+
+
+def test_colorize_labels_out():
+    labels = dense_labels(1)
+    out = np.zeros(SHAPE, np.uint32)
+
+    result = colorize_labels(labels, COLORS, out=out)
+
+    np.testing.assert_array_equal(out, expected(labels))
+    np.testing.assert_array_equal(result, out)
+
+
+def test_colorize_labels_out_wrong_shape():
+    with pytest.raises(ValueError):
+        colorize_labels(dense_labels(2), COLORS, out=np.zeros((2, 2), np.uint32))
+
+
+def test_colorize_labels_out_of_range():
+    labels = np.zeros(SHAPE, np.uint8)
+    labels[3, 4] = 7
+
+    with pytest.raises(IndexError, match='index 7 '):
+        colorize_labels(labels, COLORS)
+
+
+def test_colorize_labels_negative():
+    labels = np.zeros(SHAPE, np.int32)
+    labels[3, 4] = -2
+
+    with pytest.raises(IndexError, match='index -2 '):
+        colorize_labels(labels, COLORS)
+
+
+@pytest.mark.parametrize('dtype', [np.uint8, np.int32])
+def test_label_overlay_matches_colorize_labels(dtype):
+    overlay = LabelOverlay(COLORS)
+
+    sequence = [
+        sparse_labels(0, dtype),
+        sparse_labels(1, dtype),
+        # Too many painted pixels to record, the next update clears the whole overlay.
+        dense_labels(2, dtype),
+        sparse_labels(3, dtype),
+        dense_labels(4, dtype),
+        dense_labels(5, dtype),
+        np.zeros(SHAPE, dtype),
+        sparse_labels(6, dtype),
+    ]
+
+    for labels in sequence:
+        out = np.zeros(SHAPE, np.uint32)
+        colorize_labels(labels, COLORS, out=out)
+        np.testing.assert_array_equal(overlay.update(labels), out)
+
+
+def test_label_overlay_shape_change():
+    overlay = LabelOverlay(COLORS)
+    overlay.update(sparse_labels(0))
+
+    labels = np.ones((10, 12), np.uint8)
+    np.testing.assert_array_equal(overlay.update(labels), expected(labels))
+
+
+def test_label_overlay_recovers_from_out_of_range_label():
+    overlay = LabelOverlay(COLORS)
+    overlay.update(sparse_labels(0))
+
+    # Painting stops being recorded part way through when a label is out of range.
+    bad_labels = dense_labels(1)
+    bad_labels[-1, -1] = 9
+    with pytest.raises(IndexError, match='index 9 '):
+        overlay.update(bad_labels)
+
+    labels = sparse_labels(2)
+    np.testing.assert_array_equal(overlay.update(labels), expected(labels))
+
+
+def test_label_overlay_negative_label():
+    overlay = LabelOverlay(COLORS)
+
+    labels = sparse_labels(0, np.int8)
+    labels[0, 0] = -1
+    with pytest.raises(IndexError, match='index -1 '):
+        overlay.update(labels)
+
+
+def test_label_overlay_invalid_colors():
+    with pytest.raises(ValueError):
+        LabelOverlay(np.zeros((3, 3), np.uint8))
+
+    with pytest.raises(ValueError):
+        LabelOverlay(np.zeros((0, 4), np.uint8))
@@ -219,6 +219,47 @@ class TestEvent:
         # This should not raise any errors about attempting to set the result of a cancelled future.
         self.event.fire(123)
 
+    @pytest.mark.asyncio
+    async def test_fire_soon(self):
+        cb = Mock()
+        self.event.connect(cb)
+
+        self.event.fire_soon(1, a='a')
+        self.event.fire_soon(2, b='b')
+        cb.assert_not_called()
+
+        await asyncio.sleep(0)
+
+        # Coalesced into one fire with the latest arguments.
+        cb.assert_called_once_with(2, b='b')
+
+    @pytest.mark.asyncio
+    async def test_fire_soon_after_fired(self):
+        cb = Mock()
+        self.event.connect(cb)
+
+        self.event.fire_soon(1)
+        await asyncio.sleep(0)
+        self.event.fire_soon(2)
+        await asyncio.sleep(0)
+
+        assert cb.call_args_list == [call(1), call(2)]
+
+    def test_connect_during_fire(self):
+        cb1 = Mock()
+
+        def cb0():
+            self.event.connect(cb1)
+
+        self.event.connect(cb0)
+
+        self.event.fire()
+        # Handlers connected while firing are not invoked until the next fire.
+        cb1.assert_not_called()
+
+        self.event.fire()
+        cb1.assert_called_once_with()
+
     def test_weak_ref_by_default(self):
         cb = Mock()
         cb_wref = weakref.ref(cb)
@@ -0,0 +1,148 @@
+# Copyright © 2020, Joseph Berry, Rico Tabor (opendrop.dev@gmail.com)
+# OpenDrop is released under the GNU GPL License. You are free to
+# modify and distribute the code, but always under the same license
+# (i.e. you cannot make commercial derivatives).
+#
+# If you use this software in your research, please cite the following
+# journal articles:
+#
+# J. D. Berry, M. J. Neeson, R. R. Dagastine, D. Y. C. Chan and
+# R. F. Tabor, Measurement of surface and interfacial tension using
+# pendant drop tensiometry. Journal of Colloid and Interface Science 454
+# (2015) 226–237. https://doi.org/10.1016/j.jcis.2015.05.012
+#
+# E. Huang, T. Denning, A. Skoufis, J. Qi, R. R. Dagastine, R. F. Tabor
+# and J. D. Berry, OpenDrop: Open-source software for pendant drop
+# tensiometry & contact angle measurements, submitted to the Journal of
+# Open Source Software
+#
+# These citations help us not only to understand who is using and
+# developing OpenDrop, and for what purpose, but also to justify
+# continued development of this code and other open source resources.
+#
+# OpenDrop is distributed WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE.  See the GNU General Public License for more details.  You
+# should have received a copy of the GNU General Public License along
+# with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# Micro-benchmarks of firing events, these time many fires and fail only on gross regressions (a hundred times or
+# so slower than expected), since timings vary a lot between machines. They are skipped unless pytest is run with
+# `--run-benchmarks`, add `-s` to see the timings.
+
+
+import timeit
+
+import pytest
+
+from opendrop.utility import events
+from opendrop.utility.bindable import AccessorBindable, VariableBindable
+
+
+NUM_FIRES = 20000
+
+# Upper bound on the time of a single fire, per handler connected.
+MAX_FIRE_TIME = 50e-6
+
+pytestmark = pytest.mark.benchmark
+
+
+class Handler:
+    def __init__(self):
+        self.count = 0
+
+    def cb(self, *_, **__):
+        self.count += 1
+
+    def noop(self, *_, **__):
+        pass
+
+
+def time_per_call(func, number: int = NUM_FIRES) -> float:
+    # Best of a few runs, to ignore time lost to other processes.
+    t = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("{}: {:.2f} us".format(func.__qualname__, t * 1e6))
+    return t
+
+
+def test_fire_no_connections():
+    event = events.Event()
+
+    t = time_per_call(event.fire)
+
+    assert t < MAX_FIRE_TIME
+
+
+def test_fire_weak_ref_method():
+    event = events.Event()
+    handlers = [Handler() for _ in range(10)]
+    for handler in handlers:
+        event.connect(handler.cb)
+
+    t = time_per_call(lambda: event.fire(1, 2, a=3))
+
+    assert t < len(handlers) * MAX_FIRE_TIME
+    assert all(handler.count == 3 * NUM_FIRES for handler in handlers)
+
+
+def test_fire_strong_ref_ignore_args():
+    event = events.Event()
+    handlers = [Handler() for _ in range(10)]
+    for handler in handlers:
+        event.connect(handler.cb, weak_ref=False, ignore_args=True)
+
+    t = time_per_call(lambda: event.fire(1, 2, a=3))
+
+    assert t < len(handlers) * MAX_FIRE_TIME
+    assert all(handler.count == 3 * NUM_FIRES for handler in handlers)
+
+
+def test_fire_does_not_copy_connections():
+    # Firing should take at most linearly longer as more handlers are connected, i.e. no more than the time to
+    # invoke each of them.
+    few = events.Event()
+    many = events.Event()
+    handler = Handler()
+    few.connect(handler.cb)
+    many.connect(handler.cb)
+
+    # Keep references to the extra handlers so they stay connected.
+    extra_handlers = [Handler() for _ in range(1000)]
+    for extra_handler in extra_handlers:
+        many.connect(extra_handler.noop)
+    assert many.num_connections == 1 + len(extra_handlers)
+
+    # Fewer fires, since each invokes a thousand handlers.
+    num_many_fires = NUM_FIRES // 100
+
+    t_few = time_per_call(few.fire)
+    t_many = time_per_call(many.fire, number=num_many_fires)
+
+    assert t_many < 2 * many.num_connections * t_few
+    assert handler.count == 3 * (NUM_FIRES + num_many_fires)
+
+
+def test_poke_accessor_bindable():
+    value = 0
+    bn = AccessorBindable(getter=lambda: value)
+    handlers = [Handler() for _ in range(5)]
+    for handler in handlers:
+        bn.on_changed.connect(handler.cb)
+
+    t = time_per_call(bn.poke)
+
+    assert t < len(handlers) * MAX_FIRE_TIME
+
+
+def test_set_variable_bindable():
+    bn = VariableBindable(0)
+    handler = Handler()
+    bn.on_changed.connect(handler.cb)
+
+    values = iter(range(1, 4 * NUM_FIRES))
+    t = time_per_call(lambda: bn.set(next(values)))
+
+    assert t < 2 * MAX_FIRE_TIME
+    assert handler.count == 3 * NUM_FIRES
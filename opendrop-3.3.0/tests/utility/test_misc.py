@@ -32,7 +32,7 @@ import sys
 
 import pytest
 
-from opendrop.utility.misc import recursive_load, get_classes_in_modules, clamp
+from opendrop.utility.misc import recursive_load, get_classes_in_modules, clamp, appended_items
 from tests.samples import dummy_pkg
 
 
@@ -78,3 +78,17 @@ def test_clamp(x, lower, upper, expected):
         assert math.isnan(clamp(x, lower, upper))
     else:
         assert clamp(x, lower, upper) == expected
+
+
+@pytest.mark.parametrize('old, new, expected', [
+    ((), (), ()),
+    ((), (1, 2), (1, 2)),
+    ((1, 2), (1, 2), ()),
+    ((1, 2), (1, 2, 3, 4), (3, 4)),
+    ([1, 2], (1, 2, 3), (3,)),
+    ((1, 2), (1,), None),
+    ((1, 2), (2, 1, 3), None),
+    ((1, 2, 3), (1, 4, 3, 5), None),
+])
+def test_appended_items(old, new, expected):
+    assert appended_items(old, new) == expected